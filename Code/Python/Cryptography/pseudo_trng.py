@@ -18,7 +18,8 @@ Security model
 The program performs:
 * SP 800-90B-style Repetition Count and Adaptive Proportion health checks on
   raw pre-conditioning samples.
-* A broad built-in statistical battery on the generated output.
+* A broad built-in statistical battery on the generated output, vectorized
+  with NumPy when it is installed (the pure-Python path remains the reference).
 * Optional full NIST SP 800-22 testing through the third-party `nistrng`
   package when installed.
 * Optional external `rngtest`, `dieharder`, `ent`, and PractRand execution when
@@ -34,6 +35,7 @@ import hashlib
 import hmac
 import json
 import math
+import mmap
 import os
 import platform
 import re
@@ -48,6 +50,7 @@ import threading
 import time
 import zlib
 from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Callable, Iterable, Optional, Sequence
@@ -178,10 +181,15 @@ class GenerationReport:
     output_path: str
     output_bytes: int
     output_sha256: str
+    drbg_workers: int
+    generation_seconds: float
+    generation_mb_per_s: float
     tested_bytes: int
     tested_full_output: bool
     sources: list[dict[str, Any]]
     tests: list[dict[str, Any]]
+    test_timings: list[dict[str, Any]]
+    test_wall_seconds: float
     external_tools: dict[str, Any]
     warnings: list[str]
 
@@ -208,26 +216,40 @@ class HmacDrbgSha512:
         self._update(seed_material)
 
     def _mac(self, data: bytes) -> bytes:
-        return hmac.new(self._k, data, hashlib.sha512).digest()
+        return hmac.digest(self._k, data, "sha512")
 
     def _update(self, provided_data: bytes = b"") -> None:
-        self._k = hmac.new(self._k, self._v + b"\x00" + provided_data, hashlib.sha512).digest()
-        self._v = hmac.new(self._k, self._v, hashlib.sha512).digest()
+        self._k = hmac.digest(self._k, self._v + b"\x00" + provided_data, "sha512")
+        self._v = hmac.digest(self._k, self._v, "sha512")
         if provided_data:
-            self._k = hmac.new(self._k, self._v + b"\x01" + provided_data, hashlib.sha512).digest()
-            self._v = hmac.new(self._k, self._v, hashlib.sha512).digest()
+            self._k = hmac.digest(self._k, self._v + b"\x01" + provided_data, "sha512")
+            self._v = hmac.digest(self._k, self._v, "sha512")
 
     def generate(self, size: int, additional_input: bytes = b"") -> bytes:
         if size < 0:
             raise ValueError("size must be non-negative")
+        out = bytearray(size)
+        self.generate_into(out, additional_input)
+        return bytes(out)
+
+    def generate_into(self, out: Any, additional_input: bytes = b"") -> None:
+        """Fill a writable buffer in place; same stream as generate(len(out))."""
         if additional_input:
             self._update(additional_input)
-        out = bytearray()
-        while len(out) < size:
-            self._v = self._mac(self._v)
-            out.extend(self._v)
+        view = memoryview(out).cast("B")
+        key = self._k
+        value = self._v
+        full, tail = divmod(len(view), 64)
+        position = 0
+        for _ in range(full):
+            value = hmac.digest(key, value, "sha512")
+            view[position : position + 64] = value
+            position += 64
+        if tail:
+            value = hmac.digest(key, value, "sha512")
+            view[position:] = value[:tail]
+        self._v = value
         self._update(additional_input)
-        return bytes(out[:size])
 
 
 def secure_os_seed() -> bytes:
@@ -244,7 +266,9 @@ def secure_os_seed() -> bytes:
 def xor_bytes(left: bytes, right: bytes) -> bytes:
     if len(left) != len(right):
         raise ValueError("XOR operands must have equal lengths")
-    return bytes(a ^ b for a, b in zip(left, right))
+    if np is not None:
+        return np.bitwise_xor(np.frombuffer(left, dtype=np.uint8), np.frombuffer(right, dtype=np.uint8)).tobytes()
+    return (int.from_bytes(left, "little") ^ int.from_bytes(right, "little")).to_bytes(len(left), "little")
 
 
 # ---------------------------------------------------------------------------
@@ -982,7 +1006,10 @@ def test_monobit(bits: Sequence[int]) -> StatisticalTestResult:
     n = len(bits)
     if n < 100:
         return skip_test("Frequency (Monobit)", "requires at least 100 bits")
-    total = sum(1 if bit else -1 for bit in bits)
+    return monobit_result(n, sum(1 if bit else -1 for bit in bits))
+
+
+def monobit_result(n: int, total: int) -> StatisticalTestResult:
     statistic = abs(total) / math.sqrt(n)
     return result_from_p("Frequency (Monobit)", math.erfc(statistic / math.sqrt(2.0)), statistic)
 
@@ -997,6 +1024,10 @@ def test_block_frequency(bits: Sequence[int], block_size: int = 128) -> Statisti
         block = bits[index * block_size : (index + 1) * block_size]
         proportion = sum(block) / block_size
         chi2 += 4.0 * block_size * (proportion - 0.5) ** 2
+    return block_frequency_result(blocks, chi2, block_size)
+
+
+def block_frequency_result(blocks: int, chi2: float, block_size: int) -> StatisticalTestResult:
     return result_from_p("Block Frequency", gammaincc(blocks / 2.0, chi2 / 2.0), chi2, f"M={block_size}, N={blocks}")
 
 
@@ -1007,7 +1038,10 @@ def test_runs(bits: Sequence[int]) -> StatisticalTestResult:
     pi = sum(bits) / n
     if abs(pi - 0.5) >= 2.0 / math.sqrt(n):
         return StatisticalTestResult("Runs", "FAIL", 0.0, details="monobit prerequisite failed")
-    runs = 1 + sum(1 for i in range(1, n) if bits[i] != bits[i - 1])
+    return runs_result(n, pi, 1 + sum(1 for i in range(1, n) if bits[i] != bits[i - 1]))
+
+
+def runs_result(n: int, pi: float, runs: int) -> StatisticalTestResult:
     numerator = abs(runs - 2.0 * n * pi * (1.0 - pi))
     denominator = 2.0 * math.sqrt(2.0 * n) * pi * (1.0 - pi)
     return result_from_p("Runs", math.erfc(numerator / denominator), float(runs))
@@ -1024,39 +1058,47 @@ def longest_run(block: Sequence[int]) -> int:
     return best
 
 
+def longest_run_parameters(n: int) -> tuple[int, list[float], int]:
+    """Return block size, class probabilities and the run length mapped to class 0."""
+    if n < 6272:
+        return 8, [0.2148, 0.3672, 0.2305, 0.1875], 1
+    if n < 750000:
+        return 128, [0.1174, 0.2430, 0.2493, 0.1752, 0.1027, 0.1124], 4
+    return 10000, [0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727], 10
+
+
+def longest_run_result(n: int, frequencies: Sequence[int]) -> StatisticalTestResult:
+    m, probabilities, _ = longest_run_parameters(n)
+    blocks = n // m
+    chi2 = sum((observed - blocks * expected) ** 2 / (blocks * expected) for observed, expected in zip(frequencies, probabilities))
+    return result_from_p("Longest Run of Ones", chi_square_sf(chi2, len(probabilities) - 1), chi2, f"M={m}, N={blocks}, bins={list(frequencies)}")
+
+
 def test_longest_run(bits: Sequence[int]) -> StatisticalTestResult:
     n = len(bits)
     if n < 128:
         return skip_test("Longest Run of Ones", "requires at least 128 bits")
-    if n < 6272:
-        m = 8
-        probabilities = [0.2148, 0.3672, 0.2305, 0.1875]
-        classify = lambda value: 0 if value <= 1 else 1 if value == 2 else 2 if value == 3 else 3
-    elif n < 750000:
-        m = 128
-        probabilities = [0.1174, 0.2430, 0.2493, 0.1752, 0.1027, 0.1124]
-        classify = lambda value: 0 if value <= 4 else value - 4 if value <= 8 else 5
-    else:
-        m = 10000
-        probabilities = [0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727]
-        classify = lambda value: 0 if value <= 10 else value - 10 if value <= 15 else 6
+    m, probabilities, lowest = longest_run_parameters(n)
     blocks = n // m
     frequencies = [0] * len(probabilities)
     for i in range(blocks):
-        frequencies[classify(longest_run(bits[i * m : (i + 1) * m]))] += 1
-    chi2 = sum((observed - blocks * expected) ** 2 / (blocks * expected) for observed, expected in zip(frequencies, probabilities))
-    return result_from_p("Longest Run of Ones", chi_square_sf(chi2, len(probabilities) - 1), chi2, f"M={m}, N={blocks}, bins={frequencies}")
+        value = longest_run(bits[i * m : (i + 1) * m])
+        frequencies[min(max(value - lowest, 0), len(probabilities) - 1)] += 1
+    return longest_run_result(n, frequencies)
 
 
 def cumulative_sums_p(bits: Sequence[int]) -> tuple[float, int]:
-    n = len(bits)
     cumulative = 0
     z = 0
     for bit in bits:
         cumulative += 1 if bit else -1
         z = max(z, abs(cumulative))
+    return cumulative_sums_p_from_z(len(bits), z), z
+
+
+def cumulative_sums_p_from_z(n: int, z: int) -> float:
     if z == 0:
-        return 1.0, z
+        return 1.0
     root_n = math.sqrt(n)
     first_sum = 0.0
     start = math.floor((-n / z + 1.0) / 4.0)
@@ -1068,7 +1110,7 @@ def cumulative_sums_p(bits: Sequence[int]) -> tuple[float, int]:
     end = math.floor((n / z - 1.0) / 4.0)
     for k in range(start, end + 1):
         second_sum += normal_cdf((4 * k + 3) * z / root_n) - normal_cdf((4 * k + 1) * z / root_n)
-    return clamp_probability(1.0 - first_sum + second_sum), z
+    return clamp_probability(1.0 - first_sum + second_sum)
 
 
 def test_cumulative_sums(bits: Sequence[int]) -> list[StatisticalTestResult]:
@@ -1086,27 +1128,21 @@ def test_cumulative_sums(bits: Sequence[int]) -> list[StatisticalTestResult]:
 
 
 def psi_squared(bits: Sequence[int], m: int) -> float:
-    n = len(bits)
-    counts = [0] * (1 << m)
-    extended = bytes(bits) + bytes(bits[: m - 1])
-    value = 0
-    mask = (1 << m) - 1
-    for bit in extended[:m]:
-        value = ((value << 1) | bit) & mask
-    counts[value] += 1
-    for i in range(1, n):
-        value = ((value << 1) | extended[i + m - 1]) & mask
-        counts[value] += 1
-    return (sum(count * count for count in counts) * (1 << m) / n) - n
+    return psi_squared_from_counts(circular_pattern_counts(bits, m), len(bits))
+
+
+def psi_squared_from_counts(counts: Sequence[int], n: int) -> float:
+    return (sum(count * count for count in counts) * len(counts) / n) - n
 
 
 def test_serial(bits: Sequence[int], m: int = 3) -> list[StatisticalTestResult]:
     n = len(bits)
     if n < 1000:
         return [skip_test("Serial Δ1", "requires at least 1000 bits"), skip_test("Serial Δ2", "requires at least 1000 bits")]
-    psi_m = psi_squared(bits, m)
-    psi_m1 = psi_squared(bits, m - 1)
-    psi_m2 = psi_squared(bits, m - 2)
+    return serial_results(psi_squared(bits, m), psi_squared(bits, m - 1), psi_squared(bits, m - 2), m)
+
+
+def serial_results(psi_m: float, psi_m1: float, psi_m2: float, m: int) -> list[StatisticalTestResult]:
     delta1 = psi_m - psi_m1
     delta2 = psi_m - 2.0 * psi_m1 + psi_m2
     return [
@@ -1134,9 +1170,10 @@ def test_approximate_entropy(bits: Sequence[int], m: int = 3) -> StatisticalTest
     n = len(bits)
     if n < 1000:
         return skip_test("Approximate Entropy", "requires at least 1000 bits")
-    counts_m = circular_pattern_counts(bits, m)
-    counts_m1 = circular_pattern_counts(bits, m + 1)
+    return approximate_entropy_result(n, circular_pattern_counts(bits, m), circular_pattern_counts(bits, m + 1), m)
+
 
+def approximate_entropy_result(n: int, counts_m: Sequence[int], counts_m1: Sequence[int], m: int) -> StatisticalTestResult:
     def phi(counts: Sequence[int]) -> float:
         total = 0.0
         for count in counts:
@@ -1160,6 +1197,10 @@ def test_poker(bits: Sequence[int], m: int = 4) -> StatisticalTestResult:
         for bit in bits[i * m : (i + 1) * m]:
             value = (value << 1) | bit
         counts[value] += 1
+    return poker_result(blocks, counts, m)
+
+
+def poker_result(blocks: int, counts: Sequence[int], m: int) -> StatisticalTestResult:
     statistic = (2 ** m / blocks) * sum(value * value for value in counts) - blocks
     return result_from_p("Poker", chi_square_sf(statistic, (1 << m) - 1), statistic, f"m={m}")
 
@@ -1168,8 +1209,12 @@ def test_byte_frequency(data: bytes) -> StatisticalTestResult:
     if len(data) < 256:
         return skip_test("Byte Frequency Chi-Square", "requires at least 256 bytes")
     counts = Counter(data)
-    expected = len(data) / 256.0
-    statistic = sum((counts.get(value, 0) - expected) ** 2 / expected for value in range(256))
+    return byte_frequency_result(len(data), [counts.get(value, 0) for value in range(256)])
+
+
+def byte_frequency_result(size: int, counts: Sequence[int]) -> StatisticalTestResult:
+    expected = size / 256.0
+    statistic = sum((counts[value] - expected) ** 2 / expected for value in range(256))
     return result_from_p("Byte Frequency Chi-Square", chi_square_sf(statistic, 255), statistic)
 
 
@@ -1177,12 +1222,33 @@ def test_autocorrelation(bits: Sequence[int], lag: int) -> StatisticalTestResult
     n = len(bits) - lag
     if n < 1000:
         return skip_test(f"Autocorrelation lag {lag}", "requires at least 1000 comparable bits")
-    mismatches = sum(bits[i] ^ bits[i + lag] for i in range(n))
+    return autocorrelation_result(n, sum(bits[i] ^ bits[i + lag] for i in range(n)), lag)
+
+
+def autocorrelation_result(n: int, mismatches: int, lag: int) -> StatisticalTestResult:
     z = abs(mismatches - n / 2.0) / math.sqrt(n / 4.0)
     return result_from_p(f"Autocorrelation lag {lag}", math.erfc(z / math.sqrt(2.0)), z, f"mismatches={mismatches}/{n}")
 
 
 def gf2_rank_32(rows: Sequence[int]) -> int:
+    """Rank of a GF(2) matrix whose rows are packed into integers.
+
+    Rows are reduced against a basis indexed by leading bit, so each
+    elimination step is a single integer XOR instead of a column scan.
+    """
+    basis: dict[int, int] = {}
+    for row in rows:
+        while row:
+            top = row.bit_length() - 1
+            pivot = basis.get(top)
+            if pivot is None:
+                basis[top] = row
+                break
+            row ^= pivot
+    return len(basis)
+
+
+def gf2_rank_32_reference(rows: Sequence[int]) -> int:
     work = list(rows)
     rank = 0
     for column in range(31, -1, -1):
@@ -1220,6 +1286,10 @@ def test_binary_matrix_rank(bits: Sequence[int]) -> StatisticalTestResult:
             counts[1] += 1
         else:
             counts[2] += 1
+    return binary_matrix_rank_result(matrices, counts)
+
+
+def binary_matrix_rank_result(matrices: int, counts: Sequence[int]) -> StatisticalTestResult:
     probabilities = [0.2888, 0.5776, 0.1336]
     statistic = sum((observed - matrices * p) ** 2 / (matrices * p) for observed, p in zip(counts, probabilities))
     return result_from_p("Binary Matrix Rank", math.exp(-statistic / 2.0), statistic, f"N={matrices}, ranks={counts}")
@@ -1232,8 +1302,13 @@ def test_spectral(bits: Sequence[int]) -> StatisticalTestResult:
     if np is None:
         return skip_test("Discrete Fourier Transform", "numpy is not installed")
     raw = np.frombuffer(bytes(bits), dtype=np.uint8).astype(np.float64)
+    return spectral_result(n, raw)
+
+
+def spectral_result(n: int, raw: Any) -> StatisticalTestResult:
     values = raw * 2.0 - 1.0
-    magnitudes = np.abs(np.fft.fft(values))[: n // 2]
+    # Real input: rfft yields the same first n/2 coefficients as fft in a third of the memory.
+    magnitudes = np.abs(np.fft.rfft(values))[: n // 2]
     threshold = math.sqrt(math.log(1.0 / 0.05) * n)
     observed = int(np.sum(magnitudes < threshold))
     expected = 0.95 * n / 2.0
@@ -1248,7 +1323,6 @@ def test_overlapping_template(bits: Sequence[int]) -> StatisticalTestResult:
     blocks = len(bits) // block_size
     if blocks < 50:
         return skip_test("Overlapping Template (9 ones)", f"requires at least {50 * block_size} bits")
-    pattern = [1] * m
     frequencies = [0] * 6
     for block_index in range(blocks):
         block = bits[block_index * block_size : (block_index + 1) * block_size]
@@ -1262,12 +1336,39 @@ def test_overlapping_template(bits: Sequence[int]) -> StatisticalTestResult:
             else:
                 run = 0
         frequencies[min(count, 5)] += 1
+    return overlapping_template_result(blocks, frequencies)
+
+
+def overlapping_template_result(blocks: int, frequencies: Sequence[int]) -> StatisticalTestResult:
     probabilities = [0.364091, 0.185659, 0.139381, 0.100571, 0.070432, 0.139865]
     statistic = sum((observed - blocks * p) ** 2 / (blocks * p) for observed, p in zip(frequencies, probabilities))
     return result_from_p("Overlapping Template (9 ones)", chi_square_sf(statistic, 5), statistic, f"N={blocks}, bins={frequencies}")
 
 
 def berlekamp_massey(block: Sequence[int]) -> int:
+    """Linear complexity over GF(2) with polynomials packed into integers.
+
+    Bit j of `window` holds s[index - j], so the discrepancy is the parity of
+    the connection polynomial ANDed with the window, and the polynomial update
+    is one shifted XOR.
+    """
+    c = b = 1
+    complexity = 0
+    m = -1
+    window = 0
+    for index, bit in enumerate(block):
+        window = (window << 1) | bit
+        if (c & window & ((2 << complexity) - 1)).bit_count() & 1:
+            previous = c
+            c ^= b << (index - m)
+            if complexity <= index // 2:
+                complexity = index + 1 - complexity
+                m = index
+                b = previous
+    return complexity
+
+
+def berlekamp_massey_reference(block: Sequence[int]) -> int:
     n = len(block)
     c = [0] * n
     b = [0] * n
@@ -1294,15 +1395,23 @@ def test_linear_complexity(bits: Sequence[int], block_size: int = 500) -> Statis
     available_blocks = len(bits) // block_size
     if available_blocks < 200:
         return skip_test("Linear Complexity (sampled blocks)", f"requires at least {200 * block_size} bits")
+    selected = linear_complexity_selection(available_blocks)
+    complexities = [berlekamp_massey(bits[index * block_size : (index + 1) * block_size]) for index in selected]
+    return linear_complexity_result(available_blocks, complexities, block_size)
+
+
+def linear_complexity_selection(available_blocks: int) -> list[int]:
     blocks = min(200, available_blocks)
     if available_blocks == blocks:
-        selected = list(range(blocks))
-    else:
-        selected = [round(i * (available_blocks - 1) / (blocks - 1)) for i in range(blocks)]
+        return list(range(blocks))
+    return [round(i * (available_blocks - 1) / (blocks - 1)) for i in range(blocks)]
+
+
+def linear_complexity_result(available_blocks: int, complexities: Sequence[int], block_size: int) -> StatisticalTestResult:
+    blocks = len(complexities)
     frequencies = [0] * 7
     mean = block_size / 2.0 + (9.0 + (-1.0) ** (block_size + 1)) / 36.0 - (block_size / 3.0 + 2.0 / 9.0) / (2.0 ** block_size)
-    for index in selected:
-        complexity = berlekamp_massey(bits[index * block_size : (index + 1) * block_size])
+    for complexity in complexities:
         transformed = ((-1.0) ** block_size) * (complexity - mean) + 2.0 / 9.0
         if transformed <= -2.5:
             bucket = 0
@@ -1349,8 +1458,6 @@ def test_maurer_universal(bits: Sequence[int]) -> StatisticalTestResult:
     length = maurer_parameters(n)
     if length is None:
         return skip_test("Maurer Universal", "requires at least 387840 bits")
-    expected_values = {6: 5.2177052, 7: 6.1962507, 8: 7.1836656, 9: 8.1764248, 10: 9.1723243, 11: 10.170032, 12: 11.168765, 13: 12.168070, 14: 13.167693, 15: 14.167488, 16: 15.167379}
-    variances = {6: 2.954, 7: 3.125, 8: 3.238, 9: 3.311, 10: 3.356, 11: 3.384, 12: 3.401, 13: 3.410, 14: 3.416, 15: 3.419, 16: 3.421}
     q = 10 * (1 << length)
     total_blocks = n // length
     k = total_blocks - q
@@ -1373,6 +1480,12 @@ def test_maurer_universal(bits: Sequence[int]) -> StatisticalTestResult:
         distance = i + 1 - table[value]
         table[value] = i + 1
         total += math.log2(distance)
+    return maurer_result(total, length, q, k)
+
+
+def maurer_result(total: float, length: int, q: int, k: int) -> StatisticalTestResult:
+    expected_values = {6: 5.2177052, 7: 6.1962507, 8: 7.1836656, 9: 8.1764248, 10: 9.1723243, 11: 10.170032, 12: 11.168765, 13: 12.168070, 14: 13.167693, 15: 14.167488, 16: 15.167379}
+    variances = {6: 2.954, 7: 3.125, 8: 3.238, 9: 3.311, 10: 3.356, 11: 3.384, 12: 3.401, 13: 3.410, 14: 3.416, 15: 3.419, 16: 3.421}
     fn = total / k
     correction = 0.7 - 0.8 / length + (4.0 + 32.0 / length) * (k ** (-3.0 / length)) / 15.0
     sigma = correction * math.sqrt(variances[length] / k)
@@ -1380,9 +1493,13 @@ def test_maurer_universal(bits: Sequence[int]) -> StatisticalTestResult:
     return result_from_p("Maurer Universal", p_value, fn, f"L={length}, Q={q}, K={k}")
 
 
+EXCURSION_STATES = (-4, -3, -2, -1, 1, 2, 3, 4)
+EXCURSION_VARIANT_STATES = tuple(range(-9, 0)) + tuple(range(1, 10))
+
+
 def test_random_excursions(bits: Sequence[int]) -> list[StatisticalTestResult]:
-    states = (-4, -3, -2, -1, 1, 2, 3, 4)
-    variant_states = tuple(range(-9, 0)) + tuple(range(1, 10))
+    states = EXCURSION_STATES
+    variant_states = EXCURSION_VARIANT_STATES
     cycle_histograms = {state: [0] * 6 for state in states}
     total_visits = Counter()
     cycle_visits = Counter()
@@ -1405,14 +1522,22 @@ def test_random_excursions(bits: Sequence[int]) -> list[StatisticalTestResult]:
         cycle_count += 1
         for state in states:
             cycle_histograms[state][min(cycle_visits.get(state, 0), 5)] += 1
+    return random_excursions_results(len(bits), cycle_count, cycle_histograms, total_visits)
+
 
-    minimum_cycles = max(500, int(0.005 * math.sqrt(len(bits))))
+def random_excursions_results(
+    n: int,
+    cycle_count: int,
+    cycle_histograms: dict[int, list[int]],
+    total_visits: dict[int, int],
+) -> list[StatisticalTestResult]:
+    minimum_cycles = max(500, int(0.005 * math.sqrt(n)))
     if cycle_count < minimum_cycles:
         reason = f"requires at least {minimum_cycles} zero-return cycles; observed {cycle_count}"
         return [skip_test("Random Excursions", reason), skip_test("Random Excursions Variant", reason)]
 
     p_values: list[float] = []
-    for state in states:
+    for state in EXCURSION_STATES:
         frequencies = cycle_histograms[state]
         abs_state = abs(state)
         probabilities = [0.0] * 6
@@ -1425,7 +1550,7 @@ def test_random_excursions(bits: Sequence[int]) -> list[StatisticalTestResult]:
     worst_excursion = min(p_values)
 
     variant_p_values: list[float] = []
-    for state in variant_states:
+    for state in EXCURSION_VARIANT_STATES:
         visits = total_visits.get(state, 0)
         denominator = math.sqrt(2.0 * cycle_count * (4.0 * abs(state) - 2.0))
         variant_p_values.append(math.erfc(abs(visits - cycle_count) / denominator))
@@ -1440,9 +1565,6 @@ def diagnostic_metrics(data: bytes) -> list[StatisticalTestResult]:
     if not data:
         return [StatisticalTestResult("Shannon Entropy", "INFO", details="empty sample")]
     counts = Counter(data)
-    entropy = -sum((count / len(data)) * math.log2(count / len(data)) for count in counts.values())
-    compressed = zlib.compress(data, level=9)
-    ratio = len(compressed) / len(data)
     duplicate_32 = 0
     seen: set[bytes] = set()
     for start in range(0, len(data) - 31, 32):
@@ -1450,37 +1572,851 @@ def diagnostic_metrics(data: bytes) -> list[StatisticalTestResult]:
         if block in seen:
             duplicate_32 += 1
         seen.add(block)
+    return diagnostic_results(len(data), [counts.get(value, 0) for value in range(256)], len(zlib.compress(data, level=9)), duplicate_32)
+
+
+def diagnostic_results(
+    size: int,
+    counts: Sequence[int],
+    compressed_size: int,
+    duplicate_32: int,
+    duplicate_details: str = "continuous duplicate-block sanity check",
+) -> list[StatisticalTestResult]:
+    entropy = -sum((count / size) * math.log2(count / size) for count in counts if count)
+    ratio = compressed_size / size
     return [
         StatisticalTestResult("Shannon Entropy", "INFO", statistic=entropy, details="bits per byte; diagnostic only"),
         StatisticalTestResult("Compression Ratio", "INFO", statistic=ratio, details="zlib-compressed size/original size; diagnostic only"),
-        StatisticalTestResult("Duplicate 256-bit Blocks", "PASS" if duplicate_32 == 0 else "FAIL", statistic=float(duplicate_32), details="continuous duplicate-block sanity check"),
+        StatisticalTestResult("Duplicate 256-bit Blocks", "PASS" if duplicate_32 == 0 else "FAIL", statistic=float(duplicate_32), details=duplicate_details),
     ]
 
 
-def run_builtin_tests(data: bytes) -> list[StatisticalTestResult]:
+def run_builtin_tests_python(data: bytes) -> list[StatisticalTestResult]:
     bits = bits_from_bytes(data)
     results: list[StatisticalTestResult] = []
-    results.extend(diagnostic_metrics(data))
-    results.append(test_byte_frequency(data))
-    results.append(test_monobit(bits))
-    results.append(test_block_frequency(bits))
-    results.append(test_runs(bits))
-    results.append(test_longest_run(bits))
-    results.extend(test_cumulative_sums(bits))
-    results.extend(test_serial(bits))
-    results.append(test_approximate_entropy(bits))
-    results.append(test_poker(bits))
-    for lag in (1, 2, 8, 16, 32):
-        results.append(test_autocorrelation(bits, lag))
-    results.append(test_binary_matrix_rank(bits))
-    results.append(test_spectral(bits))
-    results.append(test_overlapping_template(bits))
-    results.append(test_maurer_universal(bits))
-    results.append(test_linear_complexity(bits))
-    results.extend(test_random_excursions(bits))
+    for _, task in builtin_tasks("python"):
+        results.extend(task(data, bits))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Vectorized NumPy test engine
+# ---------------------------------------------------------------------------
+#
+# Each np_* function computes the same counts as its pure-Python reference
+# above and hands them to the shared *_result helper, so both engines derive
+# p-values from one formula. The pure-Python path stays the reference and
+# `--check-engine-parity` compares the two on fixed vectors.
+
+
+BUILTIN_ENGINES = ("auto", "numpy", "python")
+
+
+def np_bits(data: bytes) -> Any:
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+
+def np_block_values(bits: Any, width: int, count: int) -> Any:
+    return np_row_values(bits[: count * width].reshape(count, width))
+
+
+def np_row_values(blocks: Any) -> Any:
+    weights = np.left_shift(1, np.arange(blocks.shape[1] - 1, -1, -1, dtype=np.int64))
+    return blocks.astype(np.int64) @ weights
+
+
+def np_longest_runs(blocks: Any) -> Any:
+    rows, width = blocks.shape
+    padded = np.zeros((rows, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = blocks
+    edges = np.diff(padded, axis=1)
+    start_rows, start_columns = np.nonzero(edges == 1)
+    _, end_columns = np.nonzero(edges == -1)
+    best = np.zeros(rows, dtype=np.int64)
+    np.maximum.at(best, start_rows, end_columns - start_columns)
+    return best
+
+
+def np_circular_pattern_counts(bits: Any, m: int) -> list[int]:
+    n = len(bits)
+    extended = np.concatenate((bits, bits[: m - 1]))
+    values = np.zeros(n, dtype=np.uint32)
+    for offset in range(m):
+        values = (values << 1) | extended[offset : offset + n]
+    return np.bincount(values, minlength=1 << m).tolist()
+
+
+def np_test_monobit(bits: Any) -> StatisticalTestResult:
+    n = len(bits)
+    if n < 100:
+        return skip_test("Frequency (Monobit)", "requires at least 100 bits")
+    return monobit_result(n, 2 * int(np.count_nonzero(bits)) - n)
+
+
+def np_test_block_frequency(bits: Any, block_size: int = 128) -> StatisticalTestResult:
+    blocks = len(bits) // block_size
+    if blocks < 10:
+        return skip_test("Block Frequency", f"requires at least {10 * block_size} bits")
+    proportions = bits[: blocks * block_size].reshape(blocks, block_size).sum(axis=1, dtype=np.int64) / block_size
+    chi2 = float(np.sum(4.0 * block_size * (proportions - 0.5) ** 2))
+    return block_frequency_result(blocks, chi2, block_size)
+
+
+def np_test_runs(bits: Any) -> StatisticalTestResult:
+    n = len(bits)
+    if n < 100:
+        return skip_test("Runs", "requires at least 100 bits")
+    pi = int(np.count_nonzero(bits)) / n
+    if abs(pi - 0.5) >= 2.0 / math.sqrt(n):
+        return StatisticalTestResult("Runs", "FAIL", 0.0, details="monobit prerequisite failed")
+    return runs_result(n, pi, 1 + int(np.count_nonzero(bits[1:] != bits[:-1])))
+
+
+def np_test_longest_run(bits: Any) -> StatisticalTestResult:
+    n = len(bits)
+    if n < 128:
+        return skip_test("Longest Run of Ones", "requires at least 128 bits")
+    m, probabilities, lowest = longest_run_parameters(n)
+    blocks = n // m
+    longest = np_longest_runs(bits[: blocks * m].reshape(blocks, m))
+    classes = np.clip(longest - lowest, 0, len(probabilities) - 1)
+    return longest_run_result(n, np.bincount(classes, minlength=len(probabilities)).tolist())
+
+
+def np_test_cumulative_sums(bits: Any) -> list[StatisticalTestResult]:
+    n = len(bits)
+    if n < 100:
+        return [
+            skip_test("Cumulative Sums (Forward)", "requires at least 100 bits"),
+            skip_test("Cumulative Sums (Reverse)", "requires at least 100 bits"),
+        ]
+    steps = bits.astype(np.int8) * 2 - 1
+    forward_z = int(np.max(np.abs(np.cumsum(steps, dtype=np.int64))))
+    reverse_z = int(np.max(np.abs(np.cumsum(steps[::-1], dtype=np.int64))))
+    return [
+        result_from_p("Cumulative Sums (Forward)", cumulative_sums_p_from_z(n, forward_z), float(forward_z)),
+        result_from_p("Cumulative Sums (Reverse)", cumulative_sums_p_from_z(n, reverse_z), float(reverse_z)),
+    ]
+
+
+def np_test_serial(bits: Any, m: int = 3) -> list[StatisticalTestResult]:
+    n = len(bits)
+    if n < 1000:
+        return [skip_test("Serial Δ1", "requires at least 1000 bits"), skip_test("Serial Δ2", "requires at least 1000 bits")]
+    psi = [psi_squared_from_counts(np_circular_pattern_counts(bits, length), n) for length in (m, m - 1, m - 2)]
+    return serial_results(psi[0], psi[1], psi[2], m)
+
+
+def np_test_approximate_entropy(bits: Any, m: int = 3) -> StatisticalTestResult:
+    n = len(bits)
+    if n < 1000:
+        return skip_test("Approximate Entropy", "requires at least 1000 bits")
+    return approximate_entropy_result(n, np_circular_pattern_counts(bits, m), np_circular_pattern_counts(bits, m + 1), m)
+
+
+def np_test_poker(bits: Any, m: int = 4) -> StatisticalTestResult:
+    blocks = len(bits) // m
+    if blocks < 100:
+        return skip_test("Poker", f"requires at least {100 * m} bits")
+    counts = np.bincount(np_block_values(bits, m, blocks), minlength=1 << m).tolist()
+    return poker_result(blocks, counts, m)
+
+
+def np_test_byte_frequency(data: bytes) -> StatisticalTestResult:
+    if len(data) < 256:
+        return skip_test("Byte Frequency Chi-Square", "requires at least 256 bytes")
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256).tolist()
+    return byte_frequency_result(len(data), counts)
+
+
+def np_test_autocorrelation(bits: Any, lag: int) -> StatisticalTestResult:
+    n = len(bits) - lag
+    if n < 1000:
+        return skip_test(f"Autocorrelation lag {lag}", "requires at least 1000 comparable bits")
+    return autocorrelation_result(n, int(np.count_nonzero(bits[:n] != bits[lag : lag + n])), lag)
+
+
+def np_test_binary_matrix_rank(bits: Any) -> StatisticalTestResult:
+    matrix_bits = 32 * 32
+    matrices = len(bits) // matrix_bits
+    if matrices < 38:
+        return skip_test("Binary Matrix Rank", f"requires at least {38 * matrix_bits} bits")
+    return binary_matrix_rank_result(matrices, np_matrix_rank_counts(bits[: matrices * matrix_bits].reshape(matrices, matrix_bits)))
+
+
+def np_gf2_ranks(rows: Any, width: int = 32) -> Any:
+    """Ranks of many GF(2) matrices at once.
+
+    `rows` is an (matrices, height) array of rows packed into uint64 words.
+    Gauss-Jordan elimination runs column by column in lock step across every
+    matrix, so the Python loop is over columns rather than matrices.
+    """
+    work = rows.astype(np.uint64)
+    matrices, height = work.shape
+    used = np.zeros((matrices, height), dtype=bool)
+    for column in range(width - 1, -1, -1):
+        has_bit = (work >> np.uint64(column)) & np.uint64(1) == 1
+        candidates = has_bit & ~used
+        found = np.flatnonzero(candidates.any(axis=1))
+        if not found.size:
+            continue
+        pivots = candidates[found].argmax(axis=1)
+        used[found, pivots] = True
+        pivot_rows = work[found, pivots]
+        eliminate = has_bit[found]
+        eliminate[np.arange(found.size), pivots] = False
+        work[found] ^= np.where(eliminate, pivot_rows[:, None], np.uint64(0))
+    return used.sum(axis=1)
+
+
+def np_matrix_rank_counts(blocks: Any) -> list[int]:
+    """Classify 1024-bit rows as full rank, rank 31 or lower, like the reference."""
+    rows = np_row_values(blocks.reshape(-1, 32)).reshape(-1, 32)
+    ranks = np_gf2_ranks(rows)
+    return [int(np.count_nonzero(ranks == 32)), int(np.count_nonzero(ranks == 31)), int(np.count_nonzero(ranks < 31))]
+
+
+def np_test_spectral(bits: Any) -> StatisticalTestResult:
+    n = len(bits)
+    if n < 1000:
+        return skip_test("Discrete Fourier Transform", "requires at least 1000 bits")
+    return spectral_result(n, bits.astype(np.float64))
+
+
+def np_test_overlapping_template(bits: Any) -> StatisticalTestResult:
+    m = 9
+    block_size = 1032
+    blocks = len(bits) // block_size
+    if blocks < 50:
+        return skip_test("Overlapping Template (9 ones)", f"requires at least {50 * block_size} bits")
+    return overlapping_template_result(blocks, np_template_frequencies(bits[: blocks * block_size].reshape(blocks, block_size), m))
+
+
+def np_template_frequencies(blocks: Any, m: int = 9) -> list[int]:
+    """Histogram of overlapping all-ones windows of width m per block, capped at 5."""
+    prefix = np.zeros((blocks.shape[0], blocks.shape[1] + 1), dtype=np.int32)
+    np.cumsum(blocks, axis=1, out=prefix[:, 1:])
+    counts = np.count_nonzero(prefix[:, m:] - prefix[:, :-m] == m, axis=1)
+    return np.bincount(np.minimum(counts, 5), minlength=6).tolist()
+
+
+def np_test_linear_complexity(bits: Any, block_size: int = 500) -> StatisticalTestResult:
+    available_blocks = len(bits) // block_size
+    if available_blocks < 200:
+        return skip_test("Linear Complexity (sampled blocks)", f"requires at least {200 * block_size} bits")
+    blocks = bits[: available_blocks * block_size].reshape(available_blocks, block_size)
+    # BM shifts each block's polynomial by a different amount every step, so
+    # there is no lock-step numpy form; the word-packed kernel runs per row.
+    complexities = [berlekamp_massey(block) for block in blocks[linear_complexity_selection(available_blocks)].tolist()]
+    return linear_complexity_result(available_blocks, complexities, block_size)
+
+
+def np_test_maurer_universal(bits: Any) -> StatisticalTestResult:
+    length = maurer_parameters(len(bits))
+    if length is None:
+        return skip_test("Maurer Universal", "requires at least 387840 bits")
+    q = 10 * (1 << length)
+    k = len(bits) // length - q
+    if k <= 0:
+        return skip_test("Maurer Universal", "insufficient post-initialization blocks")
+    values = np_block_values(bits, length, q + k)
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    same = ordered[1:] == ordered[:-1]
+    previous = np.full(q + k, -1, dtype=np.int64)
+    previous[order[1:][same]] = order[:-1][same]
+    distances = np.arange(q, q + k, dtype=np.int64) - previous[q:]
+    # cumsum adds left to right like the reference loop, keeping the total bit-identical.
+    return maurer_result(float(np.cumsum(np.log2(distances))[-1]), length, q, k)
+
+
+def np_test_random_excursions(bits: Any) -> list[StatisticalTestResult]:
+    positions = np.cumsum(bits.astype(np.int8) * 2 - 1, dtype=np.int64)
+    zero = positions == 0
+    cycle_count = int(np.count_nonzero(zero)) + (1 if len(positions) and positions[-1] != 0 else 0)
+    cycle_ids = np.cumsum(zero) - zero
+    cycle_histograms: dict[int, list[int]] = {}
+    for state in EXCURSION_STATES:
+        visits = np.bincount(cycle_ids[positions == state], minlength=cycle_count)
+        cycle_histograms[state] = np.bincount(np.minimum(visits, 5), minlength=6).tolist()
+    nearby = positions[np.abs(positions) <= 9]
+    visit_counts = np.bincount(nearby + 9, minlength=19).tolist()
+    total_visits = {state: visit_counts[state + 9] for state in EXCURSION_VARIANT_STATES}
+    return random_excursions_results(len(bits), cycle_count, cycle_histograms, total_visits)
+
+
+def np_diagnostic_metrics(data: bytes) -> list[StatisticalTestResult]:
+    if not data:
+        return [StatisticalTestResult("Shannon Entropy", "INFO", details="empty sample")]
+    array = np.frombuffer(data, dtype=np.uint8)
+    blocks = len(data) // 32
+    unique_blocks = len(np.unique(array[: blocks * 32].view(np.dtype((np.void, 32))))) if blocks else 0
+    counts = np.bincount(array, minlength=256).tolist()
+    return diagnostic_results(len(data), counts, len(zlib.compress(data, level=9)), blocks - unique_blocks)
+
+
+def run_builtin_tests_numpy(data: bytes) -> list[StatisticalTestResult]:
+    bits = np_bits(data)
+    results: list[StatisticalTestResult] = []
+    for _, task in builtin_tasks("numpy"):
+        results.extend(task(data, bits))
     return results
 
 
+# ---------------------------------------------------------------------------
+# Streaming (constant-memory) test engine
+# ---------------------------------------------------------------------------
+
+
+STREAM_CHUNK_BYTES = 1024 * 1024
+# Bit-level work runs on steps of this size whatever the chunk size, because
+# per-bit arrays cost several times the step in memory (2M bits per step).
+STREAM_STEP_BYTES = 256 * 1024
+STREAM_SPECTRAL_BYTES = 1024 * 1024
+STREAM_DUPLICATE_BLOCKS = 1 << 20
+PATTERN_LENGTHS = (1, 2, 3, 4)
+AUTOCORRELATION_LAGS = (1, 2, 8, 16, 32)
+
+
+def step_offset(value: int) -> int:
+    """Clamp a walk offset into int32; no step moves further than 2**21 anyway."""
+    return max(-(1 << 30), min(1 << 30, value))
+
+
+class BlockFeeder:
+    """Regroups chunks of a bit stream into complete fixed-width blocks."""
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.emitted = 0
+        self.pending = np.zeros(0, dtype=np.uint8)
+
+    def feed(self, bits: Any) -> Any:
+        if self.pending.size:
+            bits = np.concatenate((self.pending, bits))
+        blocks = len(bits) // self.width
+        used = blocks * self.width
+        self.pending = bits[used:].copy()
+        self.emitted += blocks
+        return bits[:used].reshape(blocks, self.width)
+
+
+class StreamingBattery:
+    """Running accumulators for the built-in battery over a byte stream.
+
+    Chunks may have any size; each is processed in STREAM_STEP_BYTES steps.
+    Only per-test counters, histograms, the last few bits, partially filled
+    blocks and the bounded duplicate-block set are retained between steps, so
+    memory does not grow with the stream: about 550 MB peak RSS for any file
+    size, most of it the final DFT over the STREAM_SPECTRAL_BYTES prefix and
+    the duplicate-block set. Results are identical to the in-memory NumPy
+    engine, except that the DFT test and the duplicate-block check cover only
+    a bounded prefix of very large streams.
+    """
+
+    def __init__(self, total_bytes: int) -> None:
+        if np is None:
+            raise RuntimeError("streaming tests require numpy")
+        self.total_bytes = total_bytes
+        self.n = total_bytes * 8
+        self.consumed = 0
+        self.head = np.zeros(0, dtype=np.uint8)
+        self.tail = np.zeros(0, dtype=np.uint8)
+
+        self.byte_counts = np.zeros(256, dtype=np.int64)
+        self.compressor = zlib.compressobj(level=9)
+        self.compressed_size = 0
+        self.seen_blocks: set[bytes] = set()
+        self.duplicate_blocks = 0
+        self.checked_blocks = 0
+        self.partial_block = b""
+        self.spectral_prefix = bytearray()
+
+        self.ones = 0
+        self.transitions = 0
+        self.position = 0
+        self.position_min = 0
+        self.position_max = 0
+        self.forward_z = 0
+        self.pattern_counts = {length: np.zeros(1 << length, dtype=np.int64) for length in PATTERN_LENGTHS}
+        self.mismatches = {lag: 0 for lag in AUTOCORRELATION_LAGS}
+
+        self.frequency_feeder = BlockFeeder(128)
+        self.frequency_chi2 = 0.0
+        self.longest_m, probabilities, self.longest_lowest = longest_run_parameters(self.n)
+        self.longest_feeder = BlockFeeder(self.longest_m)
+        self.longest_frequencies = np.zeros(len(probabilities), dtype=np.int64)
+        self.poker_feeder = BlockFeeder(4)
+        self.poker_counts = np.zeros(16, dtype=np.int64)
+        self.rank_feeder = BlockFeeder(1024)
+        self.rank_counts = [0, 0, 0]
+        self.template_feeder = BlockFeeder(1032)
+        self.template_frequencies = np.zeros(6, dtype=np.int64)
+
+        self.maurer_length = maurer_parameters(self.n)
+        if self.maurer_length is not None:
+            self.maurer_feeder = BlockFeeder(self.maurer_length)
+            self.maurer_q = 10 * (1 << self.maurer_length)
+            self.maurer_k = self.n // self.maurer_length - self.maurer_q
+            self.maurer_table = np.zeros(1 << self.maurer_length, dtype=np.int64)
+            self.maurer_total = 0.0
+
+        self.linear_available = self.n // 500
+        self.linear_feeder = BlockFeeder(500)
+        self.linear_selected = set(linear_complexity_selection(self.linear_available)) if self.linear_available >= 200 else set()
+        self.linear_complexities: list[int] = []
+
+        self.cycle_count = 0
+        self.cycle_histograms = np.zeros((len(EXCURSION_STATES), 6), dtype=np.int64)
+        self.open_cycle_visits = np.zeros(len(EXCURSION_STATES), dtype=np.int64)
+        self.variant_visits = np.zeros(19, dtype=np.int64)
+
+    def update(self, chunk: bytes) -> None:
+        for start in range(0, len(chunk), STREAM_STEP_BYTES):
+            self._update_step(chunk[start : start + STREAM_STEP_BYTES])
+
+    def _update_step(self, chunk: bytes) -> None:
+        data = np.frombuffer(chunk, dtype=np.uint8)
+        bits = np.unpackbits(data)
+        self._update_bytes(chunk, data)
+        self._update_walk(bits)
+        self._update_overlapping(bits)
+        self._update_blocks(bits)
+        if len(self.head) < 3:
+            self.head = np.concatenate((self.head, bits[: 3 - len(self.head)]))
+        self.tail = np.concatenate((self.tail, bits[-max(AUTOCORRELATION_LAGS) :]))[-max(AUTOCORRELATION_LAGS) :]
+        self.consumed += len(bits)
+
+    def _update_bytes(self, chunk: bytes, data: Any) -> None:
+        self.byte_counts += np.bincount(data, minlength=256)
+        self.compressed_size += len(self.compressor.compress(chunk))
+        if len(self.spectral_prefix) < STREAM_SPECTRAL_BYTES:
+            self.spectral_prefix.extend(chunk[: STREAM_SPECTRAL_BYTES - len(self.spectral_prefix)])
+        if self.checked_blocks >= STREAM_DUPLICATE_BLOCKS:
+            return
+        pending = self.partial_block + bytes(chunk)
+        usable = min(len(pending) // 32, STREAM_DUPLICATE_BLOCKS - self.checked_blocks)
+        for start in range(0, usable * 32, 32):
+            block = pending[start : start + 32]
+            if block in self.seen_blocks:
+                self.duplicate_blocks += 1
+            self.seen_blocks.add(block)
+        self.checked_blocks += usable
+        self.partial_block = pending[usable * 32 :] if self.checked_blocks < STREAM_DUPLICATE_BLOCKS else b""
+
+    def _update_walk(self, bits: Any) -> None:
+        self.ones += int(np.count_nonzero(bits))
+        self.transitions += int(np.count_nonzero(bits[1:] != bits[:-1]))
+        if self.tail.size and self.tail[-1] != bits[0]:
+            self.transitions += 1
+
+        # Walk positions relative to the start of the step fit in int32; the
+        # absolute position (any size) is only added to scalars.
+        origin = self.position
+        relative = np.cumsum(bits.astype(np.int8) * 2 - 1, dtype=np.int32)
+        low, high = origin + int(relative.min()), origin + int(relative.max())
+        self.forward_z = max(self.forward_z, abs(low), abs(high))
+        self.position_min = min(self.position_min, low)
+        self.position_max = max(self.position_max, high)
+        self.position = origin + int(relative[-1])
+
+        zero = relative == step_offset(-origin)
+        closed = int(np.count_nonzero(zero))
+        cycle_ids = np.cumsum(zero, dtype=np.int32) - zero
+        for index, state in enumerate(EXCURSION_STATES):
+            visits = np.bincount(cycle_ids[relative == step_offset(state - origin)], minlength=closed + 1)
+            visits[0] += self.open_cycle_visits[index]
+            self.cycle_histograms[index] += np.bincount(np.minimum(visits[:closed], 5), minlength=6)
+            self.open_cycle_visits[index] = visits[closed]
+        self.cycle_count += closed
+        nearby = relative[(relative >= step_offset(-9 - origin)) & (relative <= step_offset(9 - origin))]
+        if nearby.size:
+            self.variant_visits += np.bincount(nearby + (origin + 9), minlength=19)
+
+    def _update_overlapping(self, bits: Any) -> None:
+        """Pattern and autocorrelation counts for windows ending inside this chunk."""
+        history = np.concatenate((self.tail, bits))
+        known = len(self.tail)
+        for length, counts in self.pattern_counts.items():
+            start = max(0, known - (length - 1))
+            count = len(history) - length + 1 - start
+            if count <= 0:
+                continue
+            values = np.zeros(count, dtype=np.uint32)
+            for offset in range(length):
+                values = (values << 1) | history[start + offset : start + offset + count]
+            counts += np.bincount(values, minlength=1 << length)
+        for lag in AUTOCORRELATION_LAGS:
+            start = max(0, known - lag)
+            stop = len(history) - lag
+            if stop > start:
+                self.mismatches[lag] += int(np.count_nonzero(history[start:stop] != history[start + lag : stop + lag]))
+
+    def _update_blocks(self, bits: Any) -> None:
+        blocks = self.frequency_feeder.feed(bits)
+        proportions = blocks.sum(axis=1, dtype=np.int64) / 128
+        self.frequency_chi2 += float(np.sum(4.0 * 128 * (proportions - 0.5) ** 2))
+
+        blocks = self.longest_feeder.feed(bits)
+        if len(blocks):
+            classes = np.clip(np_longest_runs(blocks) - self.longest_lowest, 0, len(self.longest_frequencies) - 1)
+            self.longest_frequencies += np.bincount(classes, minlength=len(self.longest_frequencies))
+
+        self.poker_counts += np.bincount(np_row_values(self.poker_feeder.feed(bits)), minlength=16)
+
+        blocks = self.rank_feeder.feed(bits)
+        if len(blocks):
+            for index, count in enumerate(np_matrix_rank_counts(blocks)):
+                self.rank_counts[index] += count
+
+        blocks = self.template_feeder.feed(bits)
+        if len(blocks):
+            self.template_frequencies += np.array(np_template_frequencies(blocks), dtype=np.int64)
+
+        if self.maurer_length is not None:
+            self._update_maurer(bits)
+
+        first = self.linear_feeder.emitted
+        blocks = self.linear_feeder.feed(bits)
+        wanted = [offset for offset in range(len(blocks)) if first + offset in self.linear_selected]
+        if wanted:
+            self.linear_complexities.extend(berlekamp_massey(block) for block in blocks[wanted].tolist())
+
+    def _update_maurer(self, bits: Any) -> None:
+        first = self.maurer_feeder.emitted
+        blocks = self.maurer_feeder.feed(bits)
+        limit = self.maurer_q + self.maurer_k - first
+        if limit <= 0 or not len(blocks):
+            return
+        values = np_row_values(blocks[:limit])
+        indices = np.arange(first, first + len(values), dtype=np.int64)
+        previous = self.maurer_table[values] - 1
+        order = np.argsort(values, kind="stable")
+        ordered = values[order]
+        same = ordered[1:] == ordered[:-1]
+        previous[order[1:][same]] = indices[order[:-1][same]]
+        np.maximum.at(self.maurer_table, values, indices + 1)
+        tested = indices >= self.maurer_q
+        if np.any(tested):
+            logs = np.log2(indices[tested] - previous[tested])
+            self.maurer_total = float(np.cumsum(np.concatenate(([self.maurer_total], logs)))[-1])
+
+    def _pattern_counts(self, length: int) -> list[int]:
+        """Add the windows that wrap from the end of the stream to its start."""
+        counts = self.pattern_counts[length].copy()
+        if length > 1:
+            wrap = np.concatenate((self.tail[-(length - 1) :], self.head[: length - 1]))
+            for start in range(length - 1):
+                value = 0
+                for bit in wrap[start : start + length]:
+                    value = (value << 1) | int(bit)
+                counts[value] += 1
+        return counts.tolist()
+
+    def results(self) -> list[StatisticalTestResult]:
+        n = self.consumed
+        if n != self.n:
+            raise ValueError(f"stream ended after {n // 8} of {self.total_bytes} bytes")
+        results: list[StatisticalTestResult] = []
+        if n == 0:
+            results.append(StatisticalTestResult("Shannon Entropy", "INFO", details="empty sample"))
+        else:
+            self.compressed_size += len(self.compressor.flush())
+            duplicate_details = "continuous duplicate-block sanity check"
+            if self.checked_blocks < self.total_bytes // 32:
+                duplicate_details += f" over the first {self.checked_blocks} blocks"
+            results.extend(diagnostic_results(self.total_bytes, self.byte_counts.tolist(), self.compressed_size, self.duplicate_blocks, duplicate_details))
+
+        if self.total_bytes < 256:
+            results.append(skip_test("Byte Frequency Chi-Square", "requires at least 256 bytes"))
+        else:
+            results.append(byte_frequency_result(self.total_bytes, self.byte_counts.tolist()))
+
+        if n < 100:
+            results.append(skip_test("Frequency (Monobit)", "requires at least 100 bits"))
+        else:
+            results.append(monobit_result(n, 2 * self.ones - n))
+
+        blocks = n // 128
+        if blocks < 10:
+            results.append(skip_test("Block Frequency", f"requires at least {10 * 128} bits"))
+        else:
+            results.append(block_frequency_result(blocks, self.frequency_chi2, 128))
+
+        pi = self.ones / n if n else 0.0
+        if n < 100:
+            results.append(skip_test("Runs", "requires at least 100 bits"))
+        elif abs(pi - 0.5) >= 2.0 / math.sqrt(n):
+            results.append(StatisticalTestResult("Runs", "FAIL", 0.0, details="monobit prerequisite failed"))
+        else:
+            results.append(runs_result(n, pi, 1 + self.transitions))
+
+        if n < 128:
+            results.append(skip_test("Longest Run of Ones", "requires at least 128 bits"))
+        else:
+            results.append(longest_run_result(n, self.longest_frequencies.tolist()))
+
+        if n < 100:
+            results.append(skip_test("Cumulative Sums (Forward)", "requires at least 100 bits"))
+            results.append(skip_test("Cumulative Sums (Reverse)", "requires at least 100 bits"))
+        else:
+            reverse_z = max(self.position - self.position_min, self.position_max - self.position)
+            results.append(result_from_p("Cumulative Sums (Forward)", cumulative_sums_p_from_z(n, self.forward_z), float(self.forward_z)))
+            results.append(result_from_p("Cumulative Sums (Reverse)", cumulative_sums_p_from_z(n, reverse_z), float(reverse_z)))
+
+        if n < 1000:
+            results.extend([skip_test("Serial Δ1", "requires at least 1000 bits"), skip_test("Serial Δ2", "requires at least 1000 bits")])
+            results.append(skip_test("Approximate Entropy", "requires at least 1000 bits"))
+        else:
+            psi = [psi_squared_from_counts(self._pattern_counts(length), n) for length in (3, 2, 1)]
+            results.extend(serial_results(psi[0], psi[1], psi[2], 3))
+            results.append(approximate_entropy_result(n, self._pattern_counts(3), self._pattern_counts(4), 3))
+
+        blocks = n // 4
+        if blocks < 100:
+            results.append(skip_test("Poker", f"requires at least {100 * 4} bits"))
+        else:
+            results.append(poker_result(blocks, self.poker_counts.tolist(), 4))
+
+        for lag in AUTOCORRELATION_LAGS:
+            if n - lag < 1000:
+                results.append(skip_test(f"Autocorrelation lag {lag}", "requires at least 1000 comparable bits"))
+            else:
+                results.append(autocorrelation_result(n - lag, self.mismatches[lag], lag))
+
+        matrices = n // 1024
+        if matrices < 38:
+            results.append(skip_test("Binary Matrix Rank", f"requires at least {38 * 1024} bits"))
+        else:
+            results.append(binary_matrix_rank_result(matrices, self.rank_counts))
+
+        spectral = np_test_spectral(np_bits(bytes(self.spectral_prefix)))
+        if len(self.spectral_prefix) < self.total_bytes and spectral.status != "SKIP":
+            spectral.details += f"; first {len(self.spectral_prefix)} bytes only"
+        results.append(spectral)
+
+        blocks = n // 1032
+        if blocks < 50:
+            results.append(skip_test("Overlapping Template (9 ones)", f"requires at least {50 * 1032} bits"))
+        else:
+            results.append(overlapping_template_result(blocks, self.template_frequencies.tolist()))
+
+        if self.maurer_length is None:
+            results.append(skip_test("Maurer Universal", "requires at least 387840 bits"))
+        elif self.maurer_k <= 0:
+            results.append(skip_test("Maurer Universal", "insufficient post-initialization blocks"))
+        else:
+            results.append(maurer_result(self.maurer_total, self.maurer_length, self.maurer_q, self.maurer_k))
+
+        if self.linear_available < 200:
+            results.append(skip_test("Linear Complexity (sampled blocks)", f"requires at least {200 * 500} bits"))
+        else:
+            results.append(linear_complexity_result(self.linear_available, self.linear_complexities, 500))
+
+        cycle_count = self.cycle_count
+        cycle_histograms = {state: self.cycle_histograms[index].tolist() for index, state in enumerate(EXCURSION_STATES)}
+        if self.position != 0:
+            cycle_count += 1
+            for index, state in enumerate(EXCURSION_STATES):
+                cycle_histograms[state][min(int(self.open_cycle_visits[index]), 5)] += 1
+        visits = self.variant_visits.tolist()
+        total_visits = {state: visits[state + 9] for state in EXCURSION_VARIANT_STATES}
+        results.extend(random_excursions_results(n, cycle_count, cycle_histograms, total_visits))
+        return results
+
+
+def run_streaming_tests(path: Path, chunk_bytes: int = STREAM_CHUNK_BYTES) -> list[StatisticalTestResult]:
+    """Run the built-in battery over an entire file through a read-only mmap."""
+    size = path.stat().st_size
+    battery = StreamingBattery(size)
+    if size:
+        with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, size, chunk_bytes):
+                battery.update(mapped[start : start + chunk_bytes])
+    return battery.results()
+
+
+# ---------------------------------------------------------------------------
+# Engine selection and parity
+# ---------------------------------------------------------------------------
+
+
+def select_engine(engine: str) -> str:
+    if engine not in BUILTIN_ENGINES:
+        raise ValueError(f"unknown test engine: {engine}")
+    if engine == "auto":
+        return "numpy" if np is not None else "python"
+    if engine == "numpy" and np is None:
+        raise RuntimeError("the numpy test engine requires numpy")
+    return engine
+
+
+BuiltinTask = Callable[[bytes, Any], list[StatisticalTestResult]]
+
+
+def builtin_tasks(engine: str) -> list[tuple[str, BuiltinTask]]:
+    """Independent units of the built-in battery, in report order.
+
+    Each task takes the raw sample and its bit expansion for the given engine
+    and returns its results, so tasks can run in any process and be reassembled.
+    """
+    if engine == "numpy":
+        return [
+            ("Diagnostics", lambda data, bits: np_diagnostic_metrics(data)),
+            ("Byte Frequency Chi-Square", lambda data, bits: [np_test_byte_frequency(data)]),
+            ("Frequency (Monobit)", lambda data, bits: [np_test_monobit(bits)]),
+            ("Block Frequency", lambda data, bits: [np_test_block_frequency(bits)]),
+            ("Runs", lambda data, bits: [np_test_runs(bits)]),
+            ("Longest Run of Ones", lambda data, bits: [np_test_longest_run(bits)]),
+            ("Cumulative Sums", lambda data, bits: np_test_cumulative_sums(bits)),
+            ("Serial", lambda data, bits: np_test_serial(bits)),
+            ("Approximate Entropy", lambda data, bits: [np_test_approximate_entropy(bits)]),
+            ("Poker", lambda data, bits: [np_test_poker(bits)]),
+            *[
+                (f"Autocorrelation lag {lag}", lambda data, bits, lag=lag: [np_test_autocorrelation(bits, lag)])
+                for lag in AUTOCORRELATION_LAGS
+            ],
+            ("Binary Matrix Rank", lambda data, bits: [np_test_binary_matrix_rank(bits)]),
+            ("Discrete Fourier Transform", lambda data, bits: [np_test_spectral(bits)]),
+            ("Overlapping Template (9 ones)", lambda data, bits: [np_test_overlapping_template(bits)]),
+            ("Maurer Universal", lambda data, bits: [np_test_maurer_universal(bits)]),
+            ("Linear Complexity (sampled blocks)", lambda data, bits: [np_test_linear_complexity(bits)]),
+            ("Random Excursions", lambda data, bits: np_test_random_excursions(bits)),
+        ]
+    return [
+        ("Diagnostics", lambda data, bits: diagnostic_metrics(data)),
+        ("Byte Frequency Chi-Square", lambda data, bits: [test_byte_frequency(data)]),
+        ("Frequency (Monobit)", lambda data, bits: [test_monobit(bits)]),
+        ("Block Frequency", lambda data, bits: [test_block_frequency(bits)]),
+        ("Runs", lambda data, bits: [test_runs(bits)]),
+        ("Longest Run of Ones", lambda data, bits: [test_longest_run(bits)]),
+        ("Cumulative Sums", lambda data, bits: test_cumulative_sums(bits)),
+        ("Serial", lambda data, bits: test_serial(bits)),
+        ("Approximate Entropy", lambda data, bits: [test_approximate_entropy(bits)]),
+        ("Poker", lambda data, bits: [test_poker(bits)]),
+        *[
+            (f"Autocorrelation lag {lag}", lambda data, bits, lag=lag: [test_autocorrelation(bits, lag)])
+            for lag in AUTOCORRELATION_LAGS
+        ],
+        ("Binary Matrix Rank", lambda data, bits: [test_binary_matrix_rank(bits)]),
+        ("Discrete Fourier Transform", lambda data, bits: [test_spectral(bits)]),
+        ("Overlapping Template (9 ones)", lambda data, bits: [test_overlapping_template(bits)]),
+        ("Maurer Universal", lambda data, bits: [test_maurer_universal(bits)]),
+        ("Linear Complexity (sampled blocks)", lambda data, bits: [test_linear_complexity(bits)]),
+        ("Random Excursions", lambda data, bits: test_random_excursions(bits)),
+    ]
+
+
+def run_builtin_tests(data: bytes, engine: str = "auto") -> list[StatisticalTestResult]:
+    if select_engine(engine) == "numpy":
+        return run_builtin_tests_numpy(data)
+    return run_builtin_tests_python(data)
+
+
+def engine_parity_vectors() -> list[tuple[str, bytes]]:
+    """Fixed, reproducible samples that reach every size branch of the battery."""
+
+    def stream(label: bytes, size: int) -> bytes:
+        return hashlib.shake_256(DOMAIN + label).digest(size)
+
+    biased = bytes(a & b for a, b in zip(stream(b"parity-bias-a", 16384), stream(b"parity-bias-b", 16384)))
+    balanced = bytes(value for value in stream(b"parity-balanced", 65536) if bin(value).count("1") == 4)[:8192]
+    runs = bytearray(stream(b"parity-runs", 65536))
+    for start in range(0, len(runs), 64):
+        runs[start : start + 2] = b"\xff\xff"
+    return [
+        ("random-512", stream(b"parity-512", 512)),
+        ("random-2k", stream(b"parity-2k", 2048)),
+        ("random-128k", stream(b"parity-128k", 131072)),
+        ("biased-16k", biased),
+        ("balanced-8k", balanced),
+        ("long-runs-64k", bytes(runs)),
+    ]
+
+
+def run_streaming_battery(data: bytes, chunk_bytes: int) -> list[StatisticalTestResult]:
+    battery = StreamingBattery(len(data))
+    for start in range(0, len(data), chunk_bytes):
+        battery.update(data[start : start + chunk_bytes])
+    return battery.results()
+
+
+def check_engine_parity(console: Console) -> int:
+    """Run every engine on the fixed vectors and return the number of mismatches."""
+    if np is None:
+        console.error("Engine parity check requires numpy.")
+        return 1
+    mismatches = 0
+    for label, data in engine_parity_vectors():
+        reference = run_builtin_tests_python(data)
+        candidates = {
+            "numpy": run_builtin_tests_numpy(data),
+            # An odd chunk size puts every block and pattern window across chunk boundaries.
+            "streaming": run_streaming_battery(data, 4099),
+        }
+        for engine, results in candidates.items():
+            if [item.name for item in reference] != [item.name for item in results]:
+                console.error(f"[MISMATCH] {label}: {engine} returned a different test list")
+                mismatches += 1
+                continue
+            for expected, actual in zip(reference, results):
+                if expected != actual:
+                    console.error(f"[MISMATCH] {label}: {expected.name} python=({expected.status}, {expected.p_value}, {expected.statistic}) {engine}=({actual.status}, {actual.p_value}, {actual.statistic})")
+                    mismatches += 1
+        console.good(f"[CHECKED] {label}: {len(reference)} results compared against {', '.join(candidates)}")
+    return mismatches
+
+
+def blocks_per_second(function: Callable[[], Any], blocks: int) -> tuple[Any, float]:
+    started = time.perf_counter()
+    outcome = function()
+    return outcome, blocks / max(time.perf_counter() - started, 1e-9)
+
+
+def benchmark_gf2_kernels(console: Console, matrices: int = 4096, sequences: int = 400, block_size: int = 500) -> int:
+    """Report blocks/second for the reference and fast GF(2) kernels; return mismatches."""
+    stream = hashlib.shake_256(DOMAIN + b"gf2-benchmark").digest(matrices * 128 + sequences * block_size)
+    rows = [list(struct.unpack(">32I", stream[offset : offset + 128])) for offset in range(0, matrices * 128, 128)]
+    sequence_bits = [byte & 1 for byte in stream[matrices * 128 :]]
+    blocks = [sequence_bits[offset : offset + block_size] for offset in range(0, len(sequence_bits), block_size)]
+
+    kernels: list[tuple[str, int, list[tuple[str, Callable[[], Any]]]]] = [
+        (
+            "Binary matrix rank (32x32)",
+            matrices,
+            [
+                ("reference", lambda: [gf2_rank_32_reference(matrix) for matrix in rows]),
+                ("word-packed", lambda: [gf2_rank_32(matrix) for matrix in rows]),
+            ],
+        ),
+        (
+            f"Berlekamp-Massey (M={block_size})",
+            sequences,
+            [
+                ("reference", lambda: [berlekamp_massey_reference(block) for block in blocks]),
+                ("word-packed", lambda: [berlekamp_massey(block) for block in blocks]),
+            ],
+        ),
+    ]
+    if np is not None:
+        packed_rows = np.array(rows, dtype=np.uint64)
+        kernels[0][2].append(("numpy batch", lambda: np_gf2_ranks(packed_rows).tolist()))
+
+    mismatches = 0
+    for title, count, variants in kernels:
+        console.info(title)
+        expected: Optional[list[int]] = None
+        for label, function in variants:
+            outcome, rate = blocks_per_second(function, count)
+            if expected is None:
+                expected = outcome
+            elif outcome != expected:
+                console.error(f"    [MISMATCH] {label} disagrees with the reference kernel")
+                mismatches += 1
+            console.good(f"    {label:12s} {rate:14,.0f} blocks/s")
+    return mismatches
+
+
 # ---------------------------------------------------------------------------
 # Optional test integrations
 # ---------------------------------------------------------------------------
@@ -1635,6 +2571,99 @@ def run_practrand(path: Path, timeout: int) -> tuple[list[StatisticalTestResult]
         return [StatisticalTestResult("PractRand battery", "ERROR", details="timeout", suite="PractRand")], {"installed": True, "version": command_version(command)}
 
 
+# ---------------------------------------------------------------------------
+# Test scheduling
+# ---------------------------------------------------------------------------
+
+
+_WORKER_STATE: dict[str, Any] = {}
+
+
+class InlineExecutor:
+    """Executor stand-in that runs each call immediately; used for --jobs 1."""
+
+    def submit(self, function: Callable[..., Any], *arguments: Any) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(function(*arguments))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def __enter__(self) -> "InlineExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+def init_builtin_worker(data: bytes, engine: str) -> None:
+    """Expand the sample once per worker process instead of once per task."""
+    _WORKER_STATE["data"] = data
+    _WORKER_STATE["engine"] = engine
+    _WORKER_STATE["bits"] = np_bits(data) if engine == "numpy" else bits_from_bytes(data)
+
+
+def run_builtin_task(index: int) -> list[StatisticalTestResult]:
+    _, task = builtin_tasks(_WORKER_STATE["engine"])[index]
+    return task(_WORKER_STATE["data"], _WORKER_STATE["bits"])
+
+
+def timed_call(function: Callable[..., Any], *arguments: Any) -> tuple[Any, float]:
+    started = time.perf_counter()
+    outcome = function(*arguments)
+    return outcome, time.perf_counter() - started
+
+
+def run_test_schedule(args: argparse.Namespace, data: bytes, streaming: bool) -> tuple[list[StatisticalTestResult], dict[str, Any], list[dict[str, Any]]]:
+    """Run every enabled suite, concurrently when --jobs > 1.
+
+    CPU-bound built-in tasks and the nistrng battery go to a process pool; the
+    external tools are subprocesses and only need threads to wait on them.
+    Results are collected in submission order, so the report does not depend
+    on which task finishes first.
+    """
+    engine = select_engine(args.engine)
+    external: list[tuple[str, Callable[[Path, int], tuple[list[StatisticalTestResult], dict[str, Any]]]]] = []
+    if args.external_tests in {"auto", "all"}:
+        external.extend([("rngtest", run_rngtest), ("ent", run_ent)])
+    if args.external_tests == "all":
+        external.extend([("dieharder", run_dieharder), ("PractRand", run_practrand)])
+
+    if args.jobs == 1:
+        init_builtin_worker(data, engine)
+        processes: Any = InlineExecutor()
+        threads: Any = InlineExecutor()
+    else:
+        processes = ProcessPoolExecutor(max_workers=args.jobs, initializer=init_builtin_worker, initargs=(data, engine))
+        threads = ThreadPoolExecutor(max_workers=max(1, len(external)))
+
+    with processes, threads:
+        external_futures = [(name, threads.submit(timed_call, runner, args.output, args.external_timeout)) for name, runner in external]
+        internal_futures: list[tuple[str, str, Future]] = []
+        if streaming:
+            internal_futures.append(("Streaming built-in battery", "built-in", processes.submit(timed_call, run_streaming_tests, args.output, args.stream_chunk_bytes)))
+        elif not args.no_builtin_tests:
+            for index, (label, _) in enumerate(builtin_tasks(engine)):
+                internal_futures.append((label, "built-in", processes.submit(timed_call, run_builtin_task, index)))
+        if not args.no_nistrng:
+            internal_futures.append(("NIST SP 800-22 package battery", "nistrng", processes.submit(timed_call, run_nistrng_tests, data)))
+
+        results: list[StatisticalTestResult] = []
+        timings: list[dict[str, Any]] = []
+        for label, suite, future in internal_futures:
+            outcome, seconds = future.result()
+            results.extend(outcome)
+            timings.append({"task": label, "suite": suite, "seconds": seconds})
+        external_tools: dict[str, Any] = {}
+        for name, future in external_futures:
+            (outcome, meta), seconds = future.result()
+            results.extend(outcome)
+            external_tools[name] = meta
+            timings.append({"task": name, "suite": name, "seconds": seconds})
+    return results, external_tools, timings
+
+
 # ---------------------------------------------------------------------------
 # Generation, reporting and CLI
 # ---------------------------------------------------------------------------
@@ -1658,27 +2687,59 @@ def build_auxiliary_digest(sources: Sequence[SourceResult]) -> bytes:
     return h.digest()
 
 
-def create_output(path: Path, size: int, drbg: HmacDrbgSha512, overwrite: bool) -> str:
-    flags = os.O_WRONLY | os.O_CREAT
+def output_regions(size: int, workers: int) -> list[tuple[int, int]]:
+    """Split [0, size) into at most `workers` contiguous, chunk-aligned regions."""
+    chunks = math.ceil(size / OUTPUT_CHUNK)
+    per_worker = math.ceil(chunks / max(1, min(workers, chunks))) * OUTPUT_CHUNK
+    return [(start, min(size, start + per_worker)) for start in range(0, size, per_worker)]
+
+
+def fill_output_region(path: Path, start: int, end: int, drbg: HmacDrbgSha512) -> None:
+    """XOR fresh OS-CSPRNG bytes with the DRBG stream directly into the mapped file."""
+    mask = bytearray(OUTPUT_CHUNK)
+    with path.open("r+b") as handle, mmap.mmap(handle.fileno(), 0) as mapped:
+        for offset in range(start, end, OUTPUT_CHUNK):
+            count = min(OUTPUT_CHUNK, end - offset)
+            block = mask if count == OUTPUT_CHUNK else bytearray(count)
+            drbg.generate_into(block, struct.pack(">QQ", offset, end - offset))
+            mapped[offset : offset + count] = xor_bytes(secrets.token_bytes(count), block)
+        mapped.flush()
+
+
+def fill_output_region_worker(path: Path, start: int, end: int, seed_material: bytes) -> None:
+    fill_output_region(path, start, end, HmacDrbgSha512(seed_material))
+
+
+def create_output(path: Path, size: int, drbg: HmacDrbgSha512, overwrite: bool, workers: int = 1) -> str:
+    """Write `size` output bytes into a preallocated, memory-mapped file.
+
+    With several workers, each region of the file gets its own DRBG instance,
+    seeded from the parent DRBG with the region bounds as additional input, and
+    is filled by a separate process.
+    """
+    flags = os.O_RDWR | os.O_CREAT
     flags |= os.O_TRUNC if overwrite else os.O_EXCL
     fd = os.open(path, flags, 0o600)
-    sha256 = hashlib.sha256()
-    remaining = size
-    counter = 0
     try:
-        with os.fdopen(fd, "wb", buffering=0) as handle:
-            while remaining:
-                count = min(OUTPUT_CHUNK, remaining)
-                os_bytes = secrets.token_bytes(count)
-                additional = struct.pack(">QQ", counter, remaining)
-                mask = drbg.generate(count, additional)
-                output = xor_bytes(os_bytes, mask)
-                handle.write(output)
-                sha256.update(output)
-                remaining -= count
-                counter += 1
-            handle.flush()
+        with os.fdopen(fd, "r+b", buffering=0) as handle:
+            handle.truncate(size)
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(handle.fileno(), 0, size)
+                except OSError:
+                    pass
+            regions = output_regions(size, workers)
+            if len(regions) == 1:
+                fill_output_region(path, 0, size, drbg)
+            else:
+                seeds = [drbg.generate(128, frame(b"output-region", struct.pack(">QQQ", index, start, end))) for index, (start, end) in enumerate(regions)]
+                with ProcessPoolExecutor(max_workers=len(regions)) as pool:
+                    futures = [pool.submit(fill_output_region_worker, path, start, end, seed) for (start, end), seed in zip(regions, seeds)]
+                    for future in futures:
+                        future.result()
             os.fsync(handle.fileno())
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest = hashlib.sha256(mapped).hexdigest()
     except Exception:
         try:
             path.unlink(missing_ok=True)
@@ -1689,7 +2750,7 @@ def create_output(path: Path, size: int, drbg: HmacDrbgSha512, overwrite: bool)
         os.chmod(path, 0o600)
     except OSError:
         pass
-    return sha256.hexdigest()
+    return digest
 
 
 def load_test_sample(path: Path, max_bytes: int) -> tuple[bytes, bool]:
@@ -1760,14 +2821,23 @@ def display_tests(console: Console, results: Sequence[StatisticalTestResult]) ->
             console.info(text)
 
 
+def display_timings(console: Console, timings: Sequence[dict[str, Any]], wall_seconds: float) -> None:
+    console.section("Test timing")
+    for timing in timings:
+        console.info(f"{timing['seconds']:9.3f} s  {timing['suite']}: {timing['task']}")
+    total = sum(timing["seconds"] for timing in timings)
+    console.info(f"{wall_seconds:9.3f} s  wall clock for {total:.3f} s of test work")
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Collect auxiliary hardware/human noise and generate N encryption-safe bytes using a mandatory OS CSPRNG.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
-    parser.add_argument("--bytes", "-n", type=int, required=True, dest="size", help="number of output bytes")
-    parser.add_argument("--output", "-o", type=Path, required=True, help="binary output file")
+    parser.add_argument("--bytes", "-n", type=int, dest="size", help="number of output bytes (required)")
+    parser.add_argument("--output", "-o", type=Path, help="binary output file (required)")
     parser.add_argument("--overwrite", action="store_true", help="replace an existing output file")
+    parser.add_argument("--drbg-workers", type=int, default=1, help="independently seeded DRBG worker processes filling disjoint regions of the output")
     parser.add_argument("--print-hex", action="store_true", help="print output as hex when size is at most 4096 bytes")
     parser.add_argument("--json-report", type=Path, help="write a machine-readable JSON report")
     parser.add_argument("--save-raw-symbols", type=Path, help="save pre-conditioning symbol streams for offline analysis")
@@ -1803,9 +2873,15 @@ def parse_args() -> argparse.Namespace:
 
     tests = parser.add_argument_group("test suites")
     tests.add_argument("--no-built-in-tests", dest="no_builtin_tests", action="store_true")
+    tests.add_argument("--engine", choices=BUILTIN_ENGINES, default="auto", help="built-in test engine; auto uses numpy when it is installed")
+    tests.add_argument("--check-engine-parity", action="store_true", help="compare the numpy, streaming and pure-Python engines on fixed vectors and exit")
+    tests.add_argument("--benchmark-kernels", action="store_true", help="report blocks/second for the reference and fast GF(2) rank and Berlekamp-Massey kernels and exit")
+    tests.add_argument("--stream-tests", action="store_true", help="run the built-in battery over the whole output file in bounded memory (about 550 MB peak RSS whatever the file size); --max-test-bytes then bounds only the nistrng sample")
+    tests.add_argument("--stream-chunk-bytes", type=int, default=STREAM_CHUNK_BYTES, help="bytes read per chunk by --stream-tests; bits are processed in 256 KiB steps, so this adds only the chunk itself to peak memory")
     tests.add_argument("--no-nistrng", action="store_true", help="do not attempt the optional nistrng SP 800-22 battery")
     tests.add_argument("--external-tests", choices=("none", "auto", "all"), default="auto", help="auto runs lightweight installed tools; all additionally runs Dieharder and PractRand")
     tests.add_argument("--external-timeout", type=int, default=300)
+    tests.add_argument("--jobs", "-j", type=int, default=min(4, os.cpu_count() or 1), help="worker processes for built-in tests; external tools run concurrently when above 1")
 
     parser.add_argument("--no-color", action="store_true")
     parser.add_argument("--quiet", action="store_true")
@@ -1813,10 +2889,21 @@ def parse_args() -> argparse.Namespace:
 
 
 def validate_args(args: argparse.Namespace) -> None:
+    if args.size is None or args.output is None:
+        raise ValueError("--bytes and --output are required")
+    select_engine(args.engine)
     if args.size <= 0 or args.size > MAX_OUTPUT_BYTES:
         raise ValueError(f"--bytes must be between 1 and {MAX_OUTPUT_BYTES}")
     if args.max_test_bytes <= 0:
         raise ValueError("--max-test-bytes must be positive")
+    if args.drbg_workers <= 0:
+        raise ValueError("--drbg-workers must be positive")
+    if args.jobs <= 0:
+        raise ValueError("--jobs must be positive")
+    if args.stream_chunk_bytes <= 0:
+        raise ValueError("--stream-chunk-bytes must be positive")
+    if args.stream_tests and np is None:
+        raise ValueError("--stream-tests requires numpy")
     if args.require_healthy_sources < 0:
         raise ValueError("--require-healthy-sources cannot be negative")
     if args.output.exists() and not args.overwrite:
@@ -1829,6 +2916,19 @@ def main() -> int:
     console = Console(color=not args.no_color and sys.stdout.isatty(), quiet=args.quiet)
     warnings: list[str] = []
 
+    if args.check_engine_parity:
+        console.section("Engine parity")
+        mismatches = check_engine_parity(console)
+        if mismatches:
+            console.error(f"{mismatches} engine parity mismatch(es).")
+            return 3
+        console.good("The numpy, streaming and pure-Python engines agree on every fixed vector.")
+        return 0
+
+    if args.benchmark_kernels:
+        console.section("GF(2) kernel benchmark")
+        return 3 if benchmark_gf2_kernels(console) else 0
+
     try:
         validate_args(args)
     except Exception as exc:
@@ -1894,43 +2994,36 @@ def main() -> int:
     drbg = HmacDrbgSha512(os_seed + auxiliary_digest + personalization)
 
     console.section("Generation")
+    started = time.perf_counter()
     try:
-        output_sha256 = create_output(args.output, args.size, drbg, args.overwrite)
+        output_sha256 = create_output(args.output, args.size, drbg, args.overwrite, args.drbg_workers)
     except Exception as exc:
         console.error(f"Output generation failed: {exc}")
         return 2
+    generation_seconds = time.perf_counter() - started
+    generation_mb_per_s = args.size / (1024 * 1024) / max(generation_seconds, 1e-9)
     console.good(f"Wrote {args.size} bytes to {args.output}")
     console.info(f"SHA-256: {output_sha256}")
-
-    test_data, tested_full = load_test_sample(args.output, min(args.max_test_bytes, args.size))
-    if not tested_full:
-        warning = f"Statistical tests cover only the first {len(test_data)} of {args.size} output bytes."
+    console.info(f"Throughput: {generation_mb_per_s:.1f} MB/s in {generation_seconds:.3f} s with {args.drbg_workers} DRBG worker(s)")
+
+    streaming = args.stream_tests and not args.no_builtin_tests
+    test_data, sample_full = b"", True
+    if not streaming or not args.no_nistrng:
+        test_data, sample_full = load_test_sample(args.output, min(args.max_test_bytes, args.size))
+    tested_bytes = args.size if streaming else len(test_data)
+    tested_full = streaming or sample_full
+    if not sample_full:
+        scope = "The nistrng battery covers" if streaming else "Statistical tests cover"
+        warning = f"{scope} only the first {len(test_data)} of {args.size} output bytes."
         warnings.append(warning)
         console.warn(warning)
 
-    test_results: list[StatisticalTestResult] = []
-    external_tools: dict[str, Any] = {}
-    if not args.no_builtin_tests:
-        test_results.extend(run_builtin_tests(test_data))
-    if not args.no_nistrng:
-        test_results.extend(run_nistrng_tests(test_data))
-
-    if args.external_tests in {"auto", "all"}:
-        rng_results, rng_meta = run_rngtest(args.output, args.external_timeout)
-        test_results.extend(rng_results)
-        external_tools["rngtest"] = rng_meta
-        ent_results, ent_meta = run_ent(args.output, args.external_timeout)
-        test_results.extend(ent_results)
-        external_tools["ent"] = ent_meta
-    if args.external_tests == "all":
-        dieharder_results, dieharder_meta = run_dieharder(args.output, args.external_timeout)
-        test_results.extend(dieharder_results)
-        external_tools["dieharder"] = dieharder_meta
-        practrand_results, practrand_meta = run_practrand(args.output, args.external_timeout)
-        test_results.extend(practrand_results)
-        external_tools["PractRand"] = practrand_meta
+    started = time.perf_counter()
+    test_results, external_tools, test_timings = run_test_schedule(args, test_data, streaming)
+    test_wall_seconds = time.perf_counter() - started
 
     display_tests(console, test_results)
+    display_timings(console, test_timings, test_wall_seconds)
 
     failures = [result for result in test_results if result.status == "FAIL"]
     errors = [result for result in test_results if result.status == "ERROR"]
@@ -1960,10 +3053,15 @@ def main() -> int:
         output_path=str(args.output.resolve()),
         output_bytes=args.size,
         output_sha256=output_sha256,
-        tested_bytes=len(test_data),
+        drbg_workers=args.drbg_workers,
+        generation_seconds=generation_seconds,
+        generation_mb_per_s=generation_mb_per_s,
+        tested_bytes=tested_bytes,
         tested_full_output=tested_full,
         sources=[source.report_dict() for source in sources],
         tests=[asdict(result) for result in test_results],
+        test_timings=test_timings,
+        test_wall_seconds=test_wall_seconds,
         external_tools=external_tools,
         warnings=warnings + ["Passing statistical tests does not prove entropy or provide SP 800-90B validation."],
     )
@@ -5,11 +5,14 @@ import yaml
 import sys
 import argparse
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from collections import defaultdict
 import threading
 import json
 import re
+import hashlib
+import sqlite3
+import zlib
 import email
 from email import policy
 from email.parser import BytesParser
@@ -57,6 +60,8 @@ class Statistics:
         self.keyword_counts = defaultdict(lambda: defaultdict(int))
         self.filetype_counts = defaultdict(int)
         self.files_with_multiple_keywords = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def update_keyword_group(self, group):
         with self.lock:
@@ -74,16 +79,99 @@ class Statistics:
         with self.lock:
             self.files_with_multiple_keywords += 1
 
+    def record(self, found, filetype):
+        """Merge one file's result (as returned by a worker) into the totals."""
+        with self.lock:
+            for group, keywords in found.items():
+                self.keyword_group_counts[group] += 1
+                for keyword in keywords:
+                    self.keyword_counts[group][keyword] += 1
+            if len(found) > 1:
+                self.files_with_multiple_keywords += 1
+            self.filetype_counts[filetype] += 1
+
+    def record_cache(self, hit):
+        with self.lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
     def to_dict(self):
         with self.lock:
+            lookups = self.cache_hits + self.cache_misses
             return {
                 "Keyword_Groups": {k: v for k, v in self.keyword_group_counts.items()},
                 "Keywords": {k: dict(v) for k, v in self.keyword_counts.items()},
                 "FileTypes": {k: v for k, v in self.filetype_counts.items()},
-                "Files_With_Multiple_Keywords": self.files_with_multiple_keywords
+                "Files_With_Multiple_Keywords": self.files_with_multiple_keywords,
+                "Text_Cache": {
+                    "Hits": self.cache_hits,
+                    "Misses": self.cache_misses,
+                    "Hit_Rate": round(self.cache_hits / lookups, 4) if lookups else 0.0
+                }
             }
 
 
+# Persistent store of extracted text, so reruns only re-extract changed files
+class TextCache:
+    """Extracted text in SQLite, zlib-compressed, keyed by path, size, mtime
+    and SHA-256 of the file content.
+
+    A file whose size and mtime still match its row is a hit without being
+    read. Otherwise its content hash is looked up, which also catches files
+    that were touched, moved or copied without changing. Workers only read;
+    the main process does all writes (WAL mode lets both happen at once)."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS texts ("
+            " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL, text BLOB NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS texts_sha256 ON texts (sha256)")
+        self.conn.commit()
+        self.pending = 0
+
+    @staticmethod
+    def _sha256(file_path):
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def lookup(self, file_path):
+        """Returns (compressed text or None, key). `key` is the
+        (path, size, mtime_ns, sha256) row to store, or None if the row is current."""
+        path = str(Path(file_path).resolve())
+        st = os.stat(file_path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, text FROM texts WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2], None
+        key = (path, st.st_size, st.st_mtime_ns, self._sha256(file_path))
+        row = self.conn.execute(
+            "SELECT text FROM texts WHERE sha256 = ? AND size = ? LIMIT 1", (key[3], key[1])).fetchone()
+        return (row[0] if row else None), key
+
+    def store(self, key, blob):
+        self.conn.execute("INSERT OR REPLACE INTO texts VALUES (?, ?, ?, ?, ?)", (*key, blob))
+        self.pending += 1
+        if self.pending >= 500:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
 # Function to load and validate configuration
 def load_config(config_path):
     with open(config_path, 'r', encoding='utf-8') as f:
@@ -104,10 +192,10 @@ def load_config(config_path):
 
 
 # Function to setup logging
-def setup_logging(log_file):
+def setup_logging(log_file, filemode='w'):
     logging.basicConfig(
         filename=log_file,
-        filemode='w',
+        filemode=filemode,
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
@@ -244,39 +332,89 @@ def extract_text_from_xml(element):
     return text_content
 
 
-# Function to compile regex patterns for all keywords
+def _is_word(ch):
+    # Same definition as \w in a str pattern
+    return ch.isalnum() or ch == '_'
+
+
+def _trie_pattern(keywords):
+    """Regex for a set of literal keywords, factored into a trie so the engine
+    follows one branch per character instead of trying every keyword in turn.
+    Optional tails are greedy, so each match is the longest keyword at its start."""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def walk(node):
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return walk(trie)
+
+
+class KeywordMatcher:
+    """All keywords of all groups, matched in a single pass over the text.
+
+    One trie-shaped regex finds every keyword occurrence (a lookahead, so
+    overlapping hits such as 'data' inside 'data breach' are all seen), and
+    each hit is then checked against the boundary rule the per-keyword patterns
+    used: \b...\b for single words, (?<!\w)...(?!\w) for phrases."""
+
+    def __init__(self, keyword_groups):
+        # lowercased keyword -> [(group, keyword as configured)]
+        self.owners = defaultdict(list)
+        for group, keywords in keyword_groups.items():
+            for keyword in keywords:
+                needle = str(keyword).lower()
+                if not needle:
+                    logging.error(f"Empty keyword in group '{group}' ignored.")
+                    continue
+                self.owners[needle].append((group, keyword))
+        self.regex = re.compile('(?=(' + _trie_pattern(self.owners) + '))') if self.owners else None
+
+    @staticmethod
+    def _bounded(text, start, end, phrase):
+        before = start > 0 and _is_word(text[start - 1])
+        after = end < len(text) and _is_word(text[end])
+        if phrase:
+            return not before and not after
+        return _is_word(text[start]) != before and _is_word(text[end - 1]) != after
+
+    def search(self, text_content):
+        found_groups = {}
+        if self.regex is None:
+            return found_groups
+        seen = set()
+        for match in self.regex.finditer(text_content):
+            start, hit = match.start(), match.group(1)
+            # The match is the longest keyword here; shorter ones may share its start.
+            for end in range(len(hit), 0, -1):
+                needle = hit[:end]
+                if needle in seen or needle not in self.owners:
+                    continue
+                if self._bounded(text_content, start, start + end, ' ' in needle):
+                    seen.add(needle)
+                    for group, keyword in self.owners[needle]:
+                        found_groups.setdefault(group, set()).add(keyword)
+            if len(seen) == len(self.owners):
+                break
+        return found_groups
+
+
+# Function to compile all keywords into a single matcher
 def compile_keyword_patterns(keyword_groups):
-    compiled_patterns = {}
-    for group, keywords in keyword_groups.items():
-        compiled_patterns[group] = []
-        for keyword in keywords:
-            # Escape regex special characters in keyword
-            escaped_keyword = re.escape(keyword.lower())
-            # Determine if keyword is a single word or a phrase
-            if ' ' in keyword:
-                # For phrases, use word boundaries around the entire phrase
-                pattern = r'(?<!\w)' + escaped_keyword + r'(?!\w)'
-            else:
-                # For single words, use word boundaries
-                pattern = r'\b' + escaped_keyword + r'\b'
-            try:
-                compiled = re.compile(pattern)
-                compiled_patterns[group].append((keyword, compiled))
-            except re.error as e:
-                logging.error(f"Invalid regex pattern for keyword '{keyword}' in group '{group}': {e}")
-    return compiled_patterns
+    return KeywordMatcher(keyword_groups)
 
 
-# Function to search keywords in text using compiled regex patterns
-def search_keywords(text_content, compiled_patterns):
-    found_groups = {}
-    for group, patterns in compiled_patterns.items():
-        for keyword, pattern in patterns:
-            if pattern.search(text_content):
-                if group not in found_groups:
-                    found_groups[group] = set()
-                found_groups[group].add(keyword)
-    return found_groups
+# Function to search keywords in text using the compiled matcher
+def search_keywords(text_content, matcher):
+    return matcher.search(text_content)
 
 
 # Function to handle file copying with naming conflict resolution
@@ -306,30 +444,70 @@ def copy_file_to_groups(file_path, groups, output_dir):
     return copied_groups
 
 
-# Function to process a single file
-def process_file(file_path, compiled_patterns, output_dir, stats):
-    logging.info(f"Processing file: {file_path}")
+# Per-process matcher and text cache, set up once by the pool initializer
+_matcher = None
+_cache = None
+
+
+def _init_worker(keyword_groups, log_file, cache_path):
+    global _matcher, _cache
+    if not logging.getLogger().handlers:
+        # Spawned (not forked) workers start without the parent's logging
+        setup_logging(log_file, filemode='a')
+    _matcher = compile_keyword_patterns(keyword_groups)
+    _cache = TextCache(cache_path) if cache_path else None
+
+
+# Function to get a file's text, from the cache if it is unchanged.
+# Returns (text, hit, entry); hit is None without a cache, and entry is the
+# (key, compressed text) row the main process should store, if any.
+def cached_text(file_path, cache):
+    if cache is None:
+        return extract_text(file_path), None, None
+    try:
+        blob, key = cache.lookup(file_path)
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"Text cache lookup failed for {file_path}: {e}")
+        return extract_text(file_path), False, None
+    if blob is not None:
+        return zlib.decompress(blob).decode('utf-8'), True, (key, blob) if key else None
     text_content = extract_text(file_path)
-    if text_content:
-        found = search_keywords(text_content, compiled_patterns)
-        if found:
-            # Update statistics
-            for group, keywords in found.items():
-                stats.update_keyword_group(group)
-                for keyword in keywords:
-                    stats.update_keyword(group, keyword)
-            if len(found) > 1:
-                stats.increment_multiple_keywords()
-            # Copy file to corresponding group folders
-            copied_groups = copy_file_to_groups(file_path, found.keys(), output_dir)
-            # Log found keywords
-            for group, keywords in found.items():
-                for keyword in keywords:
-                    logging.info(f"Found keyword '{keyword}' in {file_path} for group '{group}'")
-        # Update filetype statistics
-        stats.update_filetype(file_path.suffix.lower())
-    else:
+    # Empty results are not stored: they are usually read errors worth retrying.
+    entry = (key, zlib.compress(text_content.encode('utf-8'), 6)) if text_content else None
+    return text_content, False, entry
+
+
+# Function to extract and match a single file (runs in a worker process).
+# Returns (file_path, found groups or None if no text was extracted, cache hit, cache entry).
+def scan_file(file_path, matcher=None, cache=None):
+    logging.info(f"Processing file: {file_path}")
+    text_content, hit, entry = cached_text(file_path, cache or _cache)
+    if not text_content:
         logging.warning(f"No text extracted from {file_path}")
+        return file_path, None, hit, entry
+    return file_path, search_keywords(text_content, matcher or _matcher), hit, entry
+
+
+# Function to record a scanned file: cache, statistics and group folders (main process)
+def process_result(file_path, found, hit, entry, output_dir, stats, cache=None):
+    if hit is not None:
+        stats.record_cache(hit)
+    if entry and cache is not None:
+        try:
+            cache.store(*entry)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not cache text of {file_path}: {e}")
+    if found is None:
+        return
+    if found:
+        # Copy file to corresponding group folders
+        copy_file_to_groups(file_path, found.keys(), output_dir)
+        # Log found keywords
+        for group, keywords in found.items():
+            for keyword in keywords:
+                logging.info(f"Found keyword '{keyword}' in {file_path} for group '{group}'")
+    # Update statistics
+    stats.record(found, file_path.suffix.lower())
 
 
 # Function to generate statistics output
@@ -345,10 +523,9 @@ def generate_statistics(stats, output_dir):
 
 
 # Main function
-def main(data_dir, config_path, output_dir, log_file):
+def main(data_dir, config_path, output_dir, log_file, workers=None, cache_path=None):
     setup_logging(log_file)
     keyword_groups = load_config(config_path)
-    compiled_patterns = compile_keyword_patterns(keyword_groups)
     stats = Statistics()
     data_path = Path(data_dir)
     if not data_path.exists():
@@ -380,20 +557,40 @@ def main(data_dir, config_path, output_dir, log_file):
         logging.info("No supported files found to process.")
         return
 
-    # Define number of threads (you can adjust this number based on your system)
-    max_workers = min(32, os.cpu_count() + 4)
+    # Extraction and matching are CPU-bound, so they run in worker processes;
+    # copying and statistics stay in this process.
+    workers = max(1, workers or os.cpu_count() or 1)
+    logging.info(f"Scanning {len(all_files)} files with {workers} worker(s).")
 
-    # Process files in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(process_file, file_path, compiled_patterns, output_path, stats)
-            for file_path in all_files
-        ]
-        for future in as_completed(futures):
-            try:
-                future.result()
-            except Exception as e:
-                logging.error(f"Unhandled exception during file processing: {e}")
+    cache = None
+    if cache_path:
+        try:
+            cache = TextCache(cache_path)
+            logging.info(f"Using text cache {cache_path}")
+        except sqlite3.Error as e:
+            logging.error(f"Cannot open text cache {cache_path}, extracting everything: {e}")
+            cache_path = None
+
+    try:
+        if workers == 1:
+            matcher = compile_keyword_patterns(keyword_groups)
+            for file_path in all_files:
+                try:
+                    process_result(*scan_file(file_path, matcher, cache), output_path, stats, cache)
+                except Exception as e:
+                    logging.error(f"Unhandled exception during file processing: {e}")
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(keyword_groups, log_file, cache_path)) as executor:
+                futures = {executor.submit(scan_file, file_path): file_path for file_path in all_files}
+                for future in as_completed(futures):
+                    try:
+                        process_result(*future.result(), output_path, stats, cache)
+                    except Exception as e:
+                        logging.error(f"Unhandled exception during file processing of {futures[future]}: {e}")
+    finally:
+        if cache is not None:
+            cache.close()
 
     # Generate statistics output
     generate_statistics(stats, output_path)
@@ -407,5 +604,10 @@ if __name__ == "__main__":
     parser.add_argument('--config', default='./config.yaml', help="Path to the config.yaml file (default: ./config.yaml)")
     parser.add_argument('--output', default='./output', help="Directory to store copied files (default: ./output)")
     parser.add_argument('--log', default='./script.log', help="Log file path (default: ./script.log)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for extraction and matching (default: CPU count; 1 = no pool)")
+    parser.add_argument('--cache', default='./text_cache.sqlite',
+                        help="SQLite cache of extracted text, reused by later runs (default: ./text_cache.sqlite)")
+    parser.add_argument('--no-cache', action='store_true', help="Extract every file, without reading or writing the cache")
     args = parser.parse_args()
-    main(args.data, args.config, args.output, args.log)
+    main(args.data, args.config, args.output, args.log, args.workers, None if args.no_cache else args.cache)
@@ -17,6 +17,11 @@ from collections import defaultdict
 import subprocess
 import re
 
+try:
+    import ipranges  # offline ASN / geo ranges, see ipranges.py
+except ImportError:
+    ipranges = None
+
 # API Configuration
 API_CONFIG = {
     "geolocation_apis": {
@@ -35,6 +40,11 @@ API_KEYS = {
     "viewdns": os.getenv("VIEWDNS_API_KEY", "demo")
 }
 
+# Offline range database (ipranges.py). When it covers an address, the remote
+# geolocation / ASN APIs are skipped unless --online is given.
+OFFLINE_DB = None
+PREFER_ONLINE = False
+
 # Visualization characters
 MAP_CHARS = {
     "target": "★",
@@ -73,10 +83,48 @@ def api_request(url, max_retries=3, timeout=5):
             return {"error": f"API request failed: {str(e)}"}
     return {"error": "Max retries exceeded"}
 
+def get_offline_location(ip):
+    """Location from the offline database in ipinfo's shape, or None"""
+    if OFFLINE_DB is None:
+        return None
+    asn, geo = OFFLINE_DB.asn(ip), OFFLINE_DB.geo(ip)
+    if not asn and not geo:
+        return None
+
+    # Unknown fields are left out, not set to None, as the online sources do
+    data = {"ip": ip, "source": "offline"}
+    if geo:
+        data.update({k: geo[k] for k in ("city", "region", "country") if geo[k]})
+        if geo["latitude"] is not None and geo["longitude"] is not None:
+            data["loc"] = f"{geo['latitude']},{geo['longitude']}"
+    if asn:
+        data["org"] = f"AS{asn['asn']} {asn['org'] or ''}".strip()
+        if asn["country"]:
+            data.setdefault("country", asn["country"])
+
+    sources = OFFLINE_DB.header["sources"]
+    data["complete"] = bool((asn or "asn" not in sources) and (geo or "geo" not in sources))
+    return data
+
+def primary_location(geo_data):
+    """The location record the rest of the report is built from"""
+    return geo_data.get("ipinfo") or geo_data.get("offline") or {}
+
+def asn_from_org(org):
+    """'AS15169 Google LLC' -> 'AS15169'"""
+    match = re.match(r"\s*(AS\d+)", org or "", re.IGNORECASE)
+    return match.group(1).upper() if match else None
+
 def get_geolocation_data(ip):
-    """Get geolocation from multiple sources"""
+    """Get geolocation from multiple sources (offline database first)"""
     results = {}
     apis = API_CONFIG["geolocation_apis"]
+
+    offline = get_offline_location(ip)
+    if offline:
+        results["offline"] = offline
+        if offline["complete"] and not PREFER_ONLINE:
+            return results
     
     # Query all geolocation APIs
     for service, url_template in apis.items():
@@ -95,12 +143,27 @@ def get_asn_data(asn):
     """Get detailed ASN information"""
     if not asn.startswith("AS"):
         asn = f"AS{asn}"
-    
+
+    local = OFFLINE_DB.asn_info(asn) if OFFLINE_DB else None
+    offline_data = None
+    if local:
+        offline_data = {
+            "asn": local["asn"],
+            "name": local["org"],
+            "description": local["org"],
+            "country": local["country"] or "Unknown",
+            "rank": "Unknown",
+            "type": "Unknown",
+            "ipv4_prefixes": "Unknown"
+        }
+        if not PREFER_ONLINE:
+            return offline_data
+
     url = API_CONFIG["asn_api"].format(asn)
     data = api_request(url)
     
     if "error" in data:
-        return {"error": data["error"]}
+        return offline_data or {"error": data["error"]}
     
     # Extract relevant ASN information
     asn_data = data.get("data", {}).get("asn", {})
@@ -184,7 +247,7 @@ def parse_traceroute(output, target_ip):
                 "hop": hop_num,
                 "ip": hop_ip,
                 "hostname": get_reverse_dns(hop_ip),
-                "location": get_geolocation_data(hop_ip).get("ipinfo", {})
+                "location": primary_location(get_geolocation_data(hop_ip))
             })
         
         # Match target line
@@ -194,7 +257,7 @@ def parse_traceroute(output, target_ip):
                 "hop": hop_num + 1 if hops else 1,
                 "ip": target_ip,
                 "hostname": get_reverse_dns(target_ip),
-                "location": get_geolocation_data(target_ip).get("ipinfo", {}),
+                "location": primary_location(get_geolocation_data(target_ip)),
                 "target": True
             })
             break
@@ -353,7 +416,7 @@ def create_visualization(traceroute_data, geo_data):
     
     # Get target coordinates
     target_ip = traceroute_data[-1]["ip"]
-    target_geo = geo_data.get("ipinfo", {})
+    target_geo = primary_location(geo_data)
     
     if "loc" not in target_geo:
         return "Target coordinates unavailable"
@@ -514,7 +577,14 @@ def main():
     parser.add_argument("ip", help="IP address to analyze")
     parser.add_argument("--history", action="store_true", help="Show historical data")
     parser.add_argument("--map", action="store_true", help="Generate network path visualization")
+    parser.add_argument("--db", help="Offline IP range database (default: $IPRANGES_DB or ./ipranges.db)")
+    parser.add_argument("--online", action="store_true",
+                        help="Query the remote APIs even when the offline database has an answer")
     args = parser.parse_args()
+
+    global OFFLINE_DB, PREFER_ONLINE
+    OFFLINE_DB = ipranges.open_db(args.db) if ipranges else None
+    PREFER_ONLINE = args.online
     
     # Validate IP
     if not validate_ip(args.ip):
@@ -522,14 +592,15 @@ def main():
         sys.exit(1)
     
     print(f"\n\033[1;35m=== ADVANCED IP GEOLOCATION ANALYSIS ===\033[0m")
-    print(f"Target IP: \033[1;32m{args.ip}\033[0m ({'IPv4' if get_ip_version(args.ip) == 4 else 'IPv6'})\n")
+    print(f"Target IP: \033[1;32m{args.ip}\033[0m ({'IPv4' if get_ip_version(args.ip) == 4 else 'IPv6'})")
+    print(f"Offline DB: {OFFLINE_DB.path if OFFLINE_DB else 'not found - remote APIs only'}\n")
     
     # Start analysis
     print("\033[1;34m[1/6] Gathering geolocation data from multiple sources...\033[0m")
     geo_data = get_geolocation_data(args.ip)
     
     # Get ASN information
-    asn = geo_data.get("ipinfo", {}).get("org", "").split("-")[0] if "ipinfo" in geo_data else None
+    asn = asn_from_org(primary_location(geo_data).get("org"))
     asn_data = get_asn_data(asn) if asn else {}
     
     # Reverse DNS analysis
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Offline IP range database - ASN and geolocation lookups without the network.
+
+Build it once from free CSV dumps, then look addresses up with a binary search
+over the memory-mapped file (a few microseconds each, no API rate limits):
+
+    python3 ipranges.py build --asn ip2asn-combined.tsv.gz --geo dbip-city-lite-2025-01.csv.gz
+    python3 ipranges.py lookup 8.8.8.8 2001:4860:4860::8888
+
+Sources (plain or .gz):
+  --asn  iptoasn.com   ip2asn-combined.tsv    start, end, AS number, country, AS description
+  --geo  db-ip.com     dbip-city-lite-*.csv   start, end, continent, country, region, city, lat, lon
+
+Used by geoloc_ip.py and tracert_web/app.py, which consult it first and only
+call their remote APIs for addresses it does not cover. The file is found via
+$IPRANGES_DB, or ipranges.db next to this script.
+
+File layout
+  b"IPRANGES" | u32 header length | JSON header | sections
+  Range sections hold fixed-width records sorted by start address: start, end
+  (4 or 16 bytes, big-endian, so byte order is numeric order) and a u32 index
+  into a value table. Value tables are JSON snippets behind a u32 offset array;
+  identical values are stored once, so ~500k ASN ranges need only ~80k entries.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import ipaddress
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+MAGIC = b"IPRANGES"
+DEFAULT_PATH = os.environ.get("IPRANGES_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "ipranges.db")
+
+
+# ─── BUILD ────────────────────────────────────────────────────────────────────
+
+def _open_text(path):
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="replace", newline="")
+    return open(path, encoding="utf-8", errors="replace", newline="")
+
+
+def _rows(path):
+    with _open_text(path) as fh:
+        delimiter = "\t" if ".tsv" in path else ","
+        for row in csv.reader(fh, delimiter=delimiter):
+            if row and not row[0].startswith("#"):
+                yield row
+
+
+def _asn_rows(path):
+    """iptoasn.com: range_start, range_end, AS_number, country_code, AS_description"""
+    for row in _rows(path):
+        if len(row) < 5 or not row[2].isdigit() or row[2] == "0":   # 0 = not routed
+            continue
+        cc = row[3] if row[3] not in ("", "None") else None
+        yield row[0], row[1], (int(row[2]), cc, row[4])
+
+
+def _geo_rows(path):
+    """db-ip.com city lite: ip_start, ip_end, continent, country, stateprov, city, latitude, longitude"""
+    for row in _rows(path):
+        if len(row) < 8:
+            continue
+        try:
+            lat, lon = round(float(row[6]), 4), round(float(row[7]), 4)
+        except ValueError:
+            lat = lon = None
+        yield row[0], row[1], (row[3] or None, row[4] or None, row[5] or None, lat, lon)
+
+
+def _table(rows):
+    """Sorted v4/v6 range records plus a de-duplicated value list."""
+    values, index = [], {}
+    ranges = {4: [], 6: []}
+    for start, end, value in rows:
+        try:
+            s, e = ipaddress.ip_address(start), ipaddress.ip_address(end)
+        except ValueError:
+            continue
+        if s.version != e.version or e < s:
+            continue
+        idx = index.get(value)
+        if idx is None:
+            idx = index[value] = len(values)
+            values.append(value)
+        ranges[s.version].append((s.packed, e.packed, idx))
+    for records in ranges.values():
+        records.sort()
+    return ranges, values
+
+
+def _value_blob(values):
+    encoded = [json.dumps(v, separators=(",", ":")).encode() for v in values]
+    offsets, pos = [], 0
+    for chunk in encoded:
+        offsets.append(pos)
+        pos += len(chunk)
+    offsets.append(pos)
+    return struct.pack(f">{len(offsets)}I", *offsets), b"".join(encoded)
+
+
+def build(out_path, asn_path=None, geo_path=None):
+    sections, header = [], {"version": 1, "built_at": int(time.time()),
+                            "sources": {}, "tables": {}, "values": {}}
+    size = 0
+
+    def add(blob):
+        nonlocal size
+        offset = size
+        sections.append(blob)
+        size += len(blob)
+        return offset
+
+    for kind, path, reader in (("asn", asn_path, _asn_rows), ("geo", geo_path, _geo_rows)):
+        if not path:
+            continue
+        ranges, values = _table(reader(path))
+        header["sources"][kind] = os.path.basename(path)
+        for version, records in ranges.items():
+            blob = b"".join(s + e + struct.pack(">I", i) for s, e, i in records)
+            header["tables"][f"{kind}{version}"] = {
+                "offset": add(blob), "count": len(records), "width": 4 if version == 4 else 16}
+        offsets, data = _value_blob(values)
+        header["values"][kind] = {"offsets": add(offsets), "data": add(data), "count": len(values)}
+        if kind == "asn":
+            # AS number -> value, for lookups by ASN rather than by address.
+            by_asn = sorted({v[0]: i for i, v in reversed(list(enumerate(values)))}.items())
+            blob = b"".join(struct.pack(">II", asn, i) for asn, i in by_asn)
+            header["tables"]["asn_index"] = {"offset": add(blob), "count": len(by_asn), "width": 4}
+        print(f"  {kind}: {len(ranges[4]):,} IPv4 + {len(ranges[6]):,} IPv6 ranges, "
+              f"{len(values):,} distinct values")
+
+    head = json.dumps(header).encode()
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC + struct.pack(">I", len(head)) + head)
+        for blob in sections:
+            fh.write(blob)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+# ─── LOOKUP ───────────────────────────────────────────────────────────────────
+
+class RangeDB:
+    """Read-only view of a built database. Safe to share between threads."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:8] != MAGIC:
+            raise ValueError(f"{path} is not an ipranges database")
+        n = struct.unpack_from(">I", self._mm, 8)[0]
+        self.header = json.loads(self._mm[12:12 + n])
+        self._base = 12 + n
+
+    def _search(self, table, key):
+        """Record index of the range containing `key`, or None."""
+        t = self.header["tables"].get(table)
+        if not t or not t["count"]:
+            return None
+        mm, width = self._mm, t["width"]
+        rec = 2 * width + 4
+        base = self._base + t["offset"]
+        lo, hi = 0, t["count"]
+        while lo < hi:                      # last record with start <= key
+            mid = (lo + hi) // 2
+            pos = base + mid * rec
+            if mm[pos:pos + width] <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        pos = base + (lo - 1) * rec
+        if key > mm[pos + width:pos + 2 * width]:
+            return None
+        return struct.unpack_from(">I", mm, pos + 2 * width)[0]
+
+    def _value(self, kind, idx):
+        v = self.header["values"][kind]
+        start, end = struct.unpack_from(">II", self._mm, self._base + v["offsets"] + 4 * idx)
+        data = self._base + v["data"]
+        return json.loads(self._mm[data + start:data + end])
+
+    def _find(self, kind, ip):
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        idx = self._search(f"{kind}{addr.version}", addr.packed)
+        return None if idx is None else self._value(kind, idx)
+
+    def asn(self, ip):
+        """{'asn', 'country', 'org'} for the network announcing `ip`, or None."""
+        v = self._find("asn", ip)
+        return None if v is None else {"asn": v[0], "country": v[1], "org": v[2]}
+
+    def geo(self, ip):
+        """{'country', 'region', 'city', 'latitude', 'longitude'} for `ip`, or None."""
+        v = self._find("geo", ip)
+        if v is None:
+            return None
+        return dict(zip(("country", "region", "city", "latitude", "longitude"), v))
+
+    def asn_info(self, asn):
+        """{'asn', 'country', 'org'} by AS number (int or 'AS123'), or None."""
+        t = self.header["tables"].get("asn_index")
+        try:
+            number = int(str(asn).upper().removeprefix("AS"))
+        except ValueError:
+            return None
+        if not t or not 0 <= number < 2 ** 32:
+            return None
+        key, base = struct.pack(">I", number), self._base + t["offset"]
+        lo, hi = 0, t["count"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found = self._mm[base + mid * 8:base + mid * 8 + 4]
+            if found == key:
+                v = self._value("asn", struct.unpack_from(">I", self._mm, base + mid * 8 + 4)[0])
+                return {"asn": v[0], "country": v[1], "org": v[2]}
+            if found < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def lookup(self, ip):
+        """Everything known about `ip`: {'ip', 'asn': ..., 'geo': ...}."""
+        return {"ip": ip, "asn": self.asn(ip), "geo": self.geo(ip)}
+
+
+def open_db(path=None):
+    """The database at `path` (default $IPRANGES_DB / ./ipranges.db), or None if absent."""
+    path = path or DEFAULT_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        return RangeDB(path)
+    except (OSError, ValueError):
+        return None
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline IP range database (ASN + geolocation)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="build the database from CSV dumps")
+    b.add_argument("--asn", help="iptoasn.com ip2asn-combined.tsv(.gz)")
+    b.add_argument("--geo", help="db-ip.com dbip-city-lite-*.csv(.gz)")
+    b.add_argument("-o", "--output", default=DEFAULT_PATH)
+
+    q = sub.add_parser("lookup", help="look up addresses")
+    q.add_argument("ips", nargs="+")
+    q.add_argument("--db", default=DEFAULT_PATH)
+
+    args = parser.parse_args()
+    if args.cmd == "build":
+        if not (args.asn or args.geo):
+            parser.error("give --asn and/or --geo")
+        started = time.time()
+        print(f"Building {args.output} ...")
+        build(args.output, args.asn, args.geo)
+        print(f"Done in {time.time() - started:.1f}s, "
+              f"{os.path.getsize(args.output) / 1e6:.1f} MB")
+        return
+
+    db = open_db(args.db)
+    if db is None:
+        sys.exit(f"No database at {args.db} - run: python3 ipranges.py build --asn ... --geo ...")
+    for ip in args.ips:
+        print(json.dumps(db.lookup(ip)))
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,10 @@ CONFIG = {
     "max_mb": int(os.environ.get("SCRUB_MAX_MB", "2048")),
     "ttl": int(os.environ.get("SCRUB_TTL", "1800")),
     "workers": int(os.environ.get("SCRUB_WORKERS", "2")),
+    "image_workers": int(os.environ.get("SCRUB_IMAGE_WORKERS", "2")),
+    "pdf_workers": int(os.environ.get("SCRUB_PDF_WORKERS", "1")),
+    "inspect_workers": int(os.environ.get("SCRUB_INSPECT_WORKERS", "2")),
+    "processes": os.environ.get("SCRUB_PROCESSES", "1") != "0",
     "max_files": int(os.environ.get("SCRUB_MAX_FILES", "40")),
     "max_jobs": int(os.environ.get("SCRUB_MAX_JOBS", "8")),
 }
@@ -141,6 +145,8 @@ def capabilities():
         ttl_minutes=CONFIG["ttl"] // 60,
         keeps_forever=CONFIG["ttl"] <= 0,
         workers=CONFIG["workers"],
+        image_workers=CONFIG["image_workers"],
+        pdf_workers=CONFIG["pdf_workers"],
         threads_each=media.encoder_threads(),
     )
 
@@ -225,12 +231,19 @@ def archive(job_id: str):
     job = registry.get(job_id)
     if job is None:
         abort(404)
-    path = registry.zip_path(job)
-    if path is None:
+    # ?follow=1 keeps the archive open until the batch is finished, adding
+    # each file the moment it is done; without it, what is done now.
+    made = registry.archive(job, follow=request.args.get("follow") == "1")
+    if made is None:
         abort(404)
+    chunks, length = made
     job.touch()
-    return send_file(path, mimetype="application/zip", as_attachment=True,
-                     download_name=f"scrubbed_{job.id[:8]}.zip")
+    resp = Response(chunks, mimetype="application/zip")
+    resp.headers["Content-Disposition"] = (
+        f'attachment; filename="scrubbed_{job.id[:8]}.zip"')
+    if length is not None:
+        resp.headers["Content-Length"] = str(length)
+    return resp
 
 
 @app.post("/api/jobs/<job_id>/forget")
@@ -246,7 +259,11 @@ def main() -> None:
     os.environ["SCRUB_WORKERS"] = str(CONFIG["workers"])   # read by media.py
     app.config["MAX_CONTENT_LENGTH"] = CONFIG["max_mb"] * 1024 * 1024
     registry = Registry(workers=CONFIG["workers"], ttl=CONFIG["ttl"],
-                        max_jobs=CONFIG["max_jobs"])
+                        max_jobs=CONFIG["max_jobs"],
+                        image_workers=CONFIG["image_workers"],
+                        pdf_workers=CONFIG["pdf_workers"],
+                        inspect_workers=CONFIG["inspect_workers"],
+                        processes=CONFIG["processes"])
     atexit.register(registry.shutdown)
 
     host = os.environ.get("SCRUB_HOST", "127.0.0.1")
@@ -254,8 +271,9 @@ def main() -> None:
     retention = ("kept until deleted" if CONFIG["ttl"] <= 0
                  else f"held {CONFIG['ttl'] // 60} min")
     print(f"  scrub -> http://{host}:{port}   "
-          f"({CONFIG['max_mb']} MB limit, {CONFIG['workers']} workers "
-          f"x {media.encoder_threads()} threads, files {retention})\n")
+          f"({CONFIG['max_mb']} MB limit, {CONFIG['workers']} media workers "
+          f"x {media.encoder_threads()} threads, {CONFIG['image_workers']} "
+          f"image, {CONFIG['pdf_workers']} pdf, files {retention})\n")
     app.run(host=host, port=port, threaded=True, debug=False)
 
 
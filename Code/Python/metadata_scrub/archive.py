@@ -0,0 +1,178 @@
+"""Streaming ZIP writer for the results download.
+
+The archive is never assembled anywhere. Each entry is written as a local
+header, the file's bytes as they are read, and a data descriptor carrying the
+CRC that is only known once the last byte has gone past; the central directory
+follows the last entry. Entries are stored, not deflated -- the results are
+already compressed as far as they are going to go, and deflating JPEG or H.264
+only spends CPU to make them slightly larger.
+
+ZIP64 records are written per entry only where a size or offset needs them, so
+an ordinary batch produces an ordinary ZIP that every unzip tool reads, and a
+batch of long video past 4 GB still produces a valid one.
+
+Because every entry is stored and every header is fixed in advance except for
+the CRC, the total length is known before the first byte is sent, and the
+download can carry a Content-Length.
+"""
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+
+CHUNK = 1024 * 1024
+
+_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_DESCRIPTOR = struct.Struct("<IIII")
+_DESCRIPTOR64 = struct.Struct("<IIQQ")
+_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END = struct.Struct("<IHHHHIIH")
+_END64 = struct.Struct("<IQHHIIQQQQ")
+_LOCATOR64 = struct.Struct("<IIQI")
+
+_MAX32 = 0xFFFFFFFF
+_MAX16 = 0xFFFF
+_FLAGS = 0x0808          # bit 3: sizes follow in a descriptor; bit 11: UTF-8 names
+_MADE_BY = (3 << 8) | 45  # unix, spec 4.5
+_UNIX_FILE = 0o100644 << 16
+
+
+def _dos_time(ts: float) -> tuple[int, int]:
+    t = time.localtime(ts)
+    year = max(1980, t.tm_year)
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+@dataclass
+class Entry:
+    """One file as it will appear in the archive."""
+    path: str
+    name: str
+    size: int
+    mtime: float
+
+    @classmethod
+    def of(cls, path: str, name: str) -> Entry:
+        st = os.stat(path)
+        return cls(path, name, st.st_size, st.st_mtime)
+
+    @property
+    def zip64(self) -> bool:
+        return self.size >= _MAX32
+
+
+class ZipStream:
+    """Writes entries one at a time and the directory at the end.
+
+    `add` and `finish` are generators of byte chunks, so a caller can interleave
+    them with waiting for the next file to exist.
+    """
+
+    def __init__(self):
+        self.offset = 0
+        self.records: list[tuple[Entry, int, int, int]] = []  # entry, crc, size, offset
+
+    def _local_header(self, entry: Entry) -> bytes:
+        name = entry.name.encode("utf-8")
+        hm, dm = _dos_time(entry.mtime)
+        if entry.zip64:
+            # Sizes unknown in the header; the zip64 extra says the descriptor
+            # that follows uses 8-byte fields.
+            extra = struct.pack("<HHQQ", 1, 16, 0, 0)
+            head = _LOCAL.pack(0x04034B50, 45, _FLAGS, 0, hm, dm, 0,
+                               _MAX32, _MAX32, len(name), len(extra))
+        else:
+            extra = b""
+            head = _LOCAL.pack(0x04034B50, 20, _FLAGS, 0, hm, dm, 0, 0, 0,
+                               len(name), 0)
+        return head + name + extra
+
+    def add(self, entry: Entry):
+        start = self.offset
+        head = self._local_header(entry)
+        self.offset += len(head)
+        yield head
+
+        crc, size = 0, 0
+        with open(entry.path, "rb") as fh:
+            while True:
+                chunk = fh.read(CHUNK)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                self.offset += len(chunk)
+                yield chunk
+        if size != entry.size:
+            # The header promised a layout this entry no longer matches.
+            # Cutting the stream short is the only honest answer left.
+            raise OSError(f"{entry.name} changed size while it was being sent")
+
+        if entry.zip64:
+            tail = _DESCRIPTOR64.pack(0x08074B50, crc, size, size)
+        else:
+            tail = _DESCRIPTOR.pack(0x08074B50, crc, size, size)
+        self.offset += len(tail)
+        self.records.append((entry, crc, size, start))
+        yield tail
+
+    def _central_record(self, entry: Entry, crc: int, size: int,
+                        offset: int) -> bytes:
+        name = entry.name.encode("utf-8")
+        hm, dm = _dos_time(entry.mtime)
+        fields = []
+        if size >= _MAX32:
+            fields += [size, size]
+        if offset >= _MAX32:
+            fields.append(offset)
+        extra = (struct.pack(f"<HH{len(fields)}Q", 1, 8 * len(fields), *fields)
+                 if fields else b"")
+        head = _CENTRAL.pack(
+            0x02014B50, _MADE_BY, 45 if extra or entry.zip64 else 20, _FLAGS,
+            0, hm, dm, crc,
+            _MAX32 if size >= _MAX32 else size,
+            _MAX32 if size >= _MAX32 else size,
+            len(name), len(extra), 0, 0, 0, _UNIX_FILE,
+            _MAX32 if offset >= _MAX32 else offset)
+        return head + name + extra
+
+    def finish(self):
+        start = self.offset
+        for record in self.records:
+            blob = self._central_record(*record)
+            self.offset += len(blob)
+            yield blob
+        count, size = len(self.records), self.offset - start
+
+        if count >= _MAX16 or size >= _MAX32 or start >= _MAX32:
+            end64 = self.offset
+            yield _END64.pack(0x06064B50, 44, _MADE_BY, 45, 0, 0,
+                              count, count, size, start)
+            yield _LOCATOR64.pack(0x07064B50, 0, end64, 1)
+            yield _END.pack(0x06054B50, 0, 0, _MAX16, _MAX16, _MAX32, _MAX32, 0)
+        else:
+            yield _END.pack(0x06054B50, 0, 0, count, count, size, start, 0)
+
+
+def archive_length(entries: list[Entry]) -> int:
+    """Exact byte length of the archive these entries produce, without reading them."""
+    probe = ZipStream()
+    for entry in entries:
+        start = probe.offset
+        probe.offset += len(probe._local_header(entry)) + entry.size
+        probe.offset += (_DESCRIPTOR64 if entry.zip64 else _DESCRIPTOR).size
+        probe.records.append((entry, 0, entry.size, start))
+    body = probe.offset
+    return body + sum(len(b) for b in probe.finish())
+
+
+def stream(entries: list[Entry]):
+    """Every chunk of a complete archive of `entries`, in order."""
+    zs = ZipStream()
+    for entry in entries:
+        yield from zs.add(entry)
+    yield from zs.finish()
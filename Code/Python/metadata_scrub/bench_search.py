@@ -0,0 +1,105 @@
+"""Benchmark the image quality search against the plain bisection it replaced.
+
+    python3 bench_search.py [image ...]
+
+With no arguments a few synthetic pictures are generated: a photograph-like
+multi-scale texture, a flat screenshot-like one, and a large photo. For each
+image, format and level it prints how many full-size encodes each search needed,
+how long it took, and which ladder rung it settled on. The rung should match;
+the point of the new search is to get there with fewer, overlapping encodes.
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from scrub import images
+from scrub.similarity import floor_for, ssim
+
+
+def _photo(w: int, h: int, seed: int) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    acc = np.zeros((h, w, 3))
+    for octave in range(1, 8):
+        cells = 2 ** octave
+        small = rng.random((cells, cells, 3)).astype(np.float32) * 255
+        layer = Image.fromarray(small.astype(np.uint8)).resize((w, h), Image.BICUBIC)
+        acc += np.asarray(layer, dtype=np.float64) / (octave ** 0.8)
+    acc = 255 * (acc - acc.min()) / (np.ptp(acc) or 1)
+    acc += rng.normal(0, 6, acc.shape)
+    return Image.fromarray(np.clip(acc, 0, 255).astype(np.uint8))
+
+
+def _screenshot(w: int, h: int, seed: int) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    im = Image.new("RGB", (w, h), (246, 246, 246))
+    draw = ImageDraw.Draw(im)
+    for _ in range(120):
+        x, y = int(rng.integers(0, w - 40)), int(rng.integers(0, h - 12))
+        colour = tuple(int(c) for c in rng.integers(0, 200, 3))
+        draw.rectangle((x, y, x + int(rng.integers(20, 300)), y + 10), fill=colour)
+    return im
+
+
+def _legacy(im: Image.Image, fmt: str, floor: float) -> tuple[int | None, int]:
+    """The sequential bisection as it was: full ssim() from scratch per probe."""
+    ladder = images.LADDERS[fmt]
+    lo, hi, best, tried = 0, len(ladder) - 1, None, 0
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        quality, sub = ladder[mid]
+        data = images._encode(im, fmt, quality, sub)
+        tried += 1
+        if ssim(im, images._decode(data)) >= floor:
+            best, hi = mid, mid - 1
+        else:
+            lo = mid + 1
+    return best, tried
+
+
+def _new(im: Image.Image, fmt: str, floor: float) -> tuple[int | None, int]:
+    probe = images._Probe(im, fmt, floor)
+    guess = images._predict(im, fmt, floor)
+    return images._parallel_search(probe, guess, images.SEARCH_THREADS), probe.encodes
+
+
+def main(paths: list[str]) -> None:
+    if paths:
+        subjects = [(p, Image.open(p).convert("RGB")) for p in paths]
+    else:
+        subjects = [("photo 1600x1200", _photo(1600, 1200, 1)),
+                    ("screen 1440x900", _screenshot(1440, 900, 2)),
+                    ("photo 4000x3000", _photo(4000, 3000, 3))]
+
+    print(f"{SEARCH_NOTE}\n")
+    print(f"{'image':<18} {'fmt':<5} {'level':<14} "
+          f"{'encodes':>9} {'seconds':>13} {'rung':>7}")
+    totals = [0, 0, 0.0, 0.0]
+    for name, im in subjects:
+        for fmt in ("JPEG", "WEBP"):
+            for level in ("imperceptible", "balanced", "tiny"):
+                floor = floor_for(level)
+                t = time.perf_counter()
+                old_rung, old_n = _legacy(im, fmt, floor)
+                old_s = time.perf_counter() - t
+                t = time.perf_counter()
+                new_rung, new_n = _new(im, fmt, floor)
+                new_s = time.perf_counter() - t
+                totals[0] += old_n
+                totals[1] += new_n
+                totals[2] += old_s
+                totals[3] += new_s
+                print(f"{name:<18} {fmt:<5} {level:<14} {old_n:>4} {new_n:>4} "
+                      f"{old_s:>6.2f} {new_s:>6.2f} {str(old_rung):>3} {str(new_rung):>3}")
+    print(f"\n{'total':<39} {totals[0]:>4} {totals[1]:>4} "
+          f"{totals[2]:>6.2f} {totals[3]:>6.2f}")
+
+
+SEARCH_NOTE = (f"before: sequential bisection | after: proxy guess + "
+               f"{images.SEARCH_THREADS}-wide rounds")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
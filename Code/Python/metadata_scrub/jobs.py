@@ -4,9 +4,19 @@ A job has two phases. Uploading runs inspection only: every file is classified
 and read for metadata, and nothing is modified. The user sees what is in their
 files and then chooses settings. Processing starts on a second, explicit call.
 
-Work runs in a thread pool rather than processes because the expensive parts
-(PyAV encode/decode, Pillow, zlib) release the GIL in C, so they genuinely run
-in parallel while progress state stays trivial to share.
+Work is split into lanes, one per kind of file: images, PDFs, and audio/video
+together. Each lane has its own queue and its own worker count, so one long
+video can no longer sit on the only free worker while a batch of thumbnails
+waits behind it. Within a lane the smallest file goes first, with its place
+aged by how long it has waited so a large file is delayed, never starved.
+
+Audio and video stay on threads: PyAV spends its time inside FFmpeg with the
+GIL released, and the encoders already split the cores between them. Image and
+PDF work does not -- the SSIM search and the pikepdf object walk are Python and
+numpy glue that holds the GIL between calls -- so those lanes hand each file to
+a process pool. Log lines and progress come back over one queue and land on the
+same Item fields the thread path writes, so the page cannot tell the difference.
+A worker that dies takes only its own file with it; the pool is rebuilt.
 
 Every job owns a directory under one temp root. Nothing is written anywhere
 else, nothing is named from user input, and a reaper thread deletes each job
@@ -14,20 +24,36 @@ directory once it passes its TTL. A TTL of 0 means keep until told otherwise.
 """
 from __future__ import annotations
 
+import heapq
+import itertools
+import multiprocessing
 import os
 import shutil
 import tempfile
 import threading
 import time
 import uuid
-import zipfile
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
+from typing import Callable
 
+import archive
 from scrub import detect, images, inspector, media, pdfs
 
 MAX_LOG_LINES = 400
 
+# Shortest job first, aged: an item's place in its lane is its arrival time
+# plus its size at this rate. Within one upload that is plain smallest-first;
+# across uploads a 400 MB video yields to images for about a minute and a half,
+# then takes its turn whatever else has arrived.
+SJF_BYTES_PER_SECOND = 4 * 1024 * 1024
+
+# Kinds whose work holds the GIL for long enough to be worth a process.
+PROCESS_KINDS = ("image", "pdf")
+LANE_FOR = {"image": "image", "pdf": "pdf", "audio": "av", "video": "av"}
+
 
 def _safe_stem(name: str) -> str:
     stem = os.path.splitext(os.path.basename(name))[0]
@@ -36,6 +62,17 @@ def _safe_stem(name: str) -> str:
     return out or "file"
 
 
+def _unique_name(name: str, used: set[str]) -> str:
+    """`name`, or `name_1`, `name_2`... if an earlier entry already took it."""
+    out, n = name, 1
+    while out in used:
+        stem, ext = os.path.splitext(name)
+        out = f"{stem}_{n}{ext}"
+        n += 1
+    used.add(out)
+    return out
+
+
 @dataclass
 class Item:
     id: str
@@ -52,11 +89,16 @@ class Item:
     src_path: str = ""
     inspection: dict = field(default_factory=dict)
     log: list = field(default_factory=list)
+    queued_at: float = 0.0
+    wait: float = 0.0            # seconds spent queued before a worker took it
 
     def public(self) -> dict:
         d = {k: v for k, v in self.__dict__.items()
-             if k not in ("src_path", "out_path", "log")}
+             if k not in ("src_path", "out_path", "log", "queued_at")}
         d["log"] = self.log[-40:]
+        if self.status in ("inspecting", "queued") and self.queued_at:
+            d["wait"] = time.time() - self.queued_at
+        d["wait"] = round(d["wait"], 1)
         if self.size_in and self.size_out:
             d["delta"] = round(100.0 * (self.size_in - self.size_out) / self.size_in, 1)
         else:
@@ -65,7 +107,8 @@ class Item:
 
 
 class Job:
-    def __init__(self, root: str, ttl: int):
+    def __init__(self, root: str, ttl: int,
+                 queues: Callable[[], dict] | None = None):
         self.id = uuid.uuid4().hex
         self.dir = os.path.join(root, self.id)
         os.makedirs(self.dir, mode=0o700, exist_ok=True)
@@ -77,6 +120,9 @@ class Job:
         self.expires = None if ttl <= 0 else self.created + ttl
         self.phase = "inspecting"     # inspecting | ready | processing | finished
         self.lock = threading.Lock()
+        # Signalled whenever an item finishes, for anything waiting on results.
+        self.changed = threading.Condition(self.lock)
+        self.queues = queues          # the registry's lanes, shared by all jobs
 
     def add(self, upload, index: int) -> Item:
         item = Item(id=f"{index:03d}", name=os.path.basename(upload.filename or "file"))
@@ -103,6 +149,7 @@ class Job:
             phase = self.phase
         pending = [i for i in items
                    if i["status"] in ("inspecting", "queued", "running")]
+        waiting = [i for i in items if i["status"] == "queued"]
         totals = {"high": 0, "medium": 0, "active": 0, "low": 0}
         for i in items:
             for level, n in (i.get("inspection") or {}).get("counts", {}).items():
@@ -119,24 +166,199 @@ class Job:
                              if i["status"] == "done"),
             "seconds_left": (None if self.expires is None
                              else max(0, int(self.expires - time.time()))),
+            "waiting": len(waiting),
+            "wait_seconds": max((i["wait"] for i in items), default=0.0),
+            "queues": self.queues() if self.queues else {},
         }
 
     def cleanup(self) -> None:
         shutil.rmtree(self.dir, ignore_errors=True)
 
 
+class Lane:
+    """One kind of work: a queue, a fixed set of workers, smallest file first."""
+
+    def __init__(self, name: str, workers: int, mode: str = "thread"):
+        self.name = name
+        self.workers = max(1, workers)
+        self.mode = mode              # where the work itself runs
+        self.heap: list = []
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.running = 0
+        self.waits: deque = deque(maxlen=64)
+        self.closed = False
+        for n in range(self.workers):
+            threading.Thread(target=self._worker, name=f"scrub-{name}-{n}",
+                             daemon=True).start()
+
+    def submit(self, item: Item, fn, *args) -> None:
+        item.queued_at = time.time()
+        rank = item.queued_at + item.size_in / SJF_BYTES_PER_SECOND
+        with self.cond:
+            heapq.heappush(self.heap, (rank, next(self.seq), item, fn, args))
+            self.cond.notify()
+
+    def _worker(self) -> None:
+        while True:
+            with self.cond:
+                while not self.heap and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                _rank, _seq, item, fn, args = heapq.heappop(self.heap)
+                self.running += 1
+                item.wait = time.time() - item.queued_at
+                self.waits.append(item.wait)
+            try:
+                fn(*args)
+            except Exception:
+                pass   # every task records its own failure on the item
+            finally:
+                with self.cond:
+                    self.running -= 1
+
+    def snapshot(self) -> dict:
+        with self.cond:
+            waits = list(self.waits)
+            return {
+                "depth": len(self.heap),
+                "running": self.running,
+                "workers": self.workers,
+                "mode": self.mode,
+                "avg_wait": round(sum(waits) / len(waits), 1) if waits else 0.0,
+            }
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.heap.clear()
+            self.cond.notify_all()
+
+
+# -- process workers ---------------------------------------------------------
+# These run in the pool's child processes. Everything crossing back is plain
+# data: log lines and percentages over the relay queue, and the output path or
+# the error text as the return value, so nothing depends on an exception type
+# from pikepdf or Pillow surviving a pickle round trip.
+
+_RELAY = None
+
+
+def _child_init(relay) -> None:
+    global _RELAY
+    _RELAY = relay
+
+
+def _child_ready() -> bool:
+    return True
+
+
+def _dispatch(kind: str, src: str, work_dir: str, opts: dict, log, progress) -> str:
+    if kind == "image":
+        return images.process(src, work_dir, opts, log, progress)
+    if kind == "video":
+        return media.process_video(src, work_dir, opts, log, progress)
+    if kind == "audio":
+        return media.process_audio(src, work_dir, opts, log, progress)
+    if kind == "pdf":
+        return pdfs.process(src, work_dir, opts, log, progress)
+    raise ValueError("unsupported file type")
+
+
+def _child_run(token: str, kind: str, src: str, work_dir: str,
+               opts: dict) -> tuple[str | None, str]:
+    def log(msg: str) -> None:
+        _RELAY.put((token, "log", msg))
+
+    def progress(pct: int) -> None:
+        _RELAY.put((token, "pct", int(pct)))
+
+    try:
+        return _dispatch(kind, src, work_dir, opts, log, progress), ""
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+    finally:
+        _RELAY.put((token, "end", None))
+
+
+class WorkerFailed(Exception):
+    """A file failed inside a pool process. The message is already formatted."""
+
+
 class Registry:
-    def __init__(self, workers: int = 2, ttl: int = 1800, max_jobs: int = 8):
+    def __init__(self, workers: int = 2, ttl: int = 1800, max_jobs: int = 8,
+                 image_workers: int = 2, pdf_workers: int = 1,
+                 inspect_workers: int = 2, processes: bool = True):
         self.root = tempfile.mkdtemp(prefix="scrub_")
         os.chmod(self.root, 0o700)
         self.ttl = ttl
         self.max_jobs = max_jobs
         self.jobs: dict[str, Job] = {}
         self.lock = threading.Lock()
-        self.pool = ThreadPoolExecutor(max_workers=workers,
-                                       thread_name_prefix="scrub")
+
+        # One pool serves both CPU-bound lanes. It is sized to their combined
+        # workers, and each lane only ever has as many files in it as it has
+        # threads, so a slot is always free when a lane hands one over.
+        self.procs: ProcessPoolExecutor | None = None
+        self.proc_slots = image_workers + pdf_workers
+        self.relay = None
+        self.relay_targets: dict[str, tuple] = {}
+        self.pool_lock = threading.Lock()
+        if processes:
+            self._start_processes()
+        mode = "process" if self.procs else "thread"
+
+        self.lanes = {
+            "inspect": Lane("inspect", inspect_workers),
+            "image": Lane("image", image_workers, mode),
+            "pdf": Lane("pdf", pdf_workers, mode),
+            "av": Lane("av", workers),
+        }
         threading.Thread(target=self._reaper, daemon=True).start()
 
+    def _start_processes(self) -> None:
+        # spawn, not fork: forking a process that already runs the web server
+        # and lane threads copies whatever locks those threads hold.
+        try:
+            ctx = multiprocessing.get_context("spawn")
+            self.relay = ctx.Queue()
+            self.procs = ProcessPoolExecutor(
+                max_workers=self.proc_slots, mp_context=ctx,
+                initializer=_child_init, initargs=(self.relay,))
+        except (OSError, ImportError, NotImplementedError):
+            # No working semaphores (some containers, some sandboxes): the
+            # lanes still separate the kinds, they just run in threads.
+            self.procs = None
+            return
+        # Workers start on demand, and a spawned one pays for importing PyAV,
+        # pikepdf and Pillow first. Pay that now rather than on the first file.
+        for _ in range(self.proc_slots):
+            self.procs.submit(_child_ready)
+        threading.Thread(target=self._relay_loop, daemon=True).start()
+
+    def _relay_loop(self) -> None:
+        while True:
+            try:
+                token, what, value = self.relay.get()
+            except (EOFError, OSError):
+                return
+            if token is None:
+                return
+            target = self.relay_targets.get(token)
+            if target is None:
+                continue
+            log, progress, ended = target
+            if what == "log":
+                log(value)
+            elif what == "pct":
+                progress(value)
+            else:
+                ended.set()
+
+    def queue_state(self) -> dict:
+        return {name: lane.snapshot() for name, lane in self.lanes.items()}
+
     # -- lifecycle ---------------------------------------------------------
 
     def new_job(self) -> Job | None:
@@ -146,7 +368,7 @@ class Registry:
                        if j.phase in ("inspecting", "ready", "processing"))
             if live >= self.max_jobs:
                 return None
-            job = Job(self.root, self.ttl)
+            job = Job(self.root, self.ttl, self.queue_state)
             self.jobs[job.id] = job
             return job
 
@@ -157,7 +379,7 @@ class Registry:
     def inspect(self, job: Job) -> None:
         for item in job.items:
             if item.status == "inspecting":
-                self.pool.submit(self._inspect_one, job, item)
+                self.lanes["inspect"].submit(item, self._inspect_one, job, item)
 
     def _inspect_one(self, job: Job, item: Item) -> None:
         try:
@@ -191,7 +413,8 @@ class Registry:
         job.touch()
         for item in job.items:
             if item.status == "queued":
-                self.pool.submit(self._run, job, item)
+                lane = self.lanes[LANE_FOR.get(item.kind, "av")]
+                lane.submit(item, self._run, job, item)
 
     # -- processing --------------------------------------------------------
 
@@ -215,16 +438,11 @@ class Registry:
 
         try:
             log(f"{item.name} -> {item.kind}, {detect.human_size(item.size_in)}")
-            if item.kind == "image":
-                out = images.process(item.src_path, work_dir, job.opts, log, progress)
-            elif item.kind == "video":
-                out = media.process_video(item.src_path, work_dir, job.opts, log, progress)
-            elif item.kind == "audio":
-                out = media.process_audio(item.src_path, work_dir, job.opts, log, progress)
-            elif item.kind == "pdf":
-                out = pdfs.process(item.src_path, work_dir, job.opts, log, progress)
+            if self.procs is not None and item.kind in PROCESS_KINDS:
+                out = self._in_process(job, item, work_dir, log, progress)
             else:
-                raise ValueError("unsupported file type")
+                out = _dispatch(item.kind, item.src_path, work_dir, job.opts,
+                                log, progress)
 
             ext = os.path.splitext(out)[1]
             with job.lock:
@@ -244,7 +462,8 @@ class Registry:
             with job.lock:
                 item.status = "error"
                 item.stage = "failed"
-                item.error = f"{type(exc).__name__}: {exc}"[:300]
+                item.error = (str(exc) if isinstance(exc, WorkerFailed)
+                              else f"{type(exc).__name__}: {exc}")[:300]
             log(f"failed: {item.error}")
         finally:
             # The upload is gone the moment we no longer need it.
@@ -255,33 +474,92 @@ class Registry:
             with job.lock:
                 if all(i.status in ("done", "error", "skipped") for i in job.items):
                     job.phase = "finished"
+                job.changed.notify_all()
             job.touch()
 
+    def _in_process(self, job: Job, item: Item, work_dir: str,
+                    log, progress) -> str:
+        token = f"{job.id}:{item.id}"
+        ended = threading.Event()
+        self.relay_targets[token] = (log, progress, ended)
+        try:
+            with self.pool_lock:
+                procs = self.procs
+            try:
+                out, error = procs.submit(_child_run, token, item.kind,
+                                          item.src_path, work_dir,
+                                          job.opts).result()
+            except BrokenProcessPool:
+                self._respawn(procs)
+                raise WorkerFailed("the worker process died on this file "
+                                   "(crash or out of memory); nothing was kept")
+            # Lines the child wrote before returning may still be in the pipe.
+            # They arrive in order, so waiting for its end marker keeps the log
+            # in the order it happened.
+            ended.wait(5)
+            if error:
+                raise WorkerFailed(error)
+            return out
+        finally:
+            self.relay_targets.pop(token, None)
+
+    def _respawn(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a pool that lost a worker. Every file still in it failed."""
+        with self.pool_lock:
+            if self.procs is not broken:
+                return    # another lane thread already did it
+            broken.shutdown(wait=False, cancel_futures=True)
+            ctx = multiprocessing.get_context("spawn")
+            self.procs = ProcessPoolExecutor(
+                max_workers=self.proc_slots, mp_context=ctx,
+                initializer=_child_init, initargs=(self.relay,))
+
     # -- output ------------------------------------------------------------
 
-    def zip_path(self, job: Job) -> str | None:
-        """Build the archive on disk. Holding it in memory would mean holding
-        every result in memory at once, which for a batch of video is fatal."""
-        path = os.path.join(job.dir, "results.zip")
-        wrote = 0
-        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
-            used: set[str] = set()
-            for item in job.items:
-                if item.status != "done" or not os.path.exists(item.out_path):
-                    continue
-                name = item.out_name
-                n = 1
-                while name in used:
-                    stem, ext = os.path.splitext(item.out_name)
-                    name = f"{stem}_{n}{ext}"
-                    n += 1
-                used.add(name)
-                zf.write(item.out_path, name)
-                wrote += 1
-        if not wrote:
-            os.remove(path)
+    def archive(self, job: Job, follow: bool = False):
+        """The results as a ZIP, streamed: (chunks, length) or None.
+
+        Nothing is built on disk or in memory; each result is read straight
+        into the response. Without `follow` the archive holds what is done now
+        and its exact length is known up front. With it, the archive stays open
+        while items are still running and each one is appended as it
+        finishes, so a download started early ends when the batch does.
+        """
+        with job.lock:
+            done = [i for i in job.items if i.status == "done"]
+            pending = any(i.status in ("inspecting", "queued", "running")
+                          for i in job.items)
+        if follow and pending:
+            return self._follow(job), None
+        used: set[str] = set()
+        entries = [archive.Entry.of(i.out_path, _unique_name(i.out_name, used))
+                   for i in done if os.path.exists(i.out_path)]
+        if not entries:
             return None
-        return path
+        return archive.stream(entries), archive.archive_length(entries)
+
+    def _follow(self, job: Job):
+        zs = archive.ZipStream()
+        sent: set[str] = set()
+        used: set[str] = set()
+        while True:
+            with job.lock:
+                ready = [i for i in job.items
+                         if i.status == "done" and i.id not in sent]
+                pending = any(i.status in ("inspecting", "queued", "running")
+                              for i in job.items)
+                if not ready and pending:
+                    job.changed.wait(30)
+                    continue
+            if not ready:
+                break
+            for item in ready:
+                sent.add(item.id)
+                if os.path.exists(item.out_path):
+                    yield from zs.add(archive.Entry.of(
+                        item.out_path, _unique_name(item.out_name, used)))
+            job.touch()
+        yield from zs.finish()
 
     # -- housekeeping ------------------------------------------------------
 
@@ -306,5 +584,9 @@ class Registry:
         return True
 
     def shutdown(self) -> None:
-        self.pool.shutdown(wait=False)
+        for lane in self.lanes.values():
+            lane.close()
+        if self.procs is not None:
+            self.procs.shutdown(wait=False, cancel_futures=True)
+            self.relay.put((None, "", None))
         shutil.rmtree(self.root, ignore_errors=True)
@@ -18,11 +18,13 @@ from __future__ import annotations
 
 import io
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image, ImageCms, ImageOps, ImageSequence
 
 from scrub import lossless
-from scrub.similarity import floor_for, ssim
+from scrub.similarity import ReferenceSSIM, analysis_scale, floor_for
 
 try:  # HEIC/HEIF is what iPhones actually produce.
     import pillow_heif
@@ -56,6 +58,20 @@ LADDERS = {
 }
 _TUNABLE = set(LADDERS)
 
+# Candidate encodes run side by side. Pillow's encoders and numpy release the
+# GIL for the heavy part, so threads are enough here; the job lanes already
+# give each image a process of its own.
+SEARCH_THREADS = max(1, min(4, os.cpu_count() or 1))
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=SEARCH_THREADS,
+                                  thread_name_prefix="search")
+
+# Above twice this many analysis pixels, a quick search on a proxy of about
+# this size picks the ladder rung to look at first: a mosaic of PROXY_TILE
+# squares cut from the picture. It costs a fraction of one full-size probe and
+# is usually right to within a rung.
+PROXY_PIXELS = 250_000
+PROXY_TILE = 128
+
 # Formats whose pixels already went through a lossy encoder once.
 LOSSY_SOURCES = {"JPEG", "MPO", "WEBP", "AVIF", "HEIF", "HEIC"}
 
@@ -179,49 +195,183 @@ def _decode(data: bytes) -> Image.Image:
     return im
 
 
-def search_encode(im: Image.Image, fmt: str, floor: float, log) -> bytes:
-    """Find the most compressed setting that still looks as good as asked.
+class _Probe:
+    """Encodes and scores ladder rungs for one image, each rung at most once.
 
-    The ladder runs from heavily compressed to barely compressed and is
-    non-decreasing in similarity, so this is a plain bisection for the leftmost
-    entry that clears the floor -- four or five encodes rather than fourteen.
+    The reference side of every comparison is computed once up front, and each
+    result is kept, so the fallback to the top rung and any rung a parallel
+    round already reached cost nothing a second time.
     """
-    ladder = LADDERS[fmt]
-    lo, hi = 0, len(ladder) - 1
-    best: tuple[bytes, float, tuple[int, int]] | None = None
-    tried = 0
 
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        quality, sub = ladder[mid]
-        data = _encode(im, fmt, quality, sub)
-        tried += 1
+    def __init__(self, im: Image.Image, fmt: str, floor: float,
+                 scale: float | None = None):
+        self.im = im
+        self.fmt = fmt
+        self.floor = floor
+        self.ladder = LADDERS[fmt]
+        self.reference = ReferenceSSIM(im, scale)
+        self.results: dict[int, tuple[bytes, float]] = {}
+        self.encodes = 0
+        self.lock = threading.Lock()
+
+    def _candidate(self, idx: int) -> tuple[bytes, object]:
+        quality, sub = self.ladder[idx]
+        data = _encode(self.im, self.fmt, quality, sub)
         try:
-            score = ssim(im, _decode(data))
+            return data, self.reference.luma(_decode(data))
         except Exception:
-            score = 1.0
-        if score >= floor:
-            best = (data, score, ladder[mid])
-            hi = mid - 1
+            return data, None     # undecodable: counted as a pass, as before
+
+    def evaluate_many(self, idxs: list[int]) -> None:
+        """Encode the rungs side by side, then score them in one batch."""
+        with self.lock:
+            todo = [i for i in dict.fromkeys(idxs) if i not in self.results]
+        if not todo:
+            return
+        made = (list(_SEARCH_POOL.map(self._candidate, todo)) if len(todo) > 1
+                else [self._candidate(todo[0])])
+        planes = [plane for _data, plane in made if plane is not None]
+        scores = iter(self.reference.score_lumas(planes))
+        with self.lock:
+            for idx, (data, plane) in zip(todo, made):
+                self.encodes += 1
+                self.results[idx] = (data, 1.0 if plane is None else next(scores))
+
+    def evaluate(self, idx: int) -> tuple[bytes, float]:
+        self.evaluate_many([idx])
+        return self.results[idx]
+
+    def passes(self, idx: int) -> bool:
+        return self.evaluate(idx)[1] >= self.floor
+
+
+def _bisect(probe: _Probe) -> int | None:
+    """Leftmost rung that clears the floor, one probe at a time."""
+    lo, hi = 0, len(probe.ladder) - 1
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if probe.passes(mid):
+            best, hi = mid, mid - 1
         else:
             lo = mid + 1
+    return best
+
+
+def _first_round(guess: int, lo: int, hi: int, width: int) -> list[int]:
+    """Rungs nearest the predicted answer: it and the one below, at least.
+
+    The guess comes first, so that probing one at a time can stop after it
+    when it fails, and only go on to the rung below when it passes.
+    """
+    order = [guess, guess - 1, guess + 1, guess - 2, guess + 2, guess - 3]
+    picks = [i for i in order if lo <= i <= hi]
+    return picks[:max(2 if guess > lo else 1, width)]
+
+
+def _spread(lo: int, hi: int, width: int) -> list[int]:
+    """Up to `width` rungs splitting [lo, hi] into equal parts."""
+    span = hi - lo + 1
+    if span <= width:
+        return list(range(lo, hi + 1))
+    return sorted({lo + (k + 1) * span // (width + 1) for k in range(width)})
+
+
+def _parallel_search(probe: _Probe, guess: int | None,
+                     width: int) -> int | None:
+    """Leftmost passing rung, probing up to `width` rungs per round.
+
+    With more than one thread a round's rungs are encoded together and scored
+    in one batch. With one, they are probed in turn and the round stops early:
+    a pass makes every rung above it irrelevant and a failure every rung below.
+    """
+    lo, hi = 0, len(probe.ladder) - 1
+    best = None
+    points = (_first_round(guess, lo, hi, width) if guess is not None
+              else _spread(lo, hi, width))
+    while lo <= hi:
+        if width > 1:
+            probe.evaluate_many(points)
+        for idx in points:
+            if not lo <= idx <= hi:
+                continue
+            if probe.passes(idx):
+                best, hi = idx, idx - 1
+            else:
+                lo = idx + 1
+        points = _spread(lo, hi, width)
+    return best
+
+
+def _proxy(im: Image.Image) -> tuple[Image.Image, float] | None:
+    """A mosaic of full-resolution crops standing in for the whole picture.
+
+    Not a downscale: shrinking averages away the noise and fine texture that
+    decide how hard a picture can be compressed, and a proxy built that way
+    guessed several rungs too low on photographs. Crops keep the real pixels.
+    They are spread over a grid and aligned to the 16-pixel macroblock so the
+    encoder sees the same blocks it will see in the full image. For an image
+    large enough to be compared at reduced size, the crops cover the same
+    share of the analysis pixels and are measured at the same scale.
+    """
+    scale = analysis_scale(im.size)
+    pixels = im.size[0] * im.size[1]
+    if pixels * scale * scale < 2 * PROXY_PIXELS:
+        return None
+    tile = max(64, int(PROXY_TILE / scale) // 16 * 16)
+    per = max(1, round((PROXY_PIXELS / (PROXY_TILE * PROXY_TILE)) ** 0.5))
+    mosaic = Image.new(im.mode, (per * tile, per * tile))
+    if im.mode in ("P", "PA"):
+        mosaic.putpalette(im.getpalette())
+    w, h = im.size
+    for row in range(per):
+        for col in range(per):
+            x = int((w - tile) * (col + 0.5) / per) // 16 * 16
+            y = int((h - tile) * (row + 0.5) / per) // 16 * 16
+            mosaic.paste(im.crop((x, y, x + tile, y + tile)),
+                         (col * tile, row * tile))
+    return mosaic, scale
+
+
+def _predict(im: Image.Image, fmt: str, floor: float) -> int | None:
+    """Guess the answer rung from a small stand-in for the image."""
+    made = _proxy(im)
+    if made is None:
+        return None
+    mosaic, scale = made
+    proxy = _Probe(mosaic, fmt, floor, scale)
+    found = _bisect(proxy)
+    return len(proxy.ladder) - 1 if found is None else found
+
+
+def search_encode(im: Image.Image, fmt: str, floor: float, log,
+                  width: int | None = None) -> bytes:
+    """Find the most compressed setting that still looks as good as asked.
+
+    The ladder runs from heavily compressed to barely compressed and is
+    non-decreasing in similarity, so the answer is the leftmost rung that
+    clears the floor. A proxy search guesses where that is, the first round
+    checks the guess and its neighbours together, and later rounds split
+    whatever interval is left -- usually two or three full-size encodes, run
+    side by side, rather than four or five one after another.
+    """
+    probe = _Probe(im, fmt, floor)
+    ladder = probe.ladder
+    guess = _predict(im, fmt, floor)
+    best = _parallel_search(probe, guess, width or SEARCH_THREADS)
 
     if best is None:
-        quality, sub = ladder[-1]
-        data = _encode(im, fmt, quality, sub)
-        try:
-            score = ssim(im, _decode(data))
-        except Exception:
-            score = 0.0
+        data, score = probe.evaluate(len(ladder) - 1)
         log(f"even the highest setting only reaches {score:.4f} similarity; "
             f"used it anyway")
         return data
 
-    data, score, (quality, sub) = best
+    data, score = probe.results[best]
+    quality, sub = ladder[best]
     chroma = "4:4:4" if sub == 0 else "4:2:0"
     detail = f"quality {quality}" + (f", {chroma}" if fmt == "JPEG" else "")
-    log(f"searched {tried} settings; {detail} gives {score:.4f} similarity "
-        f"against a floor of {floor:.3f} -- {len(data) // 1024} KB")
+    log(f"searched {probe.encodes} settings; {detail} gives {score:.4f} "
+        f"similarity against a floor of {floor:.3f} -- {len(data) // 1024} KB")
     return data
 
 
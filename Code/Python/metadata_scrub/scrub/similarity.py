@@ -8,11 +8,13 @@ difference" -- and search for the smallest file that still meets it.
 
 SSIM compares local structure rather than absolute pixel error, which is why it
 tracks visible damage far better than PSNR does. This is the standard formula
-with a uniform window instead of a gaussian one, computed with integral images
-so it stays linear in the pixel count.
+with a uniform window instead of a gaussian one, computed with separable window
+sums so it stays linear in the pixel count.
 """
 from __future__ import annotations
 
+import os
+
 import numpy as np
 from PIL import Image
 
@@ -21,17 +23,45 @@ from PIL import Image
 # would otherwise spend longer being measured than encoded.
 MAX_ANALYSIS_PIXELS = 2_000_000
 
+# SCRUB_SSIM_FULL_RES=1 measures every pixel instead, a band of rows at a time
+# so memory stays flat however large the picture. Slower, and exact.
+FULL_RESOLUTION = os.environ.get("SCRUB_SSIM_FULL_RES", "0") == "1"
+TILE_ROWS = 512
+
 WINDOW = 7
 C1 = (0.01 * 255) ** 2
 C2 = (0.03 * 255) ** 2
 
+# Luma is centred on this before any sums are taken. Variance and covariance do
+# not care, and it keeps the float32 window sums of squares four times smaller,
+# so E[x^2] - E[x]^2 cancels with fewer low bits lost.
+_MID = 128.0
+
+
+def _slide(a: np.ndarray, w: int, axis: int) -> np.ndarray:
+    """Sum of every run of w consecutive entries along one axis."""
+    n = a.shape[axis] - w + 1
+
+    def part(i: int) -> np.ndarray:
+        index = [slice(None)] * a.ndim
+        index[axis] = slice(i, i + n)
+        return a[tuple(index)]
+
+    out = part(0).astype(np.float32)
+    for i in range(1, w):
+        out += part(i)
+    return out
+
 
 def _boxsum(a: np.ndarray, w: int) -> np.ndarray:
-    """Sum over every w x w window, via a summed-area table."""
-    integral = np.cumsum(np.cumsum(a, axis=0, dtype=np.float64), axis=1)
-    integral = np.pad(integral, ((1, 0), (1, 0)))
-    return (integral[w:, w:] - integral[:-w, w:]
-            - integral[w:, :-w] + integral[:-w, :-w])
+    """Sum over every w x w window of the last two axes.
+
+    Shifted slices added together, in each direction in turn, rather than a
+    summed-area table: every partial sum stays the size of one window, which is
+    what lets this run in float32 without losing the small differences SSIM is
+    made of. A running total over a whole flat screenshot does lose them.
+    """
+    return _slide(_slide(a, w, a.ndim - 2), w, a.ndim - 1)
 
 
 def _luma(im: Image.Image, size: tuple[int, int] | None) -> np.ndarray:
@@ -39,39 +69,123 @@ def _luma(im: Image.Image, size: tuple[int, int] | None) -> np.ndarray:
         im = im.convert("L")
     if size and im.size != size:
         im = im.resize(size, Image.LANCZOS)
-    return np.asarray(im, dtype=np.float64)
+    return np.asarray(im, dtype=np.uint8)
+
+
+def _centred(plane: np.ndarray) -> np.ndarray:
+    return plane.astype(np.float32) - np.float32(_MID)
+
+
+def _moments(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Window mean and variance of a centred plane (or a stack of them)."""
+    n = WINDOW * WINDOW
+    mu = _boxsum(x, WINDOW) / n
+    return mu, _boxsum(x * x, WINDOW) / n - mu * mu
+
+
+def _ssim_sum(x: np.ndarray, mu_x: np.ndarray, sigma_x: np.ndarray,
+              y: np.ndarray) -> np.ndarray:
+    """Sum of the SSIM map of each plane in stack `y` against `x`."""
+    n = WINDOW * WINDOW
+    mu_y, sigma_y = _moments(y)
+    sigma_xy = _boxsum(x * y, WINDOW) / n - mu_x * mu_y
+    # Means go back to absolute luma for the luminance term, which unlike
+    # the other two is not shift-invariant.
+    mx, my = mu_x + _MID, mu_y + _MID
+    numerator = (2 * mx * my + C1) * (2 * sigma_xy + C2)
+    denominator = (mx * mx + my * my + C1) * (sigma_x + sigma_y + C2)
+    return np.sum(numerator / denominator, axis=(-2, -1), dtype=np.float64)
+
+
+def analysis_scale(size: tuple[int, int]) -> float:
+    """The factor an image of this size is shrunk by before comparison."""
+    if FULL_RESOLUTION:
+        return 1.0
+    pixels = size[0] * size[1]
+    return min(1.0, (MAX_ANALYSIS_PIXELS / pixels) ** 0.5)
+
+
+def _analysis_size(size: tuple[int, int],
+                   scale: float | None = None) -> tuple[int, int] | None:
+    scale = analysis_scale(size) if scale is None else scale
+    if scale >= 1.0:
+        return None
+    return (max(WINDOW + 1, int(size[0] * scale)),
+            max(WINDOW + 1, int(size[1] * scale)))
+
+
+class ReferenceSSIM:
+    """SSIM against one fixed original.
+
+    A search compares many candidates against the same picture, and half of
+    every comparison -- the reference luma, its window means and variances --
+    does not change between them. That half is computed here once, in float32,
+    and any number of candidates can then be scored in one vectorised pass.
+
+    `scale` overrides the usual analysis downscale, so that a crop of a large
+    image can be measured the way the whole image would be. `tiled` measures
+    at full resolution a band of TILE_ROWS at a time instead of downscaling;
+    the reference statistics are then recomputed per band rather than held,
+    since for a 48 MP photo holding them would cost more than the encode.
+    """
+
+    def __init__(self, ref: Image.Image, scale: float | None = None,
+                 tiled: bool | None = None):
+        self.size = ref.size
+        self.tiled = FULL_RESOLUTION if tiled is None else tiled
+        self.analysis = None if self.tiled else _analysis_size(ref.size, scale)
+        plane = _luma(ref, self.analysis)
+        self.shape = plane.shape
+        self.plane = plane
+        self.tiny = min(plane.shape) < WINDOW
+        if self.tiny or self.tiled:
+            return
+        self.x = _centred(plane)
+        self.mu_x, self.sigma_x = _moments(self.x)
+
+    def luma(self, b: Image.Image) -> np.ndarray:
+        """The candidate's luma plane, sized exactly like the reference's."""
+        if b.size != self.size:
+            b = b.resize(self.size, Image.LANCZOS)
+        y = _luma(b, self.analysis or self.size)
+        if y.shape != self.shape:
+            y = _luma(b, (self.shape[1], self.shape[0]))
+        return y
+
+    def score_lumas(self, planes: list[np.ndarray]) -> list[float]:
+        """Mean SSIM of each candidate plane, all in one pass."""
+        if not planes:
+            return []
+        if self.tiny:
+            return [1.0 if np.array_equal(self.plane, y) else 0.0
+                    for y in planes]
+        stack = np.stack(planes)
+        h, w = self.shape
+        count = (h - WINDOW + 1) * (w - WINDOW + 1)
+        if not self.tiled:
+            total = _ssim_sum(self.x, self.mu_x, self.sigma_x, _centred(stack))
+            return [float(t / count) for t in total]
+
+        total = np.zeros(len(planes), dtype=np.float64)
+        for top in range(0, h - WINDOW + 1, TILE_ROWS):
+            # Each band carries WINDOW - 1 extra rows so that the windows
+            # straddling its lower edge are counted here and only here.
+            rows = slice(top, min(h, top + TILE_ROWS + WINDOW - 1))
+            x = _centred(self.plane[rows])
+            mu_x, sigma_x = _moments(x)
+            total += _ssim_sum(x, mu_x, sigma_x, _centred(stack[:, rows]))
+        return [float(t / count) for t in total]
+
+    def score_many(self, candidates: list[Image.Image]) -> list[float]:
+        return self.score_lumas([self.luma(b) for b in candidates])
+
+    def score(self, b: Image.Image) -> float:
+        return self.score_many([b])[0]
 
 
 def ssim(a: Image.Image, b: Image.Image) -> float:
     """Mean SSIM over the luma channel. 1.0 is identical."""
-    if a.size != b.size:
-        b = b.resize(a.size, Image.LANCZOS)
-
-    size = None
-    pixels = a.size[0] * a.size[1]
-    if pixels > MAX_ANALYSIS_PIXELS:
-        scale = (MAX_ANALYSIS_PIXELS / pixels) ** 0.5
-        size = (max(WINDOW + 1, int(a.size[0] * scale)),
-                max(WINDOW + 1, int(a.size[1] * scale)))
-
-    x = _luma(a, size)
-    y = _luma(b, size if size else a.size)
-    if x.shape != y.shape:
-        y = _luma(b, (x.shape[1], x.shape[0]))
-    if min(x.shape) < WINDOW:
-        return 1.0 if np.array_equal(x, y) else 0.0
-
-    w = WINDOW
-    n = w * w
-    mu_x = _boxsum(x, w) / n
-    mu_y = _boxsum(y, w) / n
-    sigma_x = _boxsum(x * x, w) / n - mu_x * mu_x
-    sigma_y = _boxsum(y * y, w) / n - mu_y * mu_y
-    sigma_xy = _boxsum(x * y, w) / n - mu_x * mu_y
-
-    numerator = (2 * mu_x * mu_y + C1) * (2 * sigma_xy + C2)
-    denominator = (mu_x ** 2 + mu_y ** 2 + C1) * (sigma_x + sigma_y + C2)
-    return float(np.mean(numerator / denominator))
+    return ReferenceSSIM(a).score(b)
 
 
 # Named levels, in the order a person would think about them. The number is the
@@ -374,7 +374,8 @@
 
     $("results").innerHTML = d.items.map((it) => {
       const [cls, word] = TAGS[it.status] || ["wait", it.status];
-      const sizes = it.size_out ? `${human(it.size_in)} → ${human(it.size_out)}` : human(it.size_in);
+      const waited = it.status === "queued" && it.wait >= 1 ? ` · waiting ${Math.round(it.wait)}s` : "";
+      const sizes = (it.size_out ? `${human(it.size_in)} → ${human(it.size_out)}` : human(it.size_in)) + waited;
       const delta = (it.delta === null || it.delta === undefined) ? "" :
         `<span class="delta ${it.delta < 0 ? "up" : ""}">${it.delta > 0 ? "−" : "+"}${Math.abs(it.delta)}%</span>`;
       const dl = it.status === "done"
@@ -403,7 +404,8 @@
 
     const anyDone = d.items.some((i) => i.status === "done");
     $("outfoot").hidden = !anyDone;
-    $("zip").href = "/api/jobs/" + d.id + "/archive";
+    // Still running: the archive stays open and takes each file as it lands.
+    $("zip").href = "/api/jobs/" + d.id + "/archive" + (d.finished ? "" : "?follow=1");
     if (d.finished) {
       if (timer) { clearInterval(timer); timer = null; }
       $("go").disabled = false;
@@ -442,7 +444,8 @@
       $("sysline").innerHTML =
         `video <b>${c.video_codecs.join(" ")}</b> · audio <b>${c.audio_codecs.join(" ")}</b> · ` +
         `up to <b>${c.max_mb} MB</b> and <b>${c.max_files}</b> files per run · ` +
-        `<b>${c.workers}</b> worker(s) × <b>${c.threads_each}</b> thread(s) · files ${retention}`;
+        `<b>${c.workers}</b> media worker(s) × <b>${c.threads_each}</b> thread(s), ` +
+        `<b>${c.image_workers}</b> image, <b>${c.pdf_workers}</b> pdf · files ${retention}`;
     } catch (e) {
       $("sysline").textContent = "Could not read server capabilities.";
     }
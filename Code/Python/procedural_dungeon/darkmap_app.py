@@ -16,14 +16,32 @@ Bug fixes over original darkgui_beta.py:
   5. Bounds checking on every _carve call — no more off-grid writes.
   6. Parameter validation + graceful RuntimeError messages.
   7. Replaced the buggy _add_loops() with loop edges inside _connect_normal_rooms().
+
+Scaling:
+  - Overlap tests go through a SpatialGrid instead of scanning every room.
+  - The MST runs over k-nearest-neighbour edges instead of all O(n²) pairs.
+  - Dead-end pruning is a single work-queue pass instead of full-grid sweeps.
+  - Maps are cached per (seed, params) and can be served as packed tile bits
+    (POST /generate?format=bin), so the 120x80 cap is lifted to MAX_MAP_TILES.
 """
 
 from flask import Flask, Response, jsonify, request
+import json
 import random
-from collections import deque
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
 
 app = Flask(__name__)
 
+MAX_MAP_SIDE   = 2048
+MAX_MAP_TILES  = 1024 * 1024
+MAX_ROOM_COUNT = 20000
+MAP_CACHE_SIZE = 32
+MST_NEIGHBOURS = 8
+MST_ALL_PAIRS  = 64   # at or below this many rooms, all pairs is cheaper than kNN
+
 # ── Cyberpunk name vocabularies ───────────────────────────────────────────────
 _ROOM_NAMES = {
     'normal': [
@@ -68,6 +86,31 @@ class Rect:
                 self.y + self.h + pad > other.y - pad)
 
 
+class SpatialGrid:
+    """Uniform bucket grid over rectangles — overlap tests only look at nearby cells."""
+    def __init__(self, cell):
+        self.cell     = max(1, cell)
+        self._buckets = {}
+
+    def _keys(self, x, y, w, h, margin):
+        c = self.cell
+        for gy in range((y - margin) // c, (y + h + margin - 1) // c + 1):
+            for gx in range((x - margin) // c, (x + w + margin - 1) // c + 1):
+                yield gx, gy
+
+    def insert(self, rect):
+        for key in self._keys(rect.x, rect.y, rect.w, rect.h, 0):
+            self._buckets.setdefault(key, []).append(rect)
+
+    def intersects(self, rect, pad=0):
+        # Rect.intersects pads both sides, so a hit can lie up to 2*pad away.
+        for key in self._keys(rect.x, rect.y, rect.w, rect.h, 2 * pad):
+            for other in self._buckets.get(key, ()):
+                if rect.intersects(other, pad=pad):
+                    return True
+        return False
+
+
 class Room(Rect):
     def __init__(self, rid, x, y, w, h, rtype):
         super().__init__(x, y, w, h)
@@ -117,15 +160,28 @@ class MapGenerator:
         self.seed               = int(seed_raw) if seed_raw else random.randrange(1 << 30)
         self._validate()
 
+    def cache_key(self):
+        """Everything that determines the generated map, after validation."""
+        return (self.seed, self.map_width, self.map_height,
+                self.room_min_size, self.room_max_size,
+                self.room_count_min, self.room_count_max,
+                self.special_room_count, self.special_room_chance,
+                self.loop_chance)
+
     # ── validation ────────────────────────────────────────────────────────────
 
     def _validate(self):
-        self.map_width       = max(24, min(120, self.map_width))
-        self.map_height      = max(18, min(80,  self.map_height))
+        self.map_width       = max(24, min(MAX_MAP_SIDE, self.map_width))
+        self.map_height      = max(18, min(MAX_MAP_SIDE, self.map_height))
+        if self.map_width * self.map_height > MAX_MAP_TILES:
+            raise RuntimeError(
+                f"Map of {self.map_width}x{self.map_height} exceeds the "
+                f"{MAX_MAP_TILES}-tile limit.")
         self.room_min_size   = max(3, self.room_min_size)
         self.room_max_size   = max(self.room_min_size + 1, self.room_max_size)
-        self.room_count_min  = max(2, self.room_count_min)
-        self.room_count_max  = max(self.room_count_min, self.room_count_max)
+        self.room_count_min  = max(2, min(MAX_ROOM_COUNT, self.room_count_min))
+        self.room_count_max  = max(self.room_count_min, min(MAX_ROOM_COUNT, self.room_count_max))
+        self.special_room_count = max(0, min(MAX_ROOM_COUNT, self.special_room_count))
         self.loop_chance     = max(0.0, min(1.0, self.loop_chance))
         self.special_room_chance = max(0.0, min(1.0, self.special_room_chance))
 
@@ -135,6 +191,7 @@ class MapGenerator:
         self.rooms.append(room)
         self.rooms_by_id[room.id] = room
         self.adj[room.id] = set()
+        self.room_index.insert(room)
 
     def _carve(self, x, y):
         """Safely carve a single tile — bounds-checked."""
@@ -158,7 +215,7 @@ class MapGenerator:
         """L-shaped corridor between two (x, y) points — fully bounds-checked."""
         x1, y1 = a
         x2, y2 = b
-        if random.choice([True, False]):
+        if self.rng.choice([True, False]):
             self._carve_hline(y1, x1, x2)
             self._carve_vline(x2, y1, y2)
         else:
@@ -174,47 +231,103 @@ class MapGenerator:
     # ── placement ─────────────────────────────────────────────────────────────
 
     def _place_normal_rooms(self):
-        target   = random.randint(self.room_count_min, self.room_count_max)
+        target   = self.rng.randint(self.room_count_min, self.room_count_max)
         attempts = 0
-        while len([r for r in self.rooms if r.type == 'normal']) < target \
-              and attempts < target * 200:
+        placed   = 0
+        while placed < target and attempts < target * 200:
             attempts += 1
-            w = random.randint(self.room_min_size, self.room_max_size)
-            h = random.randint(self.room_min_size, self.room_max_size)
-            x = random.randint(2, self.map_width  - w - 2)
-            y = random.randint(2, self.map_height - h - 2)
+            w = self.rng.randint(self.room_min_size, self.room_max_size)
+            h = self.rng.randint(self.room_min_size, self.room_max_size)
+            x = self.rng.randint(2, self.map_width  - w - 2)
+            y = self.rng.randint(2, self.map_height - h - 2)
             c = Rect(x, y, w, h)
             # pad=1 guarantees a wall separating any two rooms
-            if any(c.intersects(o, pad=1) for o in self.rooms):
+            if self.room_index.intersects(c, pad=1):
                 continue
             rm = Room(self.next_id, x, y, w, h, 'normal')
             self.next_id += 1
             self._add_room(rm)
             self._carve_room(rm)
+            placed += 1
 
-        placed = len([r for r in self.rooms if r.type == 'normal'])
         if placed < self.room_count_min:
             raise RuntimeError(
                 f"Placed only {placed}/{self.room_count_min} normal rooms. "
                 "Try a larger map, fewer rooms, or smaller room sizes.")
 
+    def _index_centres(self, rooms):
+        """Bucket room centres so _nearest() only visits nearby cells."""
+        cell    = max(1, self.room_max_size * 2)
+        buckets = {}
+        for r in rooms:
+            cx, cy = r.center
+            buckets.setdefault((cx // cell, cy // cell), []).append(r)
+        return cell, buckets
+
+    def _nearest(self, index, point, k, skip=None):
+        """
+        The k rooms whose centres are closest to point (Manhattan), ties by
+        id, found by searching rings of bucket cells outwards.
+        """
+        cell, buckets = index
+        px, py   = point
+        gx, gy   = px // cell, py // cell
+        max_ring = max(self.map_width, self.map_height) // cell + 1
+        found    = []
+        for ring in range(max_ring + 1):
+            for dy in range(-ring, ring + 1):
+                step = 1 if abs(dy) == ring else 2 * ring
+                for dx in range(-ring, ring + 1, max(1, step)):
+                    for b in buckets.get((gx + dx, gy + dy), ()):
+                        if b is not skip:
+                            found.append((manhattan(point, b.center), b.id, b))
+            # Anything in a farther ring is more than ring*cell away.
+            if len(found) >= k:
+                found.sort(key=lambda e: (e[0], e[1]))
+                if found[k - 1][0] <= ring * cell:
+                    break
+        found.sort(key=lambda e: (e[0], e[1]))
+        return [(d, b) for d, _, b in found[:k]]
+
+    def _closest(self, index, point):
+        hit = self._nearest(index, point, 1)
+        return hit[0][1] if hit else None
+
+    def _candidate_edges(self, normals, k=MST_NEIGHBOURS):
+        """
+        Each room's k nearest rooms (Manhattan, between centres).  The union
+        of these edges replaces the all-pairs list: O(n·k) instead of O(n²).
+        Small maps keep every pair, which keeps their seeds' layouts unchanged.
+        """
+        if len(normals) <= MST_ALL_PAIRS:
+            return sorted(
+                [(manhattan(a.center, b.center), a, b)
+                 for i, a in enumerate(normals)
+                 for b in normals[i + 1:]],
+                key=lambda e: e[0])
+        index = self._index_centres(normals)
+        edges = {}
+        for a in normals:
+            for d, b in self._nearest(index, a.center, k, skip=a):
+                lo, hi = (a, b) if a.id < b.id else (b, a)
+                edges[(lo.id, hi.id)] = (d, lo, hi)
+        return sorted(edges.values(), key=lambda e: (e[0], e[1].id, e[2].id))
+
     def _connect_normal_rooms(self):
         """
         FIX: Kruskal's MST with proper Union-Find (original used XOR-visited
         which could leave disconnected islands when early rooms had no close
         neighbour within the length constraint).
 
+        Kruskal runs over the nearest-neighbour candidate edges; clusters that
+        graph leaves apart are joined by their closest pair afterwards.
         Also adds optional loop edges for non-linear topology.
         """
         normals = [r for r in self.rooms if r.type == 'normal']
         if len(normals) < 2:
             return
 
-        edges = sorted(
-            [(manhattan(a.center, b.center), a, b)
-             for i, a in enumerate(normals)
-             for b in normals[i + 1:]],
-            key=lambda e: e[0])
+        edges = self._candidate_edges(normals)
 
         uf = UnionFind()
         mst_keys = set()
@@ -224,40 +337,55 @@ class MapGenerator:
                 self._link(a, b)
                 mst_keys.add((min(a.id, b.id), max(a.id, b.id)))
 
+        while True:
+            components = {}
+            for r in normals:
+                components.setdefault(uf.find(r.id), []).append(r)
+            if len(components) == 1:
+                break
+            smallest = min(components.values(), key=len)
+            inside   = {r.id for r in smallest}
+            _, a, b  = min(
+                ((manhattan(a.center, b.center), a, b)
+                 for a in smallest for b in normals if b.id not in inside),
+                key=lambda e: (e[0], e[1].id, e[2].id))
+            uf.union(a.id, b.id)
+            self._link(a, b)
+            mst_keys.add((min(a.id, b.id), max(a.id, b.id)))
+
         # Optional extra (loop) corridors — keeps maps from feeling like pure trees
         max_loop_dist = (self.map_width + self.map_height) // 4
         for d, a, b in edges:
             key = (min(a.id, b.id), max(a.id, b.id))
             if key in mst_keys:
                 continue
-            if d <= max_loop_dist and random.random() < self.loop_chance:
+            if d <= max_loop_dist and self.rng.random() < self.loop_chance:
                 self._link(a, b)
 
-    def _try_place_border_room(self, rtype, exclude):
+    def _try_place_border_room(self, rtype, exclude, index):
         """Attempt to place a room near a map border, returning (Room, target) or (None, None)."""
-        normals = [r for r in self.rooms if r.type == 'normal']
-        if not normals:
+        if not index[1]:
             return None, None
 
         for _ in range(400):
-            w    = random.randint(self.room_min_size, self.room_max_size)
-            h    = random.randint(self.room_min_size, self.room_max_size)
-            side = random.choice(('top', 'bot', 'left', 'right'))
+            w    = self.rng.randint(self.room_min_size, self.room_max_size)
+            h    = self.rng.randint(self.room_min_size, self.room_max_size)
+            side = self.rng.choice(('top', 'bot', 'left', 'right'))
             if side == 'top':
-                x, y = random.randint(2, self.map_width  - w - 2), 1
+                x, y = self.rng.randint(2, self.map_width  - w - 2), 1
             elif side == 'bot':
-                x, y = random.randint(2, self.map_width  - w - 2), self.map_height - h - 1
+                x, y = self.rng.randint(2, self.map_width  - w - 2), self.map_height - h - 1
             elif side == 'left':
-                x, y = 1, random.randint(2, self.map_height - h - 2)
+                x, y = 1, self.rng.randint(2, self.map_height - h - 2)
             else:
-                x, y = self.map_width - w - 1, random.randint(2, self.map_height - h - 2)
+                x, y = self.map_width - w - 1, self.rng.randint(2, self.map_height - h - 2)
 
             cand = Rect(x, y, w, h)
-            if any(cand.intersects(o, pad=1) for o in self.rooms + exclude):
+            if self.room_index.intersects(cand, pad=1) or \
+               any(cand.intersects(o, pad=1) for o in exclude):
                 continue
 
-            cx, cy  = x + w // 2, y + h // 2
-            closest = min(normals, key=lambda r: manhattan((cx, cy), r.center))
+            closest = self._closest(index, (x + w // 2, y + h // 2))
             rm      = Room(self.next_id, x, y, w, h, rtype)
             self.next_id += 1
             return rm, closest
@@ -274,12 +402,13 @@ class MapGenerator:
         """
         normals = [r for r in self.rooms if r.type == 'normal']
         need    = max(2, len(normals) // 2)  # min normals on the ent→obj path
+        index   = self._index_centres(normals)
 
         for _ in range(60):
-            ent, ent_tgt = self._try_place_border_room('entrance', [])
+            ent, ent_tgt = self._try_place_border_room('entrance', [], index)
             if ent is None:
                 continue
-            obj, obj_tgt = self._try_place_border_room('objective', [ent])
+            obj, obj_tgt = self._try_place_border_room('objective', [ent], index)
             if obj is None:
                 continue
 
@@ -304,8 +433,8 @@ class MapGenerator:
             self._add_room(obj); self._carve_room(obj); self._link(obj, obj_tgt)
             return
 
-        # Graceful fallback: promote the two most distant normal rooms
-        if len(normals) >= 2:
+        # Graceful fallback: promote the two most distant normal rooms.
+        if 2 <= len(normals) <= MST_ALL_PAIRS:
             pairs = sorted(
                 [(manhattan(normals[i].center, normals[j].center), i, j)
                  for i in range(len(normals))
@@ -314,27 +443,38 @@ class MapGenerator:
             _, i, j = pairs[0]
             normals[i].type = 'entrance'
             normals[j].type = 'objective'
+        elif len(normals) > MST_ALL_PAIRS:
+            # Max Manhattan distance is the larger spread of x+y or x-y — O(n).
+            best = None
+            for proj in (lambda r: r.center[0] + r.center[1],
+                         lambda r: r.center[0] - r.center[1]):
+                lo = min(normals, key=proj)
+                hi = max(normals, key=proj)
+                if lo is not hi and (best is None or proj(hi) - proj(lo) > best[0]):
+                    best = (proj(hi) - proj(lo), lo, hi)
+            best[1].type = 'entrance'
+            best[2].type = 'objective'
 
     def _place_special(self):
         normals = [r for r in self.rooms if r.type == 'normal']
+        index   = self._index_centres(normals)
         placed  = 0
 
         for _ in range(self.special_room_count * 150):
             if placed >= self.special_room_count:
                 break
-            if random.random() > self.special_room_chance:
+            if self.rng.random() > self.special_room_chance:
                 continue
-            w  = random.randint(self.room_min_size, self.room_max_size)
-            h  = random.randint(self.room_min_size, self.room_max_size)
-            x  = random.randint(2, self.map_width  - w - 2)
-            y  = random.randint(2, self.map_height - h - 2)
+            w  = self.rng.randint(self.room_min_size, self.room_max_size)
+            h  = self.rng.randint(self.room_min_size, self.room_max_size)
+            x  = self.rng.randint(2, self.map_width  - w - 2)
+            y  = self.rng.randint(2, self.map_height - h - 2)
             c  = Rect(x, y, w, h)
-            if any(c.intersects(o, pad=1) for o in self.rooms):
+            if self.room_index.intersects(c, pad=1):
                 continue
             if not normals:
                 break
-            cx, cy  = x + w // 2, y + h // 2
-            closest = min(normals, key=lambda r: manhattan((cx, cy), r.center))
+            closest = self._closest(index, (x + w // 2, y + h // 2))
             rm      = Room(self.next_id, x, y, w, h, 'special')
             self.next_id += 1
             self._add_room(rm)
@@ -348,6 +488,10 @@ class MapGenerator:
         Corridor tiles (not inside any room) with ≤1 walkable neighbour are
         pruned iteratively until the map stabilises.  This eliminates the
         orphaned stubs left by loop/optional corridors.
+
+        Pruning only ever lowers neighbour counts, so the stable map is unique;
+        a work queue that re-checks just the neighbours of pruned tiles reaches
+        it in one pass instead of sweeping the whole grid per iteration.
         """
         room_tiles = set()
         for r in self.rooms:
@@ -355,19 +499,23 @@ class MapGenerator:
                 for rx in range(r.x, r.x + r.w):
                     room_tiles.add((rx, ry))
 
-        changed = True
-        while changed:
-            changed = False
-            for y in range(1, self.map_height - 1):
-                for x in range(1, self.map_width - 1):
-                    if self.grid[y][x] != '.' or (x, y) in room_tiles:
-                        continue
-                    n = sum(
-                        self.grid[y + dy][x + dx] == '.'
-                        for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)))
-                    if n <= 1:
-                        self.grid[y][x] = '#'
-                        changed = True
+        grid  = self.grid
+        queue = deque(
+            (x, y)
+            for y in range(1, self.map_height - 1)
+            for x in range(1, self.map_width - 1)
+            if grid[y][x] == '.' and (x, y) not in room_tiles)
+        while queue:
+            x, y = queue.popleft()
+            if not (0 < x < self.map_width - 1 and 0 < y < self.map_height - 1):
+                continue
+            if grid[y][x] != '.' or (x, y) in room_tiles:
+                continue
+            n = ((grid[y + 1][x] == '.') + (grid[y - 1][x] == '.') +
+                 (grid[y][x + 1] == '.') + (grid[y][x - 1] == '.'))
+            if n <= 1:
+                grid[y][x] = '#'
+                queue.extend(((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)))
 
     def _bfs(self, src, dst, adj):
         q = deque([src])
@@ -391,12 +539,14 @@ class MapGenerator:
     # ── public API ────────────────────────────────────────────────────────────
 
     def generate(self):
-        random.seed(self.seed)
+        # Per-instance RNG: concurrent requests must not share random's state
+        self.rng         = random.Random(self.seed)
         self.grid        = [['#'] * self.map_width for _ in range(self.map_height)]
         self.rooms       = []
         self.rooms_by_id = {}
         self.adj         = {}
         self.next_id     = 0
+        self.room_index  = SpatialGrid(self.room_max_size + 2)
 
         self._place_normal_rooms()
         self._connect_normal_rooms()
@@ -412,14 +562,14 @@ class MapGenerator:
 
         # ── Labels ────────────────────────────────────────────────────────────
         # Assign a unique cyberpunk codename to every room
-        used_per_type = {t: [] for t in _ROOM_NAMES}
+        used_per_type = {t: set() for t in _ROOM_NAMES}
         for r in self.rooms:
             pool  = _ROOM_NAMES.get(r.type, _ROOM_NAMES['normal'])
             avail = [n for n in pool if n not in used_per_type[r.type]]
             if not avail:
                 avail = pool  # allow repeats only when pool exhausted
-            r.label = random.choice(avail)
-            used_per_type[r.type].append(r.label)
+            r.label = self.rng.choice(avail)
+            used_per_type[r.type].add(r.label)
 
         # One corridor label per unique adjacency edge
         seen_edges  = set()
@@ -431,8 +581,8 @@ class MapGenerator:
                 if key in seen_edges:
                     continue
                 seen_edges.add(key)
-                prefix = random.choice(_CORRIDOR_PREFIXES)
-                label  = f"{prefix}-{random.choice(alpha)}{random.randint(1, 9)}"
+                prefix = self.rng.choice(_CORRIDOR_PREFIXES)
+                label  = f"{prefix}-{self.rng.choice(alpha)}{self.rng.randint(1, 9)}"
                 connections.append({'from': rid, 'to': nid, 'label': label})
 
         return {
@@ -456,6 +606,69 @@ class MapGenerator:
         }
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+#  MAP CACHE + BINARY PACKING
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Binary layout (little-endian):
+#   0  4s  magic b'DMAP'
+#   4  B   version (1)      5  3x  reserved
+#   8  I   width           12  I   height
+#  16  I   seed            20  I   meta length (bytes)
+#  24  tile bits — row-major, MSB first, 1 = floor; ceil(w*h/8) bytes
+#  ..  meta — UTF-8 JSON: everything in the JSON response except 'grid'
+_PACK_HEADER  = struct.Struct('<4sB3xIIII')
+_PACK_MAGIC   = b'DMAP'
+_PACK_VERSION = 1
+_TILE_BITS    = str.maketrans('#.', '01')
+
+
+def pack_map(result):
+    bits  = ''.join(result['grid']).translate(_TILE_BITS)
+    bits += '0' * (-len(bits) % 8)
+    tiles = int(bits, 2).to_bytes(len(bits) // 8, 'big') if bits else b''
+    meta  = json.dumps({k: v for k, v in result.items() if k != 'grid'},
+                       separators=(',', ':')).encode('utf-8')
+    header = _PACK_HEADER.pack(_PACK_MAGIC, _PACK_VERSION, result['width'],
+                               result['height'], result['seed'], len(meta))
+    return header + tiles + meta
+
+
+class MapCache:
+    """Thread-safe LRU of generated maps keyed by MapGenerator.cache_key()."""
+    def __init__(self, size):
+        self.size    = size
+        self._items  = OrderedDict()
+        self._lock   = threading.Lock()
+        self.hits    = 0
+        self.misses  = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, gen):
+        """Return (result, packed_bytes, hit) for a validated generator."""
+        key = gen.cache_key()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1], True
+            self.misses += 1
+        result = gen.generate()
+        packed = pack_map(result)
+        with self._lock:
+            self._items[key] = (result, packed)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return result, packed, False
+
+
+map_cache = MapCache(MAP_CACHE_SIZE)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  FLASK ROUTES
 # ─────────────────────────────────────────────────────────────────────────────
@@ -468,16 +681,27 @@ def index():
 @app.route('/generate', methods=['POST'])
 def generate():
     data = request.get_json(force=True, silent=True) or {}
+    t0   = time.perf_counter()
     try:
-        result = MapGenerator(**data).generate()
-        return jsonify(result)
+        result, packed, hit = map_cache.get(MapGenerator(**data))
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 400
 
+    if request.args.get('format') == 'bin':
+        resp = Response(packed, mimetype='application/octet-stream')
+    else:
+        resp = jsonify(result)
+    resp.headers['X-Darkmap-Cache'] = 'hit' if hit else 'miss'
+    resp.headers['X-Darkmap-Ms']    = f"{(time.perf_counter() - t0) * 1000:.1f}"
+    return resp
+
 
 @app.route('/health')
 def health():
-    return jsonify({'status': 'ONLINE', 'version': '2.0'})
+    return jsonify({'status': 'ONLINE', 'version': '2.0',
+                    'cache': {'size': len(map_cache),
+                              'hits': map_cache.hits,
+                              'misses': map_cache.misses}})
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1017,11 +1241,11 @@ body::after {
         <div class="section-title">MAP DIMENSIONS</div>
         <div class="field">
           <label>WIDTH</label>
-          <input type="number" id="p-map_width" value="60" min="24" max="120" step="4">
+          <input type="number" id="p-map_width" value="60" min="24" max="2048" step="4">
         </div>
         <div class="field">
           <label>HEIGHT</label>
-          <input type="number" id="p-map_height" value="40" min="18" max="80" step="2">
+          <input type="number" id="p-map_height" value="40" min="18" max="2048" step="2">
         </div>
       </div>
 
@@ -1030,11 +1254,11 @@ body::after {
         <div class="section-title">ROOM CONFIG</div>
         <div class="field">
           <label>ROOMS MIN</label>
-          <input type="number" id="p-room_count_min" value="6" min="2" max="30">
+          <input type="number" id="p-room_count_min" value="6" min="2" max="20000">
         </div>
         <div class="field">
           <label>ROOMS MAX</label>
-          <input type="number" id="p-room_count_max" value="12" min="2" max="40">
+          <input type="number" id="p-room_count_max" value="12" min="2" max="20000">
         </div>
         <div class="field">
           <label>SIZE MIN</label>
@@ -1283,6 +1507,29 @@ function getParams() {
   return p;
 }
 
+// ── Packed map decoder (see pack_map() on the server) ──
+function decodePackedMap(buf) {
+  const view = new DataView(buf);
+  const magic = String.fromCharCode(...new Uint8Array(buf, 0, 4));
+  if (magic !== 'DMAP' || view.getUint8(4) !== 1) throw new Error('bad map payload');
+  const width   = view.getUint32(8,  true);
+  const height  = view.getUint32(12, true);
+  const metaLen = view.getUint32(20, true);
+  const tileLen = Math.ceil(width * height / 8);
+  const bits    = new Uint8Array(buf, 24, tileLen);
+  const meta    = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 24 + tileLen, metaLen)));
+
+  const grid = new Array(height);
+  const row  = new Array(width);
+  for (let y = 0, i = 0; y < height; y++) {
+    for (let x = 0; x < width; x++, i++)
+      row[x] = (bits[i >> 3] >> (7 - (i & 7))) & 1 ? '.' : '#';
+    grid[y] = row.join('');
+  }
+  meta.grid = grid;
+  return meta;
+}
+
 // ── Room tile map builder ──────────────────────────────
 function buildRTM(rooms) {
   const m = new Map();
@@ -1602,12 +1849,13 @@ async function generate() {
   setStatus('INITIALISING MAP COMPILER...', 'busy');
 
   try {
-    const res  = await fetch('/generate', {
+    const res  = await fetch('/generate?format=bin', {
       method:  'POST',
       headers: { 'Content-Type': 'application/json' },
       body:    JSON.stringify(params),
     });
-    const data = await res.json();
+    // Errors come back as JSON; maps as packed tile bits
+    const data = res.ok ? decodePackedMap(await res.arrayBuffer()) : await res.json();
 
     if (!data.ok) {
       setStatus('ERROR: ' + data.error, 'error');
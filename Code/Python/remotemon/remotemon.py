@@ -1,15 +1,20 @@
 #!/usr/bin/env python3
 
+import copy
 import json
 import os
 import re
 import shutil
 import socket
+import sqlite3
+import stat
 import subprocess
+import threading
 import time
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import psutil
 import requests
@@ -22,12 +27,29 @@ CONFIG = {
 
     # Runtime
     "interval_seconds": 15,
-    "state_file": "/var/tmp/remotemon_state.json",
+    "store_file": "/var/tmp/remotemon.db",
+    "state_file": "/var/tmp/remotemon_state.json",  # legacy JSON state, imported into store_file once
     "log_file": "/var/log/remotemon.log",
     "watchdog_file": "/var/tmp/remotemon.watchdog",
     "snapshot_dir": "/var/tmp/remotemon-snapshots",
     "snapshot_retention_days": 7,
 
+    # Check scheduling
+    # interval_seconds is the scheduler tick; checks listed here run on their
+    # own cadence and timeout, every other check runs on every tick.
+    "check_workers": 4,
+    "check_default_timeout_seconds": 30,
+    "check_slow_log_seconds": 2.0,
+    "check_cycle_wait_seconds": 1.0,
+    "check_schedule": {
+        "disks": {"interval_seconds": 60, "timeout_seconds": 60},
+        "inodes": {"interval_seconds": 300, "timeout_seconds": 120},
+        "systemd_failed_units": {"interval_seconds": 60},
+        "suspicious_processes": {"interval_seconds": 30},
+        "file_integrity": {"interval_seconds": 60},
+        "service_awareness": {"interval_seconds": 30, "timeout_seconds": 45},
+    },
+
     # Thresholds
     "ram_alert_pct": 85,
     "disk_alert_pct": 85,
@@ -35,6 +57,9 @@ CONFIG = {
     "swap_alert_pct": 50,
     "cpu_load_alert_pct": 90,
     "journal_burst_error_count": 20,
+    "journal_window_minutes": 10,
+    "journal_initial_lines": 200,
+    "journal_recent_max_lines": 200,
     "cpu_process_sample_seconds": 0.30,
     "top_process_limit": 5,
 
@@ -60,6 +85,11 @@ CONFIG = {
     "disk_paths": ["/"],
     "triage_dir_depth": 2,
     "triage_top_n": 5,
+    "triage_scan_workers": 4,
+    "triage_scan_timeout_seconds": 60,
+    "triage_scan_reuse_seconds": 60,
+    "triage_scan_cache_max_age_seconds": 900,
+    "triage_scan_cache_max_dirs": 500000,
 
     # Network anomaly detection
     "net_window_seconds": 2 * 60 * 60,
@@ -67,6 +97,14 @@ CONFIG = {
     "net_alert_sigma_mult": 4.0,
     "net_min_baseline_samples": 60,
     "net_connection_summary_limit": 10,
+
+    # Sample / alert history retention
+    # Raw samples are kept for at least net_window_seconds; each tier is
+    # [bucket_seconds, retention_seconds] of rolled-up count/sum/sum^2/peak.
+    "store_raw_retention_seconds": 2 * 60 * 60,
+    "store_rollup_tiers": [[300, 7 * 86400], [3600, 90 * 86400]],
+    "store_alert_retention_seconds": 90 * 86400,
+    "store_prune_interval_seconds": 3600,
     "new_outbound_connection_cooldown_seconds": 1800,
     "new_listen_port_cooldown_seconds": 1800,
 
@@ -76,6 +114,8 @@ CONFIG = {
     "failed_ssh_window_minutes": 10,
     "failed_ssh_alert_count": 10,
     "failed_ssh_log_tail_lines": 6000,
+    "log_tail_initial_bytes": 1024 * 1024,
+    "log_tail_max_read_bytes": 16 * 1024 * 1024,
     "alert_new_ssh_source": True,
     "alert_root_ssh_login": True,
     "sudo_watch_users": [],
@@ -180,12 +220,165 @@ def load_state(path: str) -> Dict[str, Any]:
         return {}
 
 
-def save_state(path: str, state: Dict[str, Any]) -> None:
-    tmp = path + ".tmp"
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(state, f)
-    os.replace(tmp, path)
+class StateStore:
+    """SQLite (WAL) store for monitor state, metric samples and alert history.
+
+    Dict-valued state sections are stored one row per entry and only entries
+    that changed since the last save are written. Samples are kept raw for
+    the baseline window and rolled up into the configured tiers on insert.
+    """
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.persisted: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        self.last_prune_ts = 0.0
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS state (
+                section TEXT NOT NULL,
+                key TEXT NOT NULL,
+                nested INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (section, key)
+            );
+            CREATE TABLE IF NOT EXISTS samples (
+                metric TEXT NOT NULL,
+                ts REAL NOT NULL,
+                value REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS samples_window ON samples (metric, ts, value);
+            CREATE TABLE IF NOT EXISTS rollups (
+                metric TEXT NOT NULL,
+                bucket_seconds INTEGER NOT NULL,
+                bucket_ts INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                total REAL NOT NULL,
+                total_sq REAL NOT NULL,
+                peak REAL NOT NULL,
+                PRIMARY KEY (metric, bucket_seconds, bucket_ts)
+            );
+            CREATE TABLE IF NOT EXISTS alert_events (
+                ts REAL NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                summary TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS alert_events_ts ON alert_events (ts);
+            """
+        )
+        self.db.commit()
+
+    def load_state(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        with self.lock:
+            rows = self.db.execute("SELECT section, key, nested, value FROM state").fetchall()
+        for section, key, nested, raw in rows:
+            value = json.loads(raw)
+            if nested:
+                state.setdefault(section, {})[key] = value
+            else:
+                state[section] = value
+            self.persisted[(section, key)] = (nested, json.loads(raw))
+        return state
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        upserts: List[Tuple[str, str, int, str]] = []
+        current = set()
+        for section, value in state.items():
+            if isinstance(value, dict) and value:
+                entries = [(str(k), 1, v) for k, v in value.items()]
+            else:
+                entries = [("", 0, value)]
+            for key, nested, v in entries:
+                ident = (section, key)
+                current.add(ident)
+                if self.persisted.get(ident) == (nested, v):
+                    continue
+                raw = json.dumps(v)
+                upserts.append((section, key, nested, raw))
+                self.persisted[ident] = (nested, json.loads(raw))
+        deletes = [ident for ident in self.persisted if ident not in current]
+        for ident in deletes:
+            del self.persisted[ident]
+        if not upserts and not deletes:
+            return
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO state (section, key, nested, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(section, key) DO UPDATE SET nested = excluded.nested, value = excluded.value",
+                upserts,
+            )
+            self.db.executemany("DELETE FROM state WHERE section = ? AND key = ?", deletes)
+            self.db.commit()
+
+    def record_samples(self, ts: float, values: Dict[str, float]) -> None:
+        raw = [(metric, ts, float(v)) for metric, v in values.items()]
+        rolled = [
+            (metric, int(bucket), int(ts // bucket) * int(bucket), float(v), float(v) * float(v), float(v))
+            for bucket, _ in CONFIG["store_rollup_tiers"]
+            for metric, v in values.items()
+        ]
+        with self.lock:
+            self.db.executemany("INSERT INTO samples (metric, ts, value) VALUES (?, ?, ?)", raw)
+            self.db.executemany(
+                "INSERT INTO rollups (metric, bucket_seconds, bucket_ts, count, total, total_sq, peak) VALUES (?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(metric, bucket_seconds, bucket_ts) DO UPDATE SET count = count + 1, total = total + excluded.total, "
+                "total_sq = total_sq + excluded.total_sq, peak = MAX(peak, excluded.peak)",
+                rolled,
+            )
+            self.db.commit()
+
+    def window_sums(self, metric: str, since_ts: float) -> Tuple[int, float, float]:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT COUNT(*), TOTAL(value), TOTAL(value * value) FROM samples WHERE metric = ? AND ts >= ?",
+                (metric, since_ts),
+            ).fetchone()
+        return int(row[0]), float(row[1]), float(row[2])
+
+    def record_alerts(self, ts: float, alerts: List[Dict[str, Any]]) -> None:
+        if not alerts:
+            return
+        rows = [(ts, a["key"], a.get("status", "firing"), a["severity"], a["summary"]) for a in alerts]
+        with self.lock:
+            self.db.executemany("INSERT INTO alert_events (ts, key, status, severity, summary) VALUES (?, ?, ?, ?, ?)", rows)
+            self.db.commit()
+
+    def prune(self, now_ts: float) -> None:
+        if now_ts - self.last_prune_ts < CONFIG["store_prune_interval_seconds"]:
+            return
+        self.last_prune_ts = now_ts
+        raw_keep = max(int(CONFIG["store_raw_retention_seconds"]), int(CONFIG["net_window_seconds"]))
+        with self.lock:
+            self.db.execute("DELETE FROM samples WHERE ts < ?", (now_ts - raw_keep,))
+            for bucket, keep in CONFIG["store_rollup_tiers"]:
+                self.db.execute("DELETE FROM rollups WHERE bucket_seconds = ? AND bucket_ts < ?", (int(bucket), now_ts - keep))
+            self.db.execute("DELETE FROM alert_events WHERE ts < ?", (now_ts - CONFIG["store_alert_retention_seconds"],))
+            self.db.commit()
+
+
+STORE: Optional[StateStore] = None
+
+
+def open_store() -> Tuple[StateStore, Dict[str, Any]]:
+    """Open the store and, on first use, import the legacy JSON state file."""
+    store = StateStore(CONFIG["store_file"])
+    state = store.load_state()
+    if state or not os.path.exists(CONFIG["state_file"]):
+        return store, state
+    state = load_state(CONFIG["state_file"])
+    net = state.pop("net", {})
+    for name, metric in (("up_samples", "net_up"), ("down_samples", "net_down")):
+        for ts, value in net.get(name, []):
+            store.record_samples(float(ts), {metric: float(value)})
+    store.save_state(state)
+    os.replace(CONFIG["state_file"], CONFIG["state_file"] + ".migrated")
+    return store, state
 
 
 def format_bytes(num: float) -> str:
@@ -411,14 +604,13 @@ def finalize_sent_alert_state(state: Dict[str, Any], alert: Dict[str, Any], now_
     slot["last_status"] = alert.get("status")
 
 
-def compute_stats(values: List[float]) -> Tuple[float, float]:
-    n = len(values)
+def compute_stats(n: int, total: float, total_sq: float) -> Tuple[float, float]:
     if n == 0:
         return 0.0, 0.0
-    mean = sum(values) / n
+    mean = total / n
     if n < 2:
         return mean, 0.0
-    var = sum((x - mean) ** 2 for x in values) / (n - 1)
+    var = max(0.0, (total_sq - n * mean * mean) / (n - 1))
     return mean, var ** 0.5
 
 
@@ -748,20 +940,15 @@ def queue_or_send(host: str, state: Dict[str, Any], alerts: List[Dict[str, Any]]
         state["telegram_fail_count"] = 0
 
 
-def net_anomaly_check(state: Dict[str, Any], up_bps: float, down_bps: float, now_ts: float) -> Optional[Dict[str, Any]]:
-    net = state.setdefault("net", {})
-    up_samples = net.setdefault("up_samples", [])
-    down_samples = net.setdefault("down_samples", [])
-    up_samples[:] = trim_old_samples(up_samples, CONFIG["net_window_seconds"], now_ts)
-    down_samples[:] = trim_old_samples(down_samples, CONFIG["net_window_seconds"], now_ts)
-    up_samples.append([now_ts, float(up_bps)])
-    down_samples.append([now_ts, float(down_bps)])
-    if len(up_samples) < CONFIG["net_min_baseline_samples"] or len(down_samples) < CONFIG["net_min_baseline_samples"]:
+def net_anomaly_check(store: StateStore, state: Dict[str, Any], up_bps: float, down_bps: float, now_ts: float) -> Optional[Dict[str, Any]]:
+    store.record_samples(now_ts, {"net_up": up_bps, "net_down": down_bps})
+    since = now_ts - CONFIG["net_window_seconds"]
+    up_sums = store.window_sums("net_up", since)
+    down_sums = store.window_sums("net_down", since)
+    if up_sums[0] < CONFIG["net_min_baseline_samples"] or down_sums[0] < CONFIG["net_min_baseline_samples"]:
         return None
-    up_vals = [v for _, v in up_samples]
-    down_vals = [v for _, v in down_samples]
-    up_mean, up_std = compute_stats(up_vals)
-    down_mean, down_std = compute_stats(down_vals)
+    up_mean, up_std = compute_stats(*up_sums)
+    down_mean, down_std = compute_stats(*down_sums)
     up_thresh = max(up_mean * CONFIG["net_alert_factor"], up_mean + CONFIG["net_alert_sigma_mult"] * up_std)
     down_thresh = max(down_mean * CONFIG["net_alert_factor"], down_mean + CONFIG["net_alert_sigma_mult"] * down_std)
     active = (up_bps > up_thresh and up_bps > 0) or (down_bps > down_thresh and down_bps > 0)
@@ -784,6 +971,16 @@ def net_anomaly_check(state: Dict[str, Any], up_bps: float, down_bps: float, now
     return alert_transition(state, base, active, now_ts)
 
 
+def check_network(state: Dict[str, Any], now_ts: float) -> Optional[Dict[str, Any]]:
+    curr = snapshot_net_bytes()
+    prev = state.get("prev_net_bytes") or curr
+    prev_ts = float(state.get("prev_net_ts") or now_ts)
+    state["prev_net_bytes"] = curr
+    state["prev_net_ts"] = now_ts
+    up_bps, down_bps = get_net_rates(prev, curr, max(1e-6, now_ts - prev_ts))
+    return net_anomaly_check(STORE, state, up_bps, down_bps, now_ts)
+
+
 def check_ram(state: Dict[str, Any], now_ts: float) -> Optional[Dict[str, Any]]:
     vm = psutil.virtual_memory()
     active = vm.percent >= CONFIG["ram_alert_pct"]
@@ -828,19 +1025,162 @@ def check_swap(state: Dict[str, Any], now_ts: float) -> Optional[Dict[str, Any]]
     return alert_transition(state, base, active, now_ts)
 
 
+DIR_CACHE: Dict[str, Tuple[int, float, int, int, List[str], List[Tuple[int, int]]]] = {}
+USAGE_SCANS: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
+USAGE_SCAN_LOCK = threading.Lock()
+
+
+def scan_dir_entries(path: str, dev: int, now_ts: float) -> Tuple[int, int, List[str], List[Tuple[int, int]]]:
+    """Return (allocated bytes, entry count, same-device subdirectories, hardlinks) of one directory.
+
+    Files with more than one link are left out of the byte count and returned
+    as (inode, bytes) so the caller can count each inode once, like du.
+
+    Results are cached by directory mtime. Entry counts are exact for an
+    unchanged mtime, but files growing in place do not touch it, so entries
+    also expire after triage_scan_cache_max_age_seconds.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return 0, 0, [], []
+    cached = DIR_CACHE.get(path)
+    if cached and cached[0] == mtime_ns and now_ts - cached[1] < CONFIG["triage_scan_cache_max_age_seconds"]:
+        return cached[2], cached[3], cached[4], cached[5]
+    size = 0
+    count = 0
+    subdirs: List[str] = []
+    links: List[Tuple[int, int]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                count += 1
+                try:
+                    est = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(est.st_mode):
+                    size += est.st_blocks * 512
+                    if est.st_dev == dev:
+                        subdirs.append(entry.path)
+                elif est.st_nlink > 1:
+                    links.append((est.st_ino, est.st_blocks * 512))
+                else:
+                    size += est.st_blocks * 512
+    except OSError:
+        return 0, 0, [], []
+    DIR_CACHE[path] = (mtime_ns, now_ts, size, count, subdirs, links)
+    return size, count, subdirs, links
+
+
+def scan_usage(root: str, depth: int) -> Dict[str, Any]:
+    """Walk root without crossing filesystems and total bytes and inodes per directory.
+
+    Directories are read breadth-first on a bounded thread pool, with only a
+    few per worker in flight, and the deadline is checked as each one
+    completes; past it, nothing more is submitted and the result is marked
+    partial. Totals are kept only for directories up to depth; deeper ones
+    are charged to their ancestor at that depth, so memory stays proportional
+    to the widest level.
+    """
+    started = time.monotonic()
+    deadline = started + float(CONFIG["triage_scan_timeout_seconds"])
+    now_ts = time.time()
+    dev = os.stat(root).st_dev
+    totals: Dict[str, List[int]] = {root: [0, 0]}
+    queue: deque = deque([(root, 0, root)])
+    seen_links = set()
+    dirs = 0
+    partial = False
+    workers = max(1, int(CONFIG["triage_scan_workers"]))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="remotemon-scan")
+    in_flight: Dict[Future, Tuple[str, int, str]] = {}
+    try:
+        while queue or in_flight:
+            while queue and len(in_flight) < workers * 4:
+                item = queue.popleft()
+                in_flight[pool.submit(scan_dir_entries, item[0], dev, now_ts)] = item
+            done, _ = wait(in_flight, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                path, level, anchor = in_flight.pop(future)
+                size, count, subdirs, links = future.result()
+                dirs += 1
+                slot = totals[anchor]
+                slot[0] += size
+                slot[1] += count
+                for ino, linked_size in links:
+                    if ino not in seen_links:
+                        seen_links.add(ino)
+                        slot[0] += linked_size
+                for sub in subdirs:
+                    sub_anchor = sub if level + 1 <= depth else anchor
+                    if sub_anchor == sub:
+                        totals[sub] = [0, 0]
+                    queue.append((sub, level + 1, sub_anchor))
+            if (queue or in_flight) and time.monotonic() >= deadline:
+                partial = True
+                break
+    finally:
+        # Directories already being read finish in the background; their results are dropped.
+        pool.shutdown(wait=False, cancel_futures=True)
+    if len(DIR_CACHE) > CONFIG["triage_scan_cache_max_dirs"]:
+        DIR_CACHE.clear()
+
+    # Roll anchor totals up into their ancestors, deepest first.
+    for path in sorted(totals, key=lambda p: p.count(os.sep), reverse=True):
+        if path != root:
+            parent = totals.get(os.path.dirname(path))
+            if parent is not None:
+                parent[0] += totals[path][0]
+                parent[1] += totals[path][1]
+    ranked = [(p, t[0], t[1]) for p, t in totals.items() if p != root]
+    return {
+        "bytes": sorted(ranked, key=lambda x: x[1], reverse=True),
+        "inodes": sorted(ranked, key=lambda x: x[2], reverse=True),
+        "total_bytes": totals[root][0],
+        "total_inodes": totals[root][1],
+        "dirs": dirs,
+        "partial": partial,
+        "seconds": time.monotonic() - started,
+    }
+
+
+def cached_usage_scan(root: str, depth: int) -> Optional[Dict[str, Any]]:
+    """Share one scan between the disk and inode checks for triage_scan_reuse_seconds."""
+    with USAGE_SCAN_LOCK:
+        hit = USAGE_SCANS.get((root, depth))
+        if hit and time.time() - hit[0] < CONFIG["triage_scan_reuse_seconds"]:
+            return hit[1]
+        try:
+            result = scan_usage(root, depth)
+        except OSError as e:
+            safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [ERROR] usage scan of {root} failed: {e}")
+            return None
+        USAGE_SCANS[(root, depth)] = (time.time(), result)
+        return result
+
+
+def render_scan_footer(result: Dict[str, Any]) -> str:
+    note = " (partial, stopped at timeout)" if result["partial"] else ""
+    return f"Scanned {result['dirs']} directories in {result['seconds']:.1f}s{note}"
+
+
 def get_top_dirs_by_size(path: str, limit: int = 5, depth: int = 2) -> List[str]:
-    rc, out, _ = run_cmd(["du", "-x", f"--max-depth={depth}", "-h", path], timeout=20)
-    if rc != 0 or not out:
+    result = cached_usage_scan(path, depth)
+    if not result or not result["bytes"]:
         return []
-    lines = [l.strip() for l in out.splitlines() if l.strip()]
-    return lines[-limit:]
+    lines = [f"{format_bytes(size)}  {p}" for p, size, _ in result["bytes"][:limit]]
+    lines.append(render_scan_footer(result))
+    return lines
 
 
-def get_top_inode_dirs(path: str, limit: int = 5) -> List[str]:
-    rc, out, _ = run_cmd(["bash", "-lc", f"find {path} -xdev -mindepth 1 -maxdepth 2 -printf '%h\n' 2>/dev/null | sort | uniq -c | sort -nr | head -n {limit}"], timeout=20)
-    if rc != 0 or not out:
+def get_top_inode_dirs(path: str, limit: int = 5, depth: int = 2) -> List[str]:
+    result = cached_usage_scan(path, depth)
+    if not result or not result["inodes"]:
         return []
-    return [l.strip() for l in out.splitlines() if l.strip()]
+    lines = [f"{count} inodes  {p}" for p, _, count in result["inodes"][:limit]]
+    lines.append(render_scan_footer(result))
+    return lines
 
 
 def get_deleted_open_files(limit: int = 5) -> List[str]:
@@ -900,7 +1240,7 @@ def check_inodes(state: Dict[str, Any], now_ts: float) -> List[Dict[str, Any]]:
         active = used_pct >= CONFIG["inode_alert_pct"]
         details = [f"Used inodes: {used}", f"Free inodes: {free}", f"Total inodes: {total}"]
         if active:
-            heavy = get_top_inode_dirs(path, limit=CONFIG["triage_top_n"])
+            heavy = get_top_inode_dirs(path, limit=CONFIG["triage_top_n"], depth=CONFIG["triage_dir_depth"])
             if heavy:
                 details.append("Top file-count-heavy directories:")
                 details.extend(heavy)
@@ -981,26 +1321,126 @@ def check_reboot(state: Dict[str, Any], now_ts: float) -> Optional[Dict[str, Any
     return alert_transition(state, base, active, now_ts)
 
 
-def read_auth_lines() -> Tuple[Optional[str], List[str]]:
-    log_path = None
+def find_auth_log() -> Optional[str]:
     for candidate in CONFIG["auth_log_candidates"]:
         if os.path.exists(candidate):
-            log_path = candidate
-            break
+            return candidate
+    return None
+
+
+def read_complete_lines(path: str, offset: int, limit: int) -> Tuple[List[str], int, int]:
+    """Read whole lines written after offset, at most limit bytes from the end.
+
+    Returns (lines, new_offset, inode). A trailing partial line is left for
+    the next call; when the budget forces a skip, the cut line is dropped.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size < offset:
+            offset = 0
+        start = max(offset, st.st_size - limit)
+        base = max(0, start - 1)
+        f.seek(base)
+        data = f.read(st.st_size - base)
+    skip = start - base
+    if start > 0 and data[:1] != b"\n":
+        nl = data.find(b"\n")
+        if nl < 0:
+            return [], start, st.st_ino
+        skip = nl + 1
+    end = data.rfind(b"\n") + 1
+    if end <= skip:
+        return [], base + skip, st.st_ino
+    lines = data[skip:end].decode("utf-8", errors="ignore").splitlines()
+    return lines, base + end, st.st_ino
+
+
+def rotated_log_path(path: str, inode: Optional[int]) -> Optional[str]:
+    candidate = path + ".1"
+    try:
+        if inode is not None and os.stat(candidate).st_ino == inode:
+            return candidate
+    except OSError:
+        pass
+    return None
+
+
+def tail_log(state: Dict[str, Any], path: str) -> List[str]:
+    """Return lines appended to path since the previous call.
+
+    The inode and byte offset are kept in state["log_tails"]. On rotation the
+    rest of the previous file is drained from <path>.1 when it is still there;
+    on truncation reading restarts at 0. The first call only reads the last
+    log_tail_initial_bytes so startup cost does not depend on log size.
+    """
+    tails = state.setdefault("log_tails", {})
+    slot = tails.get(path)
+    lines: List[str] = []
+    try:
+        inode = os.stat(path).st_ino
+    except OSError:
+        return lines
+    if slot is None:
+        offset, budget = 0, int(CONFIG["log_tail_initial_bytes"])
+    else:
+        offset, budget = int(slot.get("offset", 0)), int(CONFIG["log_tail_max_read_bytes"])
+        if slot.get("inode") != inode:
+            rotated = rotated_log_path(path, slot.get("inode"))
+            if rotated:
+                try:
+                    lines.extend(read_complete_lines(rotated, offset, budget)[0])
+                except OSError:
+                    pass
+            offset = 0
+    try:
+        new_lines, offset, inode = read_complete_lines(path, offset, budget)
+    except OSError:
+        return lines
+    lines.extend(new_lines)
+    tails[path] = {"inode": inode, "offset": offset}
+    return lines
+
+
+def retain_recent(entries: List[List[Any]], new_lines: List[str], window_seconds: int, limit: int, now_ts: float) -> List[List[Any]]:
+    entries = trim_old_samples(entries, window_seconds, now_ts)
+    entries.extend([now_ts, line] for line in new_lines)
+    return entries[-limit:]
+
+
+def is_auth_event(line: str) -> bool:
+    return (
+        "Failed password" in line
+        or ("Accepted" in line and "sshd" in line)
+        or ("sudo:" in line and "COMMAND=" in line)
+    )
+
+
+def read_auth_lines(state: Dict[str, Any], now_ts: float) -> Tuple[Optional[str], List[str]]:
+    """Return auth events seen within failed_ssh_window_minutes.
+
+    Only bytes appended since the last cycle are read; matching lines are kept
+    in state["auth_recent"] with the time they were first observed.
+    """
+    log_path = find_auth_log()
     if not log_path:
         return None, []
-    try:
-        with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-            return log_path, f.readlines()[-CONFIG["failed_ssh_log_tail_lines"]:]
-    except Exception:
-        return log_path, []
+    new_lines = [l.strip() for l in tail_log(state, log_path) if is_auth_event(l)]
+    recent = retain_recent(
+        state.get("auth_recent", []),
+        new_lines,
+        int(CONFIG["failed_ssh_window_minutes"]) * 60,
+        int(CONFIG["failed_ssh_log_tail_lines"]),
+        now_ts,
+    )
+    state["auth_recent"] = recent
+    return log_path, [line for _, line in recent]
 
 
 def check_auth_activity(state: Dict[str, Any], now_ts: float) -> List[Dict[str, Any]]:
     alerts: List[Dict[str, Any]] = []
     if not CONFIG["check_failed_ssh"]:
         return alerts
-    log_path, lines = read_auth_lines()
+    log_path, lines = read_auth_lines(state, now_ts)
     if not log_path:
         return alerts
     failed_count = 0
@@ -1035,7 +1475,7 @@ def check_auth_activity(state: Dict[str, Any], now_ts: float) -> List[Dict[str,
         severity="WARNING",
         category="AUTH",
         summary="Repeated SSH authentication failures detected." if brute_active else "SSH authentication failure activity recovered.",
-        threshold=f">= {CONFIG['failed_ssh_alert_count']} failed password events in recent log tail",
+        threshold=f">= {CONFIG['failed_ssh_alert_count']} failed password events in {CONFIG['failed_ssh_window_minutes']} minutes",
         details=[f"Approximate failed events counted: {failed_count}", f"Top source IPs: {', '.join(f'{ip}({cnt})' for ip, cnt in failed_ips.most_common(10)) or 'none'}", f"Log source: {log_path}"],
         action="Review SSH exposure, block abusive sources, and confirm whether attempts are expected.",
     )
@@ -1330,9 +1770,44 @@ def check_service_awareness(state: Dict[str, Any], now_ts: float) -> List[Dict[s
     return alerts
 
 
+def journal_since_cursor(state: Dict[str, Any], priority: str) -> List[str]:
+    """Return journal entries at priority logged after the stored cursor.
+
+    The cursor lives in state["journal_cursors"]. Without one, only the last
+    journal_initial_lines entries are read. A rejected cursor (e.g. after
+    journal vacuuming) is dropped so the next cycle starts from the tail.
+    """
+    cursors = state.setdefault("journal_cursors", {})
+    cursor = cursors.get(priority)
+    cmd = ["journalctl", "--no-pager", "-p", priority, "--show-cursor"]
+    if cursor:
+        cmd.extend(["--after-cursor", cursor])
+    else:
+        cmd.extend(["-n", str(CONFIG["journal_initial_lines"])])
+    rc, out, _ = run_cmd(cmd)
+    if rc != 0:
+        cursors.pop(priority, None)
+        return []
+    lines: List[str] = []
+    for line in out.splitlines():
+        if line.startswith("-- cursor: "):
+            cursors[priority] = line[len("-- cursor: "):].strip()
+        elif line.strip() and not line.startswith("-- "):
+            lines.append(line)
+    return lines
+
+
 def check_journal_patterns(state: Dict[str, Any], now_ts: float) -> List[Dict[str, Any]]:
     alerts: List[Dict[str, Any]] = []
-    recent_err = journal_tail(priority="err", lines=200)
+    recent = retain_recent(
+        state.get("journal_recent", []),
+        journal_since_cursor(state, "err"),
+        int(CONFIG["journal_window_minutes"]) * 60,
+        int(CONFIG["journal_recent_max_lines"]),
+        now_ts,
+    )
+    state["journal_recent"] = recent
+    recent_err = [line for _, line in recent]
     text = "\n".join(recent_err)
     patterns = [
         ("oom_killer", "CRITICAL", "OOM killer activity detected.", bool(re.search(r"Out of memory|Killed process", text, re.I))),
@@ -1362,7 +1837,7 @@ def emit_startup_self_test(host: str, state: Dict[str, Any]) -> None:
     checks.append(f"requests={'ok' if requests else 'missing'}")
     for cmd in ["ss", "systemctl", "journalctl"]:
         checks.append(f"{cmd}={'ok' if shutil.which(cmd) else 'missing'}")
-    log_path, _ = read_auth_lines()
+    log_path = find_auth_log()
     checks.append(f"auth_log={'ok' if log_path else 'missing'}")
     checks.append(f"telegram={'configured' if CONFIG['telegram_bot_token'] and CONFIG['telegram_chat_id'] else 'not-configured'}")
     alert = make_alert(
@@ -1388,7 +1863,13 @@ def check_heartbeat(host: str, state: Dict[str, Any], now_ts: float) -> None:
         severity="INFO",
         category="HEARTBEAT",
         summary="remotemon heartbeat.",
-        details=[f"host={host}", f"boot_time={utc_from_ts(psutil.boot_time())}", f"state_file={CONFIG['state_file']}", f"watchdog_file={CONFIG['watchdog_file']}"],
+        details=[
+            f"host={host}",
+            f"boot_time={utc_from_ts(psutil.boot_time())}",
+            f"store_file={CONFIG['store_file']}",
+            f"watchdog_file={CONFIG['watchdog_file']}",
+            *render_check_runtimes(state, limit=5),
+        ],
         action="No action required.",
         digest_eligible=False,
     )
@@ -1411,71 +1892,238 @@ def maybe_attach_snapshots(host: str, alerts: List[Dict[str, Any]]) -> None:
             alert["snapshot_path"] = create_forensics_bundle(host, alert)
 
 
+CHECKS: List[Tuple[str, Callable[[Dict[str, Any], float], Any]]] = [
+    ("reboot", check_reboot),
+    ("ram", check_ram),
+    ("swap", check_swap),
+    ("cpu_load", check_cpu_load),
+    ("systemd_failed_units", check_systemd_failed_units),
+    ("new_listening_ports", check_new_listening_ports),
+    ("new_outbound_remotes", check_new_outbound_remotes),
+    ("network", check_network),
+    ("auth_activity", check_auth_activity),
+    ("disks", check_disks),
+    ("inodes", check_inodes),
+    ("suspicious_processes", scan_suspicious_processes),
+    ("file_integrity", check_file_integrity),
+    ("service_awareness", check_service_awareness),
+    ("journal_patterns", check_journal_patterns),
+]
+
+
+_DELETED = object()
+
+
+def state_changes(base: Dict[str, Any], new: Dict[str, Any], path: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], Any]]:
+    """Leaf-level edits that turn `base` into `new`, as (key path, value) pairs.
+
+    Nested dicts are walked so that two checks touching different keys of the
+    same section (e.g. their own entries in state["alerts"]) do not overwrite
+    each other, even when the section did not exist in the snapshot; any other
+    value is compared and replaced whole.
+    """
+    out: List[Tuple[Tuple[str, ...], Any]] = []
+    for key, value in new.items():
+        old = base.get(key, _DELETED)
+        if isinstance(value, dict):
+            if value or isinstance(old, dict):
+                out.extend(state_changes(old if isinstance(old, dict) else {}, value, path + (key,)))
+            else:
+                out.append((path + (key,), {}))  # new empty section
+        elif old is _DELETED or old != value:
+            out.append((path + (key,), value))
+    out.extend((path + (key,), _DELETED) for key in base if key not in new)
+    return out
+
+
+def apply_state_changes(state: Dict[str, Any], changes: List[Tuple[Tuple[str, ...], Any]]) -> None:
+    for path, value in changes:
+        node = state
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        if value is _DELETED:
+            node.pop(path[-1], None)
+        elif isinstance(value, dict) and isinstance(node.get(path[-1]), dict):
+            continue  # an empty section someone else has already created
+        else:
+            node[path[-1]] = value
+
+
+def timed_check(fn: Callable[[Dict[str, Any], float], Any], base: Dict[str, Any], now_ts: float) -> Tuple[Any, float, Optional[str], List[Tuple[Tuple[str, ...], Any]]]:
+    """Run one check on a private copy of `base` (a snapshot nobody mutates) and
+    return its result, runtime, error and the state edits it made."""
+    started = time.monotonic()
+    work = copy.deepcopy(base)
+    try:
+        result, error = fn(work, now_ts), None
+    except Exception as e:
+        result, error = None, str(e)
+    return result, time.monotonic() - started, error, state_changes(base, work)
+
+
+def check_schedule(name: str) -> Tuple[float, float]:
+    spec = CONFIG["check_schedule"].get(name, {})
+    interval = float(spec.get("interval_seconds", CONFIG["interval_seconds"]))
+    timeout = float(spec.get("timeout_seconds", CONFIG["check_default_timeout_seconds"]))
+    return interval, timeout
+
+
+def render_check_runtimes(state: Dict[str, Any], limit: int = 5) -> List[str]:
+    stats = state.get("check_runtimes", {})
+    ranked = sorted(stats.items(), key=lambda x: x[1].get("total_seconds", 0.0), reverse=True)[:limit]
+    if not ranked:
+        return []
+    out = ["Check runtimes (by total time):"]
+    for name, slot in ranked:
+        runs = int(slot.get("runs", 0)) or 1
+        out.append(
+            f"{name} runs={slot.get('runs', 0)} avg={slot.get('total_seconds', 0.0) / runs:.2f}s "
+            f"max={slot.get('max_seconds', 0.0):.2f}s last={slot.get('last_seconds', 0.0):.2f}s "
+            f"skipped={slot.get('skipped', 0)} timeouts={slot.get('timeouts', 0)} errors={slot.get('errors', 0)}"
+        )
+    return out
+
+
+class CheckScheduler:
+    """Run checks on a thread pool, each on its own interval and timeout.
+
+    A check whose previous run is still going is skipped instead of being
+    queued again. Each cycle waits only for the checks it started, and for at
+    most check_cycle_wait_seconds; anything still running is collected on a
+    later cycle without being waited for again, so a slow or hung check never
+    holds back alerts from the others. Runtimes, skips and timeouts are kept
+    in state["check_runtimes"].
+
+    Checks never touch the live state: each works on a copy of a per-cycle
+    snapshot and its edits are merged back here, on the main thread, when it
+    finishes. The caller can therefore save state every cycle. A check still
+    running past its timeout raises a check_stuck alert until it returns.
+    """
+
+    def __init__(self, checks: List[Tuple[str, Callable[[Dict[str, Any], float], Any]]], workers: int) -> None:
+        self.checks = checks
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="remotemon-check")
+        self.running: Dict[str, Tuple[Future, float]] = {}
+        self.timed_out: set = set()
+        self.last_started: Dict[str, float] = {}
+
+    @staticmethod
+    def stuck_alert(name: str, running_for: float) -> Dict[str, Any]:
+        timeout = check_schedule(name)[1]
+        return make_alert(
+            key=f"check_stuck:{name}",
+            severity="WARNING",
+            category="SYSTEM",
+            summary=(f"Check {name} has been running for {running_for:.0f}s (timeout {timeout:g}s); it is skipped until it returns."
+                     if running_for else f"Check {name} finished and is running on schedule again."),
+            threshold=f"> {timeout:g}s",
+            action="Look for a hung filesystem, subprocess or network call in this check.",
+        )
+
+    def run_cycle(self, state: Dict[str, Any], now_ts: float) -> List[Dict[str, Any]]:
+        stats = state.setdefault("check_runtimes", {})
+        base: Optional[Dict[str, Any]] = None
+        submitted: List[Future] = []
+        for name, fn in self.checks:
+            interval, _ = check_schedule(name)
+            if now_ts - self.last_started.get(name, 0.0) < interval:
+                continue
+            slot = stats.setdefault(name, {"runs": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0, "skipped": 0, "timeouts": 0, "errors": 0})
+            if name in self.running:
+                slot["skipped"] = int(slot.get("skipped", 0)) + 1
+                safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [WARN] check {name} skipped; previous run still in progress")
+                continue
+            self.last_started[name] = now_ts
+            if base is None:
+                base = copy.deepcopy(state)
+            self.running[name] = (self.pool.submit(timed_check, fn, base, now_ts), time.monotonic())
+            submitted.append(self.running[name][0])
+
+        if submitted:
+            budget = min(float(CONFIG["check_cycle_wait_seconds"]), float(CONFIG["interval_seconds"]))
+            wait(submitted, timeout=max(0.0, budget))
+
+        alerts: List[Dict[str, Any]] = []
+        slow: List[str] = []
+        for name, (future, started) in list(self.running.items()):
+            slot = stats[name]
+            if not future.done():
+                running_for = time.monotonic() - started
+                if running_for >= check_schedule(name)[1]:
+                    if name not in self.timed_out:
+                        self.timed_out.add(name)
+                        slot["timeouts"] = int(slot.get("timeouts", 0)) + 1
+                        safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [WARN] check {name} exceeded {check_schedule(name)[1]:g}s timeout")
+                    stuck = alert_transition(state, self.stuck_alert(name, running_for), True, now_ts)
+                    if stuck:
+                        alerts.append(stuck)
+                continue
+            del self.running[name]
+            result, elapsed, error, changes = future.result()
+            apply_state_changes(state, changes)
+            if name in self.timed_out:
+                self.timed_out.discard(name)
+                recovered = alert_transition(state, self.stuck_alert(name, 0.0), False, now_ts)
+                if recovered:
+                    alerts.append(recovered)
+            if error is not None:
+                slot["errors"] = int(slot.get("errors", 0)) + 1
+                safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [ERROR] check {name} failed: {error}")
+            slot["runs"] = int(slot.get("runs", 0)) + 1
+            slot["total_seconds"] = float(slot.get("total_seconds", 0.0)) + elapsed
+            slot["max_seconds"] = max(float(slot.get("max_seconds", 0.0)), elapsed)
+            slot["last_seconds"] = elapsed
+            if elapsed >= CONFIG["check_slow_log_seconds"]:
+                slow.append(f"{name}={elapsed:.2f}s")
+            if isinstance(result, list):
+                alerts.extend(result)
+            elif result:
+                alerts.append(result)
+        if slow:
+            safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [INFO] slow checks: {', '.join(slow)}")
+        return alerts
+
+
 def main() -> None:
+    global STORE
     host = hostname()
-    state = load_state(CONFIG["state_file"])
+    STORE, state = open_store()
     cleanup_old_snapshots()
-    prev_net = state.get("prev_net_bytes")
-    prev_ts = state.get("prev_net_ts")
-    if not prev_net or not prev_ts:
-        prev_net = snapshot_net_bytes()
-        prev_ts = time.time()
-        state["prev_net_bytes"] = prev_net
-        state["prev_net_ts"] = prev_ts
-        save_state(CONFIG["state_file"], state)
+    if not state.get("prev_net_bytes") or not state.get("prev_net_ts"):
+        state["prev_net_bytes"] = snapshot_net_bytes()
+        state["prev_net_ts"] = time.time()
+        STORE.save_state(state)
+    scheduler = CheckScheduler(CHECKS, int(CONFIG["check_workers"]))
     safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [INFO] remotemon started on host={host} interval={CONFIG['interval_seconds']}s")
     if CONFIG["startup_message"] and not state.get("startup_message_sent"):
         emit_startup_self_test(host, state)
         state["startup_message_sent"] = True
-        save_state(CONFIG["state_file"], state)
+        STORE.save_state(state)
 
     while True:
         try:
             time.sleep(CONFIG["interval_seconds"])
             now_ts = time.time()
-            alerts: List[Dict[str, Any]] = []
-
-            for checker in [
-                lambda: check_reboot(state, now_ts),
-                lambda: check_ram(state, now_ts),
-                lambda: check_swap(state, now_ts),
-                lambda: check_cpu_load(state, now_ts),
-                lambda: check_systemd_failed_units(state, now_ts),
-                lambda: check_new_listening_ports(state, now_ts),
-                lambda: check_new_outbound_remotes(state, now_ts),
-                lambda: net_anomaly_check(state, *get_net_rates(prev_net, snapshot_net_bytes(), max(1e-6, now_ts - float(prev_ts))), now_ts),
-            ]:
-                alert = checker()
-                if alert:
-                    alerts.append(alert)
-
-            alerts.extend(check_auth_activity(state, now_ts))
-            alerts.extend(check_disks(state, now_ts))
-            alerts.extend(check_inodes(state, now_ts))
-            alerts.extend(scan_suspicious_processes(state, now_ts))
-            alerts.extend(check_file_integrity(state, now_ts))
-            alerts.extend(check_service_awareness(state, now_ts))
-            alerts.extend(check_journal_patterns(state, now_ts))
-
-            curr_net = snapshot_net_bytes()
-            state["prev_net_bytes"] = curr_net
-            state["prev_net_ts"] = now_ts
-            prev_net = curr_net
-            prev_ts = now_ts
+            alerts = scheduler.run_cycle(state, now_ts)
+            STORE.record_alerts(now_ts, alerts)
 
             maybe_attach_snapshots(host, alerts)
             queue_or_send(host, state, alerts, now_ts)
             check_heartbeat(host, state, now_ts)
             cleanup_old_snapshots()
+            STORE.prune(now_ts)
             update_watchdog_file()
-            save_state(CONFIG["state_file"], state)
+            STORE.save_state(state)
         except KeyboardInterrupt:
             safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [INFO] remotemon stopped by user")
             break
         except Exception as e:
             safe_write_log(CONFIG["log_file"], f"{now_utc_iso()} [ERROR] loop error: {e}")
             update_watchdog_file()
-            save_state(CONFIG["state_file"], state)
+            STORE.save_state(state)
 
 
 if __name__ == "__main__":
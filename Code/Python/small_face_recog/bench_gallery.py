@@ -0,0 +1,114 @@
+"""
+Benchmark gallery matching against the per-face .npy loop it replaced.
+
+    python3 bench_gallery.py [--faces 10000 100000] [--queries 4] [--top-k 20]
+
+Writes random 512-d embeddings into a throwaway face_store (no model needed),
+then times, per gallery size:
+  • rebuild   — first sync, reading every .npy into the gallery matrix
+  • detect    — one query image with --queries faces, all people ranked
+  • top-k     — the same query keeping only the --top-k nearest people
+  • register  — appending one face
+  • delete    — compacting one face out
+  • baseline  — the old path: np.load + one cosine distance per face, in Python
+                (skipped above --baseline-max faces; it takes minutes at 100k)
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from gallery import Gallery
+
+DIM = 512
+
+
+def _cosine_distance(a: np.ndarray, b: np.ndarray) -> float:
+    a = a / (np.linalg.norm(a) + 1e-10)
+    b = b / (np.linalg.norm(b) + 1e-10)
+    return float(1.0 - np.dot(a, b))
+
+
+def _baseline(store: Path, index: dict, queries: list[np.ndarray]) -> list[tuple[str, float]]:
+    ranked = []
+    for face_id in index:
+        ref = np.load(str(store / f"{face_id}_embedding.npy"))
+        ranked.append((face_id, min(_cosine_distance(q, ref) for q in queries)))
+    ranked.sort(key=lambda r: r[1])
+    return ranked
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    out   = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def run(n: int, n_queries: int, top_k: int, baseline_max: int) -> None:
+    rng   = np.random.default_rng(n)
+    store = Path(tempfile.mkdtemp(prefix="bench_gallery_"))
+    try:
+        index = {}
+        for _ in range(n):
+            face_id = str(uuid.uuid4())
+            np.save(str(store / f"{face_id}_embedding.npy"),
+                    rng.standard_normal(DIM).astype(np.float32))
+            index[face_id] = {"id": face_id, "name": face_id[:8]}
+
+        def load(face_id):
+            path = store / f"{face_id}_embedding.npy"
+            return np.load(str(path)) if path.exists() else None
+
+        gallery = Gallery(store, load)
+        # A few queries sit close to known faces so the ranking has a clear answer.
+        targets = list(index)[:n_queries]
+        queries = [load(f) + 0.2 * rng.standard_normal(DIM).astype(np.float32) for f in targets]
+
+        _, t_rebuild = _timed(gallery.sync, index)
+        gallery.nearest(queries)                                 # page the matrix in
+        ranked, t_all = _timed(gallery.nearest, queries)
+        top, t_top    = _timed(gallery.nearest, queries, top_k)
+        assert [f for f, _ in top] == [f for f, _ in ranked[:top_k]]
+
+        extra = str(uuid.uuid4())
+        np.save(str(store / f"{extra}_embedding.npy"), rng.standard_normal(DIM).astype(np.float32))
+        index[extra] = {"id": extra, "name": extra[:8]}
+        _, t_add = _timed(gallery.add, extra, load(extra), index)
+        del index[extra]
+        _, t_del = _timed(gallery.remove, extra, index)
+
+        print(f"\n{n:,} faces, {n_queries} query faces")
+        print(f"  rebuild   {t_rebuild * 1000:9.1f} ms")
+        print(f"  detect    {t_all * 1000:9.1f} ms   (all {n:,} ranked)")
+        print(f"  top-{top_k:<4} {t_top * 1000:9.1f} ms")
+        print(f"  register  {t_add * 1000:9.1f} ms")
+        print(f"  delete    {t_del * 1000:9.1f} ms")
+
+        if n <= baseline_max:
+            old, t_old = _timed(_baseline, store, index, queries)
+            same = [f for f, _ in old[:top_k]] == [f for f, _ in top]
+            print(f"  baseline  {t_old * 1000:9.1f} ms   "
+                  f"({t_old / t_all:,.0f}x slower, same top-{top_k}: {same})")
+    finally:
+        shutil.rmtree(store, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--faces", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--queries", type=int, default=4, help="faces in the query image")
+    ap.add_argument("--top-k", type=int, default=20)
+    ap.add_argument("--baseline-max", type=int, default=10_000,
+                    help="largest gallery to also time the old loop on")
+    args = ap.parse_args()
+    for n in args.faces:
+        run(n, args.queries, args.top_k, args.baseline_max)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,10 @@ Features
 
 Embedding cache
   At registration time the face embedding (512-d vector) is computed once and
-  saved as a .npy file inside face_store/.  Detection loads these files
-  directly — no re-encoding ever happens, so detection speed stays constant
-  regardless of how large your face library grows.
+  saved as a .npy file inside face_store/.  It is also appended, normalised, to
+  a single memory-mapped gallery matrix (see gallery.py), so detection compares
+  every face in the query image with every registered face in one matrix
+  multiply — no per-face file reads and no re-encoding.
 
 Tips for best accuracy
   • Use a clear, well-lit, front-facing photo for registration.
@@ -39,6 +40,8 @@ from insightface.app import FaceAnalysis
 from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.responses import JSONResponse
 
+from gallery import Gallery
+
 # ── Logging ────────────────────────────────────────────────────────────────────
 logging.basicConfig(
     level=logging.INFO,
@@ -144,11 +147,7 @@ def _get_embeddings(raw: bytes) -> list[np.ndarray]:
     return [face.embedding for face in faces]
 
 
-def _cosine_distance(a: np.ndarray, b: np.ndarray) -> float:
-    """Cosine distance in [0, 2]. Lower means more similar."""
-    a = a / (np.linalg.norm(a) + 1e-10)
-    b = b / (np.linalg.norm(b) + 1e-10)
-    return float(1.0 - np.dot(a, b))
+_gallery = Gallery(FACE_STORE_DIR, _load_embedding)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -159,39 +158,37 @@ def _run_detection(
     query_embeddings: list[np.ndarray],
     index: dict,
     threshold: float,
+    top_k: int = 0,
 ) -> list[dict]:
     """
     Compare every face found in the query image against every registered
     face embedding. A registered person is considered detected if at least
     one query face is within `threshold` cosine distance of their stored embedding.
 
-    Returns a list of result dicts sorted by detected-first / distance asc.
+    Returns a list of result dicts sorted by detected-first / distance asc,
+    cut to the `top_k` nearest people when `top_k > 0`.
     """
-    results = []
+    _gallery.sync(index)
 
-    for face_id, meta in index.items():
-        ref_embedding = _load_embedding(face_id)
+    if query_embeddings:
+        ranked = _gallery.nearest(query_embeddings, top_k)
+    else:
+        ids    = _gallery.ids()
+        ranked = [(face_id, None) for face_id in (ids[:top_k] if top_k > 0 else ids)]
 
-        if ref_embedding is None:
-            logger.warning(
-                "No embedding cache for '%s' (%s) — skipping.", meta["name"], face_id
-            )
-            continue
+    results = []
 
-        if not query_embeddings:
-            detected     = False
-            best_distance = None
-        else:
-            distances    = [_cosine_distance(q, ref_embedding) for q in query_embeddings]
-            best_distance = float(min(distances))
-            detected     = best_distance <= threshold
+    for face_id, best_distance in ranked:
+        meta     = index[face_id]
+        detected = best_distance is not None and best_distance <= threshold
 
         confidence = None
         if best_distance is not None:
             raw_conf   = max(0.0, (threshold - best_distance) / threshold) * 100
             confidence = round(raw_conf, 1)
 
-        logger.info(
+        logger.log(
+            logging.INFO if detected else logging.DEBUG,
             "%-30s best_distance=%.4f (threshold=%.2f) → %s",
             f"'{meta['name']}':",
             best_distance if best_distance is not None else -1,
@@ -237,7 +234,8 @@ async def register_face(
     **What happens at registration:**
     - The first face found in the photo is encoded into a 512-d ArcFace vector.
     - The embedding is saved as a `.npy` file in `face_store/`.
-    - Detection calls load this file directly — no re-encoding ever occurs.
+    - The normalised embedding is appended to the in-memory gallery that
+      detection searches — no re-encoding ever occurs.
 
     **Tips for best accuracy:**
     - Use a clear, well-lit, **front-facing** photo.
@@ -283,6 +281,7 @@ async def register_face(
     index = _load_index()
     index[face_id] = entry
     _save_index(index)
+    _gallery.add(face_id, embeddings[0], index)
 
     logger.info("Registered face '%s' — id: %s", face_name, face_id)
 
@@ -317,6 +316,7 @@ def delete_face(face_id: str):
             path.unlink()
 
     _save_index(index)
+    _gallery.remove(face_id, index)
     logger.info("Deleted face '%s' (%s) and its embedding cache.", entry["name"], face_id)
     return {"message": f"Face '{entry['name']}' and its embedding deleted."}
 
@@ -329,11 +329,14 @@ def delete_face(face_id: str):
 async def detect_faces(
     file:      UploadFile = File(...),
     threshold: float      = DEFAULT_THRESHOLD,
+    top_k:     int        = 0,
 ):
     """
     Scan an image for any registered faces.
 
-    Returns every registered person, sorted by detected-first then by distance.
+    Returns every registered person, sorted by detected-first then by distance —
+    or only the `top_k` nearest people when `top_k` is above 0, which keeps the
+    response small on large galleries.
 
     | Property | Detail |
     |---|---|
@@ -342,6 +345,7 @@ async def detect_faces(
     | Default threshold | `0.40` |
     | `threshold` param | Lower → stricter. Range: `0.30` (strict) – `0.55` (lenient) |
     | Multi-face images | ✅ All faces in the photo are checked against all registered people |
+    | `top_k` param | `0` (default) returns everyone; `N` returns the N nearest people |
     """
     _validate_image(file)
     raw = await file.read()
@@ -360,18 +364,18 @@ async def detect_faces(
     if not query_embeddings:
         logger.info("No faces found in query image '%s'.", file.filename)
 
-    results        = _run_detection(query_embeddings, index, threshold)
+    results        = _run_detection(query_embeddings, index, threshold, top_k)
     detected_count = sum(1 for r in results if r["detected"])
 
     logger.info(
         "Detection on '%s': %d face(s) in image, %d/%d registered people detected.",
-        file.filename, len(query_embeddings), detected_count, len(results),
+        file.filename, len(query_embeddings), detected_count, len(_gallery),
     )
 
     return JSONResponse({
         "filename":        file.filename,
         "faces_in_image":  len(query_embeddings),
-        "people_checked":  len(results),
+        "people_checked":  len(_gallery),
         "people_detected": detected_count,
         "threshold":       threshold,
         "results":         results,
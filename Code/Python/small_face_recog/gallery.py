@@ -0,0 +1,197 @@
+"""
+Face gallery — every registered embedding in one memory-mapped matrix.
+────────────────────────────────────────────────────────────────────────────────
+The per-face .npy files written at registration stay the source of truth.
+Alongside them the gallery keeps:
+
+  gallery_<tag>.f32   raw float32 rows, one L2-normalised embedding per face
+  gallery.json        manifest: which file, its width, and the face id per row
+
+Registration appends a row; deletion compacts into a new file.  The manifest is
+always replaced last and readers trust only the row count it lists, so another
+worker never sees a half-written gallery — it just notices the new manifest
+mtime on its next detection and remaps.
+
+Matching every query face against the whole gallery is one matrix multiply
+(rows are pre-normalised, so the dot product is the cosine similarity) and, when
+only the nearest people are wanted, an argpartition instead of a full sort.
+────────────────────────────────────────────────────────────────────────────────
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    """Rows scaled to unit length, as float32 (same epsilon as the old per-pair code)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-10)
+
+
+class Gallery:
+    """
+    Registered embeddings for the detection path.  `load_embedding(face_id)`
+    reads one face's cached .npy and is only used to (re)build the matrix.
+    """
+
+    def __init__(self, store_dir: Path, load_embedding: Callable[[str], np.ndarray | None]):
+        self.store_dir = store_dir
+        self.manifest  = store_dir / "gallery.json"
+        self._load_one = load_embedding
+        self._lock     = threading.Lock()
+        self._stamp    = None
+        self._file     = None
+        self._ids      = []          # face id per row
+        self._skipped  = []          # registered faces without a cached embedding
+        self._rows     = None        # np.memmap (n, dim), None when empty
+
+    # ── Loading ────────────────────────────────────────────────────────────────
+
+    def _manifest_stamp(self) -> int | None:
+        try:
+            return self.manifest.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        self._stamp, self._file, self._ids, self._skipped, self._rows = (
+            self._manifest_stamp(), None, [], [], None)
+        if self._stamp is None:
+            return
+        try:
+            meta = json.loads(self.manifest.read_text())
+            rows = None
+            if meta["ids"]:
+                rows = np.memmap(self.store_dir / meta["file"], dtype=np.float32,
+                                 mode="r", shape=(len(meta["ids"]), meta["dim"]))
+        except (OSError, ValueError, KeyError) as exc:
+            # Missing or short matrix file: stay empty so sync() rebuilds.
+            logger.warning("Face gallery unreadable (%s) — will rebuild.", exc)
+            self._stamp = None
+            return
+        self._file, self._ids, self._skipped, self._rows = (
+            meta["file"], meta["ids"], meta.get("skipped", []), rows)
+
+    def _publish(self, filename: str, ids: list[str], skipped: list[str], dim: int) -> None:
+        tmp = self.manifest.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"file": filename, "dim": dim, "ids": ids, "skipped": skipped}))
+        os.replace(tmp, self.manifest)
+        self._load()
+
+    def _replace_file(self, rows: np.ndarray | None, ids: list[str], skipped: list[str]) -> None:
+        old      = self._file
+        filename = f"gallery_{uuid.uuid4().hex[:8]}.f32"
+        dim      = 0
+        with open(self.store_dir / filename, "wb") as fh:
+            if rows is not None and len(rows):
+                fh.write(np.ascontiguousarray(rows, dtype=np.float32).tobytes())
+                dim = rows.shape[1]
+        self._publish(filename, ids, skipped, dim)
+        if old and old != filename:
+            # Workers still mapping the old file keep their view until they remap.
+            (self.store_dir / old).unlink(missing_ok=True)
+
+    def _rebuild(self, index: dict) -> None:
+        ids, skipped, rows = [], [], []
+        for face_id, meta in index.items():
+            embedding = self._load_one(face_id)
+            if embedding is None:
+                logger.warning("No embedding cache for '%s' (%s) — skipping.",
+                               meta.get("name", face_id), face_id)
+                skipped.append(face_id)
+                continue
+            ids.append(face_id)
+            rows.append(np.asarray(embedding, dtype=np.float32).ravel())
+        self._replace_file(normalise(np.stack(rows)) if rows else None, ids, skipped)
+        for stale in self.store_dir.glob("gallery_*.f32"):
+            # Left behind if the manifest was lost; nothing refers to them now.
+            if stale.name != self._file:
+                stale.unlink(missing_ok=True)
+        logger.info("Rebuilt face gallery: %d embeddings.", len(ids))
+
+    def _current(self) -> None:
+        if self._manifest_stamp() != self._stamp:
+            self._load()
+
+    def _in_step(self, index: dict) -> bool:
+        return self._stamp is not None and set(self._ids) | set(self._skipped) == set(index)
+
+    def sync(self, index: dict) -> None:
+        """Pick up another worker's changes, or rebuild if out of step with index.json."""
+        with self._lock:
+            self._current()
+            if not self._in_step(index):
+                self._rebuild(index)
+
+    # ── Updates ────────────────────────────────────────────────────────────────
+
+    def add(self, face_id: str, embedding: np.ndarray, index: dict) -> None:
+        """Append one face.  `index` already includes it."""
+        with self._lock:
+            self._current()
+            row = normalise(embedding)
+            dim = self._rows.shape[1] if self._rows is not None else row.shape[1]
+            if (self._stamp is None or row.shape[1] != dim
+                    or set(self._ids) | set(self._skipped) | {face_id} != set(index)):
+                self._rebuild(index)
+                return
+            with open(self.store_dir / self._file, "ab") as fh:
+                fh.write(row.tobytes())
+            self._publish(self._file, self._ids + [face_id], self._skipped, dim)
+
+    def remove(self, face_id: str, index: dict) -> None:
+        """Compact one face out.  `index` no longer includes it."""
+        with self._lock:
+            self._current()
+            if face_id in self._skipped:
+                self._publish(self._file, self._ids,
+                              [f for f in self._skipped if f != face_id],
+                              self._rows.shape[1] if self._rows is not None else 0)
+                return
+            if self._stamp is None or face_id not in self._ids:
+                self._rebuild(index)
+                return
+            pos  = self._ids.index(face_id)
+            keep = np.ones(len(self._ids), dtype=bool)
+            keep[pos] = False
+            self._replace_file(np.asarray(self._rows[keep]),
+                               self._ids[:pos] + self._ids[pos + 1:], self._skipped)
+
+    # ── Matching ───────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def ids(self) -> list[str]:
+        return list(self._ids)
+
+    def nearest(self, queries: list[np.ndarray], top_k: int = 0) -> list[tuple[str, float]]:
+        """
+        `(face_id, best cosine distance)` pairs, nearest first, where the best
+        distance is the minimum over all query faces.  `top_k > 0` keeps only
+        that many, selected with a partial sort.
+        """
+        with self._lock:
+            ids, rows = self._ids, self._rows
+        if rows is None or not queries:
+            return []
+
+        # (n, dim) @ (dim, q) → cosine similarity of every face to every query.
+        similarity = rows @ normalise(np.stack(queries)).T
+        distances  = 1.0 - similarity.max(axis=1)
+
+        if 0 < top_k < len(distances):
+            order = np.argpartition(distances, top_k - 1)[:top_k]
+            order = order[np.argsort(distances[order], kind="stable")]
+        else:
+            order = np.argsort(distances, kind="stable")
+        return [(ids[i], float(distances[i])) for i in order]
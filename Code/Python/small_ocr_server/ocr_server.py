@@ -9,15 +9,18 @@ Features
 
 Descriptor caching
   At registration time both ORB and SIFT descriptors are computed once and
-  saved as .npy files inside logo_store/.  Detection calls load these files
-  directly — no re-extraction ever happens, so detection speed stays constant
-  regardless of how large your logo library grows.
+  saved as .npy files inside logo_store/.  They are also appended to one
+  library matrix per engine, memory-mapped by every worker, so a detection is a
+  single kNN search over all logos at once — no per-logo file reads, no
+  re-extraction, and no per-logo matcher calls.
 ────────────────────────────────────────────────────────────────────────────────
 """
 
 import io
 import json
 import logging
+import os
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -57,6 +60,13 @@ ORB_MIN_MATCHES  = 15     # good-match floor for ORB
 SIFT_MIN_MATCHES = 10     # SIFT produces fewer but higher-quality matches
 LOWE_RATIO       = 0.75   # Lowe's ratio-test threshold
 
+# ── Library search ─────────────────────────────────────────────────────────────
+MATCH_NEIGHBOURS      = 8        # library neighbours examined per query descriptor
+FLANN_MIN_DESCRIPTORS = 20_000   # below this, exact brute force is fast enough
+FLANN_CHECKS          = 64       # FLANN search effort (higher = exact-er, slower)
+FLANN_INDEX_KDTREE    = 1
+FLANN_INDEX_LSH       = 6
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Feature engines
@@ -92,26 +102,6 @@ def _extract_sift(gray: np.ndarray) -> np.ndarray | None:
     return des
 
 
-def _good_matches(des_query: np.ndarray, des_ref: np.ndarray, matcher) -> int:
-    """
-    Apply kNN matching + Lowe's ratio test.
-    Returns the count of good matches, or 0 on failure.
-    """
-    if des_query is None or des_ref is None:
-        return 0
-    if len(des_query) < 2 or len(des_ref) < 2:
-        return 0
-
-    matches = matcher.knnMatch(des_ref, des_query, k=2)
-    good = [
-        m for pair in matches
-        if len(pair) == 2
-        for m, n in [pair]
-        if m.distance < LOWE_RATIO * n.distance
-    ]
-    return len(good)
-
-
 # ══════════════════════════════════════════════════════════════════════════════
 # Descriptor cache  (disk-backed .npy files)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -132,6 +122,219 @@ def _load_descriptors(logo_id: str, engine: Literal["orb", "sift"]) -> np.ndarra
     return np.load(str(path))
 
 
+def _reference_descriptors(logo_id: str, meta: dict,
+                           engine: Literal["orb", "sift"]) -> np.ndarray | None:
+    """Cached descriptors for a logo, recomputed from its image if the cache is gone."""
+    ref_des = _load_descriptors(logo_id, engine)
+    if ref_des is not None:
+        return ref_des
+
+    logger.warning(
+        "No %s cache for logo '%s' (%s) — recomputing from image.",
+        engine.upper(), meta["name"], logo_id,
+    )
+    logo_path = LOGO_STORE_DIR / meta["filename"]
+    if not logo_path.exists():
+        logger.error("Logo image missing for %s — skipping.", logo_id)
+        return None
+    gray    = _bytes_to_gray(logo_path.read_bytes())
+    ref_des = _extract_orb(gray) if engine == "orb" else _extract_sift(gray)
+    if ref_des is not None:
+        _save_descriptors(logo_id, engine, ref_des)
+    return ref_des
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Descriptor library  (all logos, one memory-mapped matrix per engine)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _DescriptorLibrary:
+    """
+    Every logo's descriptors for one engine, stacked into a single raw matrix
+    file and memory-mapped, with a JSON manifest recording which logo owns
+    which rows.  The per-logo .npy files stay the source of truth; the library
+    is rebuilt from them whenever it disagrees with index.json.
+
+    Registration appends rows to the matrix file; deletion compacts into a new
+    file.  The manifest is always replaced last, and readers trust only the row
+    count it records, so a worker process never sees a half-written library.
+    Other workers notice the new manifest by its mtime on their next detection.
+    """
+
+    def __init__(self, engine: Literal["orb", "sift"]):
+        self.engine   = engine
+        self.dtype    = np.uint8 if engine == "orb" else np.float32
+        self.manifest = LOGO_STORE_DIR / f"library_{engine}.json"
+        self._lock    = threading.Lock()
+        self._stamp   = None
+        self._file    = None
+        self._ids     = []
+        self._counts  = []
+        self._rows    = None                        # np.memmap, None when empty
+        self._labels  = np.empty(0, dtype=np.int32)  # row → position in _ids
+        self._matcher = None                        # FLANN index, built lazily
+
+    # ── Loading ────────────────────────────────────────────────────────────────
+
+    def _manifest_stamp(self) -> int | None:
+        try:
+            return self.manifest.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        self._stamp, self._file, self._ids, self._counts = self._manifest_stamp(), None, [], []
+        self._rows, self._labels, self._matcher = None, np.empty(0, dtype=np.int32), None
+        if self._stamp is None:
+            return
+        try:
+            meta  = json.loads(self.manifest.read_text())
+            total = sum(meta["counts"])
+            rows  = None
+            if total:
+                rows = np.memmap(LOGO_STORE_DIR / meta["file"], dtype=self.dtype,
+                                 mode="r", shape=(total, meta["dim"]))
+        except (OSError, ValueError, KeyError) as exc:
+            # Missing or short matrix file: leave the library empty so the
+            # next sync() rebuilds it from the per-logo caches.
+            logger.warning("%s library unreadable (%s) — will rebuild.", self.engine.upper(), exc)
+            self._stamp = None
+            return
+        self._file, self._ids, self._counts, self._rows = meta["file"], meta["ids"], meta["counts"], rows
+        self._labels = np.repeat(np.arange(len(self._ids), dtype=np.int32), self._counts)
+
+    def _publish(self, filename: str, ids: list[str], counts: list[int], dim: int) -> None:
+        tmp = self.manifest.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"file": filename, "dim": dim, "ids": ids, "counts": counts}))
+        os.replace(tmp, self.manifest)
+        self._load()
+
+    def _rebuild(self, index: dict) -> None:
+        ids, counts, blocks = [], [], []
+        for logo_id, meta in index.items():
+            des = _reference_descriptors(logo_id, meta, self.engine)
+            ids.append(logo_id)
+            counts.append(0 if des is None else len(des))
+            if des is not None:
+                blocks.append(np.ascontiguousarray(des, dtype=self.dtype))
+        dim = blocks[0].shape[1] if blocks else 0
+        self._replace_file(blocks, ids, counts, dim)
+        logger.info("Rebuilt %s library: %d logos, %d descriptors.",
+                    self.engine.upper(), len(ids), sum(counts))
+
+    def _replace_file(self, blocks: list[np.ndarray], ids: list[str],
+                      counts: list[int], dim: int) -> None:
+        old      = self._file
+        filename = f"library_{self.engine}_{uuid.uuid4().hex[:8]}.bin"
+        with open(LOGO_STORE_DIR / filename, "wb") as fh:
+            for block in blocks:
+                fh.write(block.tobytes())
+        self._publish(filename, ids, counts, dim)
+        if old and old != filename:
+            # Workers still mapping the old file keep their view until they reload.
+            (LOGO_STORE_DIR / old).unlink(missing_ok=True)
+
+    def sync(self, index: dict) -> None:
+        """Pick up another worker's changes, or rebuild if out of step with index.json."""
+        with self._lock:
+            if self._manifest_stamp() != self._stamp:
+                self._load()
+            if self._stamp is None or set(self._ids) != set(index):
+                self._rebuild(index)
+
+    # ── Updates ────────────────────────────────────────────────────────────────
+
+    def add(self, logo_id: str, des: np.ndarray | None, index: dict) -> None:
+        with self._lock:
+            if self._manifest_stamp() != self._stamp:
+                self._load()
+            dim = self._rows.shape[1] if self._rows is not None else 0
+            if self._stamp is None or set(self._ids) | {logo_id} != set(index) or (
+                    des is not None and dim and des.shape[1] != dim):
+                self._rebuild(index)
+                return
+            count = 0
+            if des is not None:
+                block = np.ascontiguousarray(des, dtype=self.dtype)
+                with open(LOGO_STORE_DIR / self._file, "ab") as fh:
+                    fh.write(block.tobytes())
+                count, dim = len(block), block.shape[1]
+            self._publish(self._file, self._ids + [logo_id], self._counts + [count], dim)
+
+    def remove(self, logo_id: str, index: dict) -> None:
+        with self._lock:
+            if self._manifest_stamp() != self._stamp:
+                self._load()
+            if self._stamp is None or logo_id not in self._ids:
+                self._rebuild(index)
+                return
+            pos    = self._ids.index(logo_id)
+            ids    = self._ids[:pos] + self._ids[pos + 1:]
+            counts = self._counts[:pos] + self._counts[pos + 1:]
+            blocks = [] if self._rows is None else [np.asarray(self._rows[self._labels != pos])]
+            dim    = self._rows.shape[1] if self._rows is not None else 0
+            self._replace_file(blocks, ids, counts, dim)
+
+    # ── Matching ───────────────────────────────────────────────────────────────
+
+    def _flann(self):
+        if self.engine == "orb":
+            # Long keys keep LSH buckets small; the usual key_size=12 scans
+            # thousands of candidates per query once the library passes ~1M rows.
+            params = dict(algorithm=FLANN_INDEX_LSH, table_number=8, key_size=24,
+                          multi_probe_level=1)
+        else:
+            params = dict(algorithm=FLANN_INDEX_KDTREE, trees=4)
+        matcher = cv2.FlannBasedMatcher(params, dict(checks=FLANN_CHECKS))
+        matcher.add([np.asarray(self._rows)])
+        matcher.train()
+        return matcher
+
+    def match_counts(self, query_des: np.ndarray) -> dict[str, int]:
+        """
+        Good-match count per logo for one query image.
+
+        Each query descriptor is matched once against the whole library; its
+        k nearest neighbours are then grouped by logo and Lowe's ratio test is
+        applied within each logo (that logo's 1st vs 2nd neighbour), as the
+        old per-logo knnMatch(k=2) did.  Registering variants of one logo
+        therefore does not make them cancel each other out.  A logo with only
+        one neighbour among the k passes if it beats the ratio against the
+        farthest neighbour fetched, a lower bound on its own 2nd neighbour.
+        """
+        with self._lock:
+            ids, rows, labels = self._ids, self._rows, self._labels
+            if rows is not None and len(rows) >= FLANN_MIN_DESCRIPTORS and self._matcher is None:
+                self._matcher = self._flann()
+            matcher = self._matcher
+
+        counts = np.zeros(len(ids), dtype=np.int64)
+        if rows is not None and query_des is not None and len(query_des):
+            k = MATCH_NEIGHBOURS if len(ids) > 1 else 2
+            if matcher is not None:
+                neighbours = matcher.knnMatch(query_des, k=k)
+            else:
+                bf = _bf_orb if self.engine == "orb" else _bf_sift
+                neighbours = bf.knnMatch(query_des, np.asarray(rows), k=k)
+            for found in neighbours:
+                if len(found) < 2:
+                    continue
+                pairs: dict[int, list[float]] = {}
+                for m in found:
+                    pairs.setdefault(labels[m.trainIdx], []).append(m.distance)
+                # With fewer than k neighbours the whole library was returned,
+                # so a logo seen once has no 2nd descriptor to compare against.
+                horizon = found[-1].distance if len(found) == k else None
+                for owner, dists in pairs.items():
+                    second = dists[1] if len(dists) > 1 else horizon
+                    if second is not None and dists[0] < LOWE_RATIO * second:
+                        counts[owner] += 1
+        return dict(zip(ids, counts.tolist()))
+
+
+_libraries = {engine: _DescriptorLibrary(engine) for engine in ("orb", "sift")}
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # Logo index helpers
 # ══════════════════════════════════════════════════════════════════════════════
@@ -173,35 +376,21 @@ def _run_detection(
     index:      dict,
     engine:     Literal["orb", "sift"],
     threshold:  int,
-    matcher,
 ) -> list[dict]:
     """
-    Compare query descriptors against every cached reference descriptor.
+    Match query descriptors against the whole descriptor library in one search.
     Returns a list of result dicts sorted by detected-first / match-count desc.
     """
+    library = _libraries[engine]
+    library.sync(index)
+    counts  = library.match_counts(query_des)
     results = []
 
     for logo_id, meta in index.items():
-        ref_des = _load_descriptors(logo_id, engine)
-
-        if ref_des is None:
-            logger.warning(
-                "No %s cache for logo '%s' (%s) — recomputing from image.",
-                engine.upper(), meta["name"], logo_id,
-            )
-            logo_path = LOGO_STORE_DIR / meta["filename"]
-            if not logo_path.exists():
-                logger.error("Logo image missing for %s — skipping.", logo_id)
-                continue
-            gray    = _bytes_to_gray(logo_path.read_bytes())
-            ref_des = _extract_orb(gray) if engine == "orb" else _extract_sift(gray)
-            if ref_des is not None:
-                _save_descriptors(logo_id, engine, ref_des)
-
-        n_good   = _good_matches(query_des, ref_des, matcher)
+        n_good   = counts.get(logo_id, 0)
         detected = n_good >= threshold
 
-        logger.info(
+        logger.debug(
             "[%s] %-30s %3d matches (threshold=%d) → %s",
             engine.upper(), f"'{meta['name']}':", n_good, threshold,
             "DETECTED" if detected else "not found",
@@ -291,7 +480,8 @@ async def register_logo(
     **What happens at registration:**
     - Both **ORB** and **SIFT** descriptors are computed immediately and stored
       as `.npy` binary files on disk.
-    - Detection calls load these cached files — no re-extraction ever occurs.
+    - They are appended to the in-memory descriptor library that detection
+      searches — no re-extraction ever occurs.
 
     **Tips for best accuracy:**
     - Preferred format: **PNG** (lossless, no compression artefacts).
@@ -349,6 +539,8 @@ async def register_logo(
     index = _load_index()
     index[logo_id] = entry
     _save_index(index)
+    _libraries["orb"].add(logo_id, orb_des, index)
+    _libraries["sift"].add(logo_id, sift_des, index)
 
     logger.info(
         "Registered logo '%s' — ORB: %d features, SIFT: %d features, id: %s",
@@ -374,7 +566,8 @@ def list_logos():
 @app.delete("/logos/{logo_id}", summary="Remove a registered logo", tags=["Logo Management"])
 def delete_logo(logo_id: str):
     """
-    Delete a logo and all its associated files (image + ORB cache + SIFT cache).
+    Delete a logo and all its associated files (image + ORB cache + SIFT cache),
+    and drop its rows from both descriptor libraries.
     """
     index = _load_index()
     if logo_id not in index:
@@ -391,6 +584,8 @@ def delete_logo(logo_id: str):
             path.unlink()
 
     _save_index(index)
+    _libraries["orb"].remove(logo_id, index)
+    _libraries["sift"].remove(logo_id, index)
     logger.info("Deleted logo '%s' (%s) and its descriptor caches.", entry["name"], logo_id)
     return {"message": f"Logo '{entry['name']}' and all cached descriptors deleted."}
 
@@ -418,8 +613,8 @@ async def detect_logos_orb(
     | Best for | Real-time / high-volume scenarios |
     | Default threshold | `15` good matches |
 
-    ORB descriptors are loaded from the pre-computed cache — no re-extraction
-    happens at detection time.
+    The query is matched against every registered logo's cached ORB descriptors
+    in a single library search — no re-extraction happens at detection time.
     """
     _validate_image(file)
     raw = await file.read()
@@ -440,7 +635,7 @@ async def detect_logos_orb(
             detail="No ORB features found in the query image. Try a higher-resolution photo.",
         )
 
-    results        = _run_detection(query_des, index, "orb", threshold, _bf_orb)
+    results        = _run_detection(query_des, index, "orb", threshold)
     detected_count = sum(1 for r in results if r["detected"])
 
     logger.info(
@@ -480,8 +675,8 @@ async def detect_logos_sift(
     | Best for | Quality-critical or low-volume scenarios |
     | Default threshold | `10` good matches (SIFT matches are higher quality) |
 
-    SIFT descriptors are loaded from the pre-computed cache — no re-extraction
-    happens at detection time.
+    The query is matched against every registered logo's cached SIFT descriptors
+    in a single library search — no re-extraction happens at detection time.
     """
     _validate_image(file)
     raw = await file.read()
@@ -502,7 +697,7 @@ async def detect_logos_sift(
             detail="No SIFT features found in the query image. Try a higher-resolution photo.",
         )
 
-    results        = _run_detection(query_des, index, "sift", threshold, _bf_sift)
+    results        = _run_detection(query_des, index, "sift", threshold)
     detected_count = sum(1 for r in results if r["detected"])
 
     logger.info(
@@ -1,11 +1,17 @@
+import os
 import platform
 import subprocess
+import sys
 import socket
 import ipaddress
 import re
 import json
 import math
-from concurrent.futures import ThreadPoolExecutor
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from flask import Flask, render_template, request, Response, stream_with_context
 
 try:
@@ -14,9 +20,38 @@ try:
 except ImportError:
     HAS_REQUESTS = False
 
+try:
+    # Offline ASN / geo ranges (../ipranges.py); build with
+    #   python3 ../ipranges.py build --asn ip2asn-combined.tsv.gz --geo dbip-city-lite.csv.gz
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import ipranges
+    OFFLINE_DB = ipranges.open_db()
+except ImportError:
+    OFFLINE_DB = None
+
 app = Flask(__name__)
 PLATFORM = platform.system()   # 'Linux', 'Darwin', 'Windows'
 
+IPAPI_FIELDS   = "status,org,isp,as,country,countryCode,city,regionName,proxy,hosting,mobile"
+IPAPI_BATCH    = 100     # ip-api.com/batch accepts up to 100 addresses per call
+BATCH_WINDOW   = 0.2     # seconds to collect hops before one batched ip-api call
+ENRICH_GRACE   = 8       # seconds to wait for stragglers after traceroute exits
+ENRICH_WORKERS = 16
+
+# Process-wide TTL cache: backbone routers show up in almost every trace, so
+# their rDNS / ASN / geo / TTL answers are reused across traces and users.
+CACHE_TTL = {
+    "rdns": 3600,        # PTR records rarely change
+    "info": 6 * 3600,    # ASN / org / geo
+    "ttl":  600,         # ping TTL (OS hint)
+}
+CACHE_MISS_TTL = 300     # a missing PTR or unanswered ping is retried sooner
+CACHE_MAX      = 20000
+
+_cache      = {}         # (kind, ip) -> (expires_at, value)
+_cache_lock = threading.Lock()
+_pool       = ThreadPoolExecutor(max_workers=ENRICH_WORKERS, thread_name_prefix="enrich")
+
 
 # ─── IP UTILITIES ─────────────────────────────────────────────────────────────
 
@@ -93,6 +128,39 @@ def extract_ip_from_line(text):
     return None
 
 
+# ─── ENRICHMENT CACHE ─────────────────────────────────────────────────────────
+
+def cache_get(kind, ip):
+    """Return (hit, value) for a cached lookup."""
+    with _cache_lock:
+        entry = _cache.get((kind, ip))
+    if entry and entry[0] > time.monotonic():
+        return True, entry[1]
+    return False, None
+
+
+def cache_put(kind, ip, value, ttl=None):
+    now = time.monotonic()
+    with _cache_lock:
+        if len(_cache) >= CACHE_MAX:
+            for key in [k for k, (exp, _) in _cache.items() if exp <= now]:
+                del _cache[key]
+            if len(_cache) >= CACHE_MAX:
+                # Still full: drop the oldest half by insertion order.
+                for key in list(_cache)[:CACHE_MAX // 2]:
+                    del _cache[key]
+        _cache[(kind, ip)] = (now + (ttl if ttl is not None else CACHE_TTL[kind]), value)
+
+
+def cached(kind, ip, fn):
+    hit, value = cache_get(kind, ip)
+    if hit:
+        return value
+    value = fn(ip)
+    cache_put(kind, ip, value, None if value is not None else CACHE_MISS_TTL)
+    return value
+
+
 def reverse_dns(ip):
     try:
         return socket.gethostbyaddr(ip)[0]
@@ -100,19 +168,96 @@ def reverse_dns(ip):
         return None
 
 
+def offline_info(ip):
+    """
+    ip-api-shaped answer from the offline range database, and whether it is
+    complete (every table the database was built with had an entry for `ip`).
+    """
+    if OFFLINE_DB is None or is_private(ip):
+        return None, False
+    sources = OFFLINE_DB.header["sources"]
+    asn, geo = OFFLINE_DB.asn(ip), OFFLINE_DB.geo(ip)
+    if not asn and not geo:
+        return None, False
+
+    d = {"status": "success"}
+    if asn:
+        d.update({"as": f"AS{asn['asn']} {asn['org']}", "org": asn["org"],
+                  "isp": asn["org"], "countryCode": asn["country"]})
+    if geo:
+        d.update({"countryCode": geo["country"] or d.get("countryCode"),
+                  "city": geo["city"], "regionName": geo["region"]})
+    d["country"] = d.get("countryCode")
+    complete = (asn or "asn" not in sources) and (geo or "geo" not in sources)
+    return d, bool(complete)
+
+
 def ip_info(ip):
-    if not HAS_REQUESTS or is_private(ip):
+    if is_private(ip):
         return {}
+    local, complete = offline_info(ip)
+    if complete or not HAS_REQUESTS:
+        return local or {}
+    hit, value = cache_get("info", ip)
+    if hit:
+        return value
     try:
         r = http.get(
             f"http://ip-api.com/json/{ip}",
-            params={"fields": "status,org,isp,as,country,countryCode,city,regionName,proxy,hosting,mobile"},
+            params={"fields": IPAPI_FIELDS},
             timeout=3,
         )
         d = r.json()
-        return d if d.get("status") == "success" else {}
     except Exception:
-        return {}
+        return local or {}
+    if d.get("status") != "success":
+        return local or {}
+    cache_put("info", ip, d)
+    return d
+
+
+def ip_info_batch(ips):
+    """
+    ASN / geo for many addresses in as few ip-api calls as possible.
+    Returns {ip: info}; the offline database and the cache answer first, and
+    failures fall back to whatever the offline database had, else {}.
+    """
+    out, missing, partial = {}, [], {}
+    for ip in dict.fromkeys(ips):
+        if is_private(ip):
+            out[ip] = {}
+            continue
+        local, complete = offline_info(ip)
+        if complete or not HAS_REQUESTS:
+            out[ip] = local or {}
+            continue
+        partial[ip] = local
+        hit, value = cache_get("info", ip)
+        if hit:
+            out[ip] = value
+        else:
+            missing.append(ip)
+
+    for i in range(0, len(missing), IPAPI_BATCH):
+        chunk = missing[i:i + IPAPI_BATCH]
+        try:
+            r = http.post(
+                "http://ip-api.com/batch",
+                params={"fields": IPAPI_FIELDS + ",query"},
+                json=chunk,
+                timeout=5,
+            )
+            answers = r.json()
+        except Exception:
+            answers = []
+        for ip, d in zip(chunk, answers if isinstance(answers, list) else []):
+            if isinstance(d, dict) and d.get("status") == "success":
+                d.pop("query", None)
+                cache_put("info", ip, d)
+                out[ip] = d
+        for ip in chunk:
+            out.setdefault(ip, partial.get(ip) or {})
+    return out
 
 
 def ping_ttl(ip):
@@ -232,17 +377,7 @@ def parse_hop(line):
     }
 
 
-def enrich(ip):
-    """Parallel DNS + ip-api + ping-TTL."""
-    with ThreadPoolExecutor(max_workers=3) as ex:
-        f_dns  = ex.submit(reverse_dns, ip)
-        f_info = ex.submit(ip_info, ip)
-        f_ttl  = ex.submit(ping_ttl, ip) if not is_private(ip) else None
-
-        dns_val  = _safe(f_dns, 5)
-        info_val = _safe(f_info, 5) or {}
-        ttl_val  = _safe(f_ttl, 5) if f_ttl else None
-
+def enrichment_fields(ip, dns_val, info_val, ttl_val):
     org = (
         info_val.get("org")
         or info_val.get("isp")
@@ -268,11 +403,91 @@ def enrich(ip):
     }
 
 
-def _safe(future, timeout):
-    try:
-        return future.result(timeout=timeout)
-    except Exception:
-        return None
+def hop_type_of(hop):
+    return classify_hop_type(
+        False,
+        hop["private"],
+        hop.get("org"),
+        hop.get("asn"),
+        hop.get("is_hosting", False),
+        hop.get("is_proxy", False),
+    )
+
+
+class TraceEnricher:
+    """
+    Enriches the hops of one trace off the SSE thread.
+
+    rDNS and ping-TTL run on the shared pool as soon as a hop arrives.  ASN /
+    geo comes from the offline database when it covers the hop; lookups that
+    also miss the cache are held for BATCH_WINDOW and sent to ip-api as one
+    batch.  Each hop's finished fields are posted to `events` as
+    ("enriched", (hop_no, fields)) once all three parts are in.
+    """
+
+    def __init__(self, events):
+        self.events  = events
+        self.pending = 0          # hops submitted but not yet reported
+        self._batch  = []         # (ip, Future) waiting for ip-api
+
+    @property
+    def waiting(self):
+        return bool(self._batch)
+
+    def submit(self, hop_no, ip):
+        self.pending += 1
+        private = is_private(ip)
+
+        f_dns  = _pool.submit(cached, "rdns", ip, reverse_dns)
+        f_ttl  = _pool.submit(cached, "ttl", ip, ping_ttl) if not private else _done(None)
+        f_info = Future()
+        local, complete = offline_info(ip)
+        hit, value = cache_get("info", ip)
+        if complete or private or not HAS_REQUESTS:
+            f_info.set_result(local or {})
+        elif hit:
+            f_info.set_result(value or {})
+        else:
+            self._batch.append((ip, f_info))
+            if len(self._batch) >= IPAPI_BATCH:
+                self.flush()
+
+        parts, lock = {}, threading.Lock()
+
+        def collect(name):
+            def on_done(fut):
+                with lock:
+                    parts[name] = fut.result() if not fut.exception() else None
+                    ready = len(parts) == 3
+                if ready:
+                    self.events.put(("enriched", (hop_no, enrichment_fields(
+                        ip, parts["dns"], parts["info"] or {}, parts["ttl"]))))
+            return on_done
+
+        f_dns.add_done_callback(collect("dns"))
+        f_info.add_done_callback(collect("info"))
+        f_ttl.add_done_callback(collect("ttl"))
+
+    def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+
+        def fetch():
+            try:
+                found = ip_info_batch([ip for ip, _ in batch])
+            except Exception:
+                found = {}
+            for ip, fut in batch:
+                fut.set_result(found.get(ip, {}))
+
+        _pool.submit(fetch)
+
+
+def _done(value):
+    fut = Future()
+    fut.set_result(value)
+    return fut
 
 
 # ─── ROUTES ──────────────────────────────────────────────────────────────────
@@ -305,7 +520,6 @@ def trace():
             cmd = ["tracert", "-d", "-h", "30", "-w", "2000", target]
         elif is_v6:
             # Prefer traceroute6; fall back to traceroute -6
-            import shutil
             if shutil.which("traceroute6"):
                 cmd = ["traceroute6", "-n", "-q", "3", "-w", "3", "-m", "30", target]
             else:
@@ -313,6 +527,7 @@ def trace():
         else:
             cmd = ["traceroute", "-n", "-q", "3", "-w", "3", "-m", "30", target]
 
+        proc = None
         try:
             proc = subprocess.Popen(
                 cmd,
@@ -322,11 +537,55 @@ def trace():
                 bufsize=1,
             )
 
+            # traceroute output and finished enrichments arrive on one queue,
+            # so a hop is streamed the moment its line appears and its rDNS /
+            # ASN / geo follow as "hop_enriched" events without holding up
+            # the next hop.
+            events   = queue.Queue()
+            enricher = TraceEnricher(events)
+
+            def pump():
+                for raw in proc.stdout:
+                    events.put(("line", raw))
+                events.put(("eof", None))
+
+            threading.Thread(target=pump, daemon=True).start()
+
             hop_count = 0
             all_hops  = []
+            by_number = {}
+            deadline  = None       # set once traceroute has exited
 
-            for raw in proc.stdout:
-                raw = raw.rstrip()
+            while deadline is None or (enricher.pending and time.monotonic() < deadline):
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+                    timeout = min(timeout, BATCH_WINDOW) if enricher.waiting else timeout
+                else:
+                    timeout = BATCH_WINDOW if enricher.waiting else None
+                try:
+                    kind, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    enricher.flush()
+                    continue
+
+                if kind == "eof":
+                    enricher.flush()
+                    deadline = time.monotonic() + ENRICH_GRACE
+                    continue
+
+                if kind == "enriched":
+                    hop_no, extra = payload
+                    enricher.pending -= 1
+                    hop = by_number.get(hop_no)
+                    if hop is None:
+                        continue
+                    hop.update(extra)
+                    hop["pending"]  = False
+                    hop["hop_type"] = hop_type_of(hop)
+                    yield f"data: {json.dumps({'type': 'hop_enriched', 'data': hop})}\n\n"
+                    continue
+
+                raw = payload.rstrip()
                 if not raw or not re.match(r"^\s*\d", raw):
                     continue
 
@@ -337,8 +596,9 @@ def trace():
                 hop_count += 1
 
                 if hop["ip"]:
-                    extra = enrich(hop["ip"])
-                    hop.update(extra)
+                    # Placeholders until the enrichment lands.
+                    hop.update(enrichment_fields(hop["ip"], None, {}, None))
+                    hop["pending"] = True
 
                     lats         = hop["latency_ms"]
                     total_probes = hop["raw_probes"]
@@ -356,14 +616,9 @@ def trace():
                         hop["lat_class"] = "none"
 
                     hop["packet_loss"] = round((lost / total_probes) * 100) if total_probes else 0
-                    hop["hop_type"]    = classify_hop_type(
-                        False,
-                        hop["private"],
-                        hop.get("org"),
-                        hop.get("asn"),
-                        hop.get("is_hosting", False),
-                        hop.get("is_proxy", False),
-                    )
+                    hop["hop_type"]    = hop_type_of(hop)
+                    by_number[hop["hop"]] = hop
+                    enricher.submit(hop["hop"], hop["ip"])
                 else:
                     hop.update({
                         "avg": None, "min_ms": None, "max_ms": None, "jitter": None,
@@ -373,7 +628,7 @@ def trace():
                         "country": None, "country_code": None, "city": None, "region": None,
                         "ttl": None, "os": None, "os_basis": None,
                         "is_hosting": False, "is_proxy": False, "is_mobile": False,
-                        "ip_version": None,
+                        "ip_version": None, "pending": False,
                     })
 
                 all_hops.append(hop)
@@ -381,7 +636,15 @@ def trace():
 
             proc.wait()
 
-            # Retroactively tag last responding hop as TARGET
+            # Enrichment that missed the grace window: settle those hops with
+            # what they have so the page stops showing them as resolving.
+            for hop in by_number.values():
+                if hop.get("pending"):
+                    hop["pending"] = False
+                    yield f"data: {json.dumps({'type': 'hop_enriched', 'data': hop})}\n\n"
+
+            # Retroactively tag last responding hop as TARGET (after its
+            # enrichment, so the classification is not overwritten)
             for h in reversed(all_hops):
                 if not h["timeout"] and h["ip"]:
                     h["hop_type"] = "TARGET"
@@ -397,6 +660,10 @@ def trace():
             yield f"data: {json.dumps({'type': 'error', 'msg': 'permission denied — try: sudo python app.py'})}\n\n"
         except Exception as exc:
             yield f"data: {json.dumps({'type': 'error', 'msg': str(exc)})}\n\n"
+        finally:
+            # Client went away mid-trace: don't leave traceroute running.
+            if proc is not None and proc.poll() is None:
+                proc.kill()
 
     return Response(
         stream_with_context(generate()),
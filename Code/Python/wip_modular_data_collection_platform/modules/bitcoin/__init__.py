@@ -56,7 +56,8 @@ DEFAULT_SETTINGS = {
     "provenance_depth": 3,       # how far back a flagged coin is mapped
     "max_trace_depth": 6,        # how far forward spends are auto-followed
     "max_trace_nodes": 60,       # cap on hops per flagged coin
-    "request_delay": 0.4,        # politeness delay between API calls
+    "request_delay": 0.4,        # average spacing between API calls (shared token bucket)
+    "sweep_workers": 4,          # concurrent lookups / watched items during a sweep
 }
 
 
@@ -79,11 +80,18 @@ def _store() -> Store:
     return store
 
 
-def _client(settings: dict) -> explorer.ExplorerClient:
+def _limiter(settings: dict) -> explorer.TokenBucket:
+    return explorer.bucket_for(settings["api_base_url"],
+                               float(settings.get("request_delay", 0.4)))
+
+
+def _client(settings: dict, store: Store | None = None) -> explorer.ExplorerClient:
     return explorer.ExplorerClient(
         base_url=settings["api_base_url"],
         timeout=float(settings.get("timeout", 10)),
         user_agent=current_app.config["DEFAULT_USER_AGENT"],
+        limiter=_limiter(settings),
+        cache=store or _store(),
     )
 
 
@@ -92,7 +100,7 @@ def _cfg(settings: dict) -> monitor.MonitorConfig:
         provenance_depth=int(settings["provenance_depth"]),
         max_trace_depth=int(settings["max_trace_depth"]),
         max_trace_nodes=int(settings["max_trace_nodes"]),
-        request_delay=float(settings["request_delay"]),
+        workers=int(settings.get("sweep_workers", 4)),
     )
 
 
@@ -106,7 +114,7 @@ def _run_bg(app, fn):
         with app.app_context():
             settings = _settings()
             store = _store()
-            client = _client(settings)
+            client = _client(settings, store)
             cfg = _cfg(settings)
         # network work happens outside the context; only config reads need it
         try:
@@ -136,7 +144,7 @@ def _ensure_poller(app):
                 interval = max(60, int(settings.get("poll_interval", 300)))
                 if settings.get("auto_poll", True):
                     store = _store()
-                    client = _client_no_ctx(settings, app)
+                    client = _client_no_ctx(settings, app, store)
                     monitor.run_once(store, client, _cfg(settings))
             except Exception:  # noqa: BLE001 — a poller must never die
                 interval = 300
@@ -145,11 +153,12 @@ def _ensure_poller(app):
     threading.Thread(target=loop, daemon=True).start()
 
 
-def _client_no_ctx(settings, app):
+def _client_no_ctx(settings, app, store):
     with app.app_context():
         ua = app.config["DEFAULT_USER_AGENT"]
     return explorer.ExplorerClient(settings["api_base_url"],
-                                   float(settings.get("timeout", 10)), ua)
+                                   float(settings.get("timeout", 10)), ua,
+                                   limiter=_limiter(settings), cache=store)
 
 
 # --------------------------------------------------------------------------- #
@@ -185,6 +194,8 @@ def create_blueprint() -> Blueprint:
         store = _store()
         return render_template("bitcoin_index.html", settings=settings,
                                summary=store.summary(),
+                               last_sweep=store.last_sweep(),
+                               cache_size=store.cache_size(),
                                addresses=store.list_addresses(),
                                txs=store.list_txs(),
                                coins=store.list_coins())
@@ -349,7 +360,7 @@ def create_blueprint() -> Blueprint:
             return redirect(url_for(".coin", coin_id=existing["id"]))
         # Do the first trace synchronously enough to create the record, but the
         # heavy walk runs in the background so the request returns promptly.
-        client = _client(settings)
+        client = _client(settings, store)
         try:
             coin_id, _ = monitor.flag_coin(store, client, txid, vout, label,
                                            current_user.username, _cfg(settings))
@@ -455,6 +466,7 @@ def create_config_blueprint() -> Blueprint:
             "max_trace_depth": i("max_trace_depth", 1, 20, current["max_trace_depth"]),
             "max_trace_nodes": i("max_trace_nodes", 5, 500, current["max_trace_nodes"]),
             "request_delay": f("request_delay", 0.0, 5.0, current["request_delay"]),
+            "sweep_workers": i("sweep_workers", 1, 16, current["sweep_workers"]),
         })
         flash("Settings saved.", "success")
         return redirect(url_for(".config"))
@@ -0,0 +1,127 @@
+"""Benchmark forward tracing on a large synthetic spend graph.
+
+    python3 -m modules.bitcoin.bench_trace [--nodes 50000] [--fanout 4] [--latency 0]
+
+Run from the platform root. A stub explorer serves a tree of transactions in
+which every output is spent by a transaction with ``fanout`` outputs of its
+own, deep enough to reach ``--nodes`` hops. One output is flagged and
+re-checked until the trace stops moving, the way repeated sweeps would; each
+pass prints how many hops it wrote and how long it took. ``--latency`` adds a
+per-request delay to stand in for the network; leave it at 0 to measure the
+storage side on its own.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from . import explorer, monitor
+from .storage import Store
+
+
+class _Response:
+    def __init__(self, data):
+        self.status_code = 200
+        self.text = data if isinstance(data, str) else json.dumps(data)
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class StubExplorer(explorer.ExplorerClient):
+    """Answers from a generated graph. ``n0`` has one output, spent by ``n1``;
+    from there each ``n<i>`` has ``fanout`` outputs, and output ``k`` is spent by
+    ``n<(i - 1) * fanout + k + 2>`` while that index is at most ``total``."""
+
+    def __init__(self, total: int, fanout: int, latency: float = 0.0):
+        super().__init__("stub://explorer")
+        self.total, self.fanout, self.latency = total, fanout, latency
+
+    def _width(self, i: int) -> int:
+        return 1 if i == 0 else self.fanout
+
+    def _tx(self, i: int) -> dict:
+        return {
+            "txid": f"n{i}",
+            "vin": [{"txid": f"p{i}", "vout": 0, "prevout": {"value": 100_000}}],
+            "vout": [{"value": 100_000 // self._width(i), "scriptpubkey_address": f"a{i}_{k}"}
+                     for k in range(self._width(i))],
+            "status": {"confirmed": True, "block_height": 1, "block_time": 1_700_000_000},
+        }
+
+    def _outspends(self, i: int) -> list:
+        out = []
+        for k in range(self._width(i)):
+            child = 1 if i == 0 else (i - 1) * self.fanout + k + 2
+            out.append({"spent": True, "txid": f"n{child}"} if child <= self.total
+                       else {"spent": False})
+        return out
+
+    def _get(self, path, headers=None):
+        self._count("requests")
+        if self.latency:
+            time.sleep(self.latency)
+        parts = path.split("/")
+        if parts[0] == "blocks":
+            return _Response("100")
+        name = parts[1]
+        if name.startswith("p"):
+            return _Response({"txid": name, "vin": [{"is_coinbase": True}],
+                              "vout": [{"value": 100_000}], "status": {}})
+        i = int(name[1:])
+        return _Response(self._outspends(i) if len(parts) == 3 else self._tx(i))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--nodes", type=int, default=50_000, help="hops to trace")
+    ap.add_argument("--fanout", type=int, default=4, help="outputs per transaction")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per stub request")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    # Transactions needed for ``nodes`` outputs, and the depth they reach.
+    total = max(1, args.nodes // args.fanout)
+    depth, width, seen = 1, 1, 1
+    while seen < total:
+        width *= args.fanout
+        seen += width
+        depth += 1
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_trace_"), "bitcoin.db")
+    store = Store(path)
+    store.init()
+    client = StubExplorer(total, args.fanout, args.latency)
+    cfg = monitor.MonitorConfig(provenance_depth=1, max_trace_depth=depth + 1,
+                                max_trace_nodes=args.nodes + args.fanout + 2,
+                                workers=args.workers)
+
+    print(f"graph: {total} transactions, fanout {args.fanout}, depth {depth}  db: {path}")
+    started = time.perf_counter()
+    t = time.perf_counter()
+    coin_id, _ = monitor.flag_coin(store, client, "n0", 0, "bench", "bench", cfg)
+    print(f"flag      {store.count_hops(coin_id):>8} hops  {time.perf_counter() - t:7.2f} s")
+
+    passes = 0
+    while True:
+        before = store.count_hops(coin_id)
+        t = time.perf_counter()
+        moved = monitor.check_coin(store, client, store.get_coin(coin_id), cfg)
+        elapsed = time.perf_counter() - t
+        added = store.count_hops(coin_id) - before
+        passes += 1
+        print(f"pass {passes:<3}  {added:>8} hops  {elapsed:7.2f} s  "
+              f"({added / elapsed if elapsed else 0:,.0f} hops/s, {moved} spends)")
+        if not moved:
+            break
+
+    total_s = time.perf_counter() - started
+    hops = store.count_hops(coin_id)
+    print(f"\ntotal     {hops:>8} hops  {total_s:7.2f} s  "
+          f"({hops / total_s:,.0f} hops/s, {client.requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
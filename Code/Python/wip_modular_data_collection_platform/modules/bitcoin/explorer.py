@@ -9,7 +9,10 @@ The same endpoints are served by blockstream.info (mainnet/testnet) and by any
 self-hosted Esplora instance, so pointing this at a private node is just a
 settings change.
 """
+import json
 import re
+import threading
+import time
 from datetime import datetime, timezone
 from urllib.parse import quote
 
@@ -98,24 +101,137 @@ def format_timestamp(ts) -> str:
         return "—"
 
 
+# --------------------------------------------------------------------------- #
+# Rate limiting
+# --------------------------------------------------------------------------- #
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second on average, at
+    most ``burst`` back to back. A rate of 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = max(0.0, float(rate))
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def configure(self, rate: float, burst: int) -> None:
+        with self.lock:
+            self.rate = max(0.0, float(rate))
+            self.burst = max(1, int(burst))
+            self.tokens = min(self.tokens, self.burst)
+
+    def acquire(self) -> None:
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets: dict = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(base_url: str, request_delay: float, burst: int = 2) -> TokenBucket:
+    """The one bucket shared by every client talking to ``base_url``.
+
+    Clients are built per request and per sweep, so the bucket has to outlive
+    them: politeness is owed to the explorer, not to any one caller. The
+    configured delay becomes the average spacing between calls."""
+    rate = (1.0 / request_delay) if request_delay and request_delay > 0 else 0.0
+    key = (base_url or "").rstrip("/")
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(rate, burst)
+        elif bucket.rate != rate or bucket.burst != burst:
+            bucket.configure(rate, burst)
+        return bucket
+
+
+# --------------------------------------------------------------------------- #
+# Response cache policy
+# --------------------------------------------------------------------------- #
+# A transaction buried this deep is treated as settled history and cached for
+# good; anything shallower, unconfirmed, or about an address can still change
+# and is only reused for MUTABLE_TTL seconds or until the tip moves.
+SETTLED_CONFIRMATIONS = 6
+MUTABLE_TTL = 30.0
+TIP_TTL = 10.0
+
+
+def _settled(status: dict | None, tip: int) -> bool:
+    status = status or {}
+    height = status.get("block_height")
+    if not status.get("confirmed") or not height:
+        return False
+    return bool(tip) and tip - height + 1 >= SETTLED_CONFIRMATIONS
+
+
+def tx_ttl(data: dict, tip: int) -> float | None:
+    """None (keep forever) once the transaction is settled."""
+    return None if _settled(data.get("status"), tip) else MUTABLE_TTL
+
+
+def outspends_ttl(data: list, tip: int) -> float | None:
+    """None once every output is spent by a settled transaction — an unspent
+    output can be spent at any moment, a settled spend cannot be undone."""
+    if data and all(s.get("spent") and _settled(s.get("status"), tip) for s in data):
+        return None
+    return MUTABLE_TTL
+
+
 # --------------------------------------------------------------------------- #
 # API client
 # --------------------------------------------------------------------------- #
 class ExplorerClient:
-    def __init__(self, base_url: str, timeout: float = 10.0, user_agent: str = "OSINT-Console"):
+    """HTTP client for one explorer.
+
+    ``cache`` is optional and duck-typed (the module's Store provides it):
+    ``cache_get(key)`` returning a row with ``body``, ``etag`` and
+    ``expires_at``, ``cache_put(key, body, etag, ttl)`` and
+    ``cache_tip(height)``, which drops every mutable entry when the chain tip
+    has advanced, and ``cache_known_tip()``, the last height it was given. With a cache, settled transactions are never fetched twice
+    and a stale entry with an ETag is revalidated rather than re-downloaded."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0, user_agent: str = "OSINT-Console",
+                 limiter: TokenBucket | None = None, cache=None):
         self.base_url = (base_url or "").rstrip("/")
         self.timeout = timeout
         self.headers = {"User-Agent": user_agent}
-
-    def _get(self, path: str):
+        self.limiter = limiter
+        self.cache = cache
+        self.tip = 0                  # last tip height seen, for the cache policy
+        self.requests = 0             # HTTP calls actually made by this client
+        self.hits = 0                 # lookups answered from the cache (incl. 304s)
+        self.misses = 0               # lookups that had to download a body
+        self._count_lock = threading.Lock()
+
+    def _count(self, field: str) -> None:
+        with self._count_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _get(self, path: str, headers: dict | None = None):
         url = f"{self.base_url}/{path.lstrip('/')}"
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self._count("requests")
         try:
-            resp = requests.get(url, headers=self.headers, timeout=self.timeout)
+            resp = requests.get(url, headers={**self.headers, **(headers or {})},
+                                timeout=self.timeout)
         except requests.RequestException as exc:
             raise ExplorerError(f"Could not reach the explorer API: {exc}")
         if resp.status_code == 404:
             raise ExplorerError("Not found on this network.")
-        if resp.status_code != 200:
+        if resp.status_code not in (200, 304):
             raise ExplorerError(f"Explorer API returned HTTP {resp.status_code}.")
         return resp
 
@@ -125,24 +241,69 @@ class ExplorerClient:
         except ValueError:
             raise ExplorerError("Explorer API returned an unexpected (non-JSON) response.")
 
+    def _cached_json(self, path: str, ttl_for):
+        """GET ``path`` as JSON through the cache. ``ttl_for(data, tip)`` says
+        how long the answer stays good: seconds, or None for ever."""
+        if self.cache is None:
+            return self._get_json(path)
+        entry = self.cache.cache_get(path)
+        if entry is not None and (entry["expires_at"] is None or entry["expires_at"] > time.time()):
+            self._count("hits")
+            return json.loads(entry["body"])
+
+        conditional = {"If-None-Match": entry["etag"]} if entry is not None and entry["etag"] else None
+        resp = self._get(path, conditional)
+        if resp.status_code == 304 and entry is not None:
+            self._count("hits")
+            body, etag = entry["body"], entry["etag"]
+        else:
+            self._count("misses")
+            body, etag = resp.text, resp.headers.get("ETag")
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise ExplorerError("Explorer API returned an unexpected (non-JSON) response.")
+        if not self.tip:
+            self.tip = self.cache.cache_known_tip()
+        self.cache.cache_put(path, body, etag, ttl_for(data, self.tip))
+        return data
+
     def address(self, address: str) -> dict:
-        return self._get_json(f"address/{quote(address, safe='')}")
+        return self._cached_json(f"address/{quote(address, safe='')}",
+                                 lambda data, tip: MUTABLE_TTL)
 
     def address_txs(self, address: str) -> list:
-        return self._get_json(f"address/{quote(address, safe='')}/txs")
+        return self._cached_json(f"address/{quote(address, safe='')}/txs",
+                                 lambda data, tip: MUTABLE_TTL)
 
     def transaction(self, txid: str) -> dict:
-        return self._get_json(f"tx/{quote(txid, safe='')}")
+        return self._cached_json(f"tx/{quote(txid, safe='')}", tx_ttl)
 
     def outspends(self, txid: str) -> list:
-        return self._get_json(f"tx/{quote(txid, safe='')}/outspends")
+        return self._cached_json(f"tx/{quote(txid, safe='')}/outspends", outspends_ttl)
 
     def tip_height(self) -> int:
-        """Current chain tip height (for computing confirmation counts)."""
+        """Current chain tip height (for computing confirmation counts).
+
+        With a cache, a fresh height also invalidates every mutable entry
+        once the chain has moved past the height they were stored under."""
+        path = "blocks/tip/height"
+        if self.cache is not None:
+            entry = self.cache.cache_get(path)
+            if entry is not None and entry["expires_at"] and entry["expires_at"] > time.time():
+                self._count("hits")
+                self.tip = int(entry["body"])
+                return self.tip
         try:
-            return int(self._get("blocks/tip/height").text.strip())
+            height = int(self._get(path).text.strip())
         except (ValueError, ExplorerError):
             return 0
+        self.tip = height
+        if self.cache is not None:
+            self._count("misses")
+            self.cache.cache_tip(height)
+            self.cache.cache_put(path, str(height), None, TIP_TTL)
+        return height
 
 
 # --------------------------------------------------------------------------- #
@@ -17,8 +17,19 @@ outputs of each spending transaction (the standard taint approach) and annotates
 each hop with a proportional ``taint_share`` (our input value / the spending
 transaction's total input value) so an investigator can judge dilution. Depth
 and node caps keep the trace bounded.
+
+Sweeps run concurrently: watched items are checked on a small worker pool and
+each trace fetches a whole frontier at once. Politeness is not the monitor's
+job any more — every call goes through the explorer's shared token bucket
+(see explorer.bucket_for), so adding workers overlaps network latency without
+raising the request rate. Within one sweep a SweepClient answers repeated
+lookups from the first result, so two coins spent by the same transaction cost
+one request, not two. Database writes stay in the thread that owns the item.
 """
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 from . import explorer
@@ -30,7 +41,111 @@ class MonitorConfig:
     provenance_depth: int = 3     # how far back to map a coin's origin
     max_trace_depth: int = 6      # how far forward to auto-follow spends
     max_trace_nodes: int = 60     # cap on hops per flagged coin
-    request_delay: float = 0.4    # politeness delay between API calls
+    workers: int = 4              # concurrent lookups / watched items per sweep
+
+
+# --------------------------------------------------------------------------- #
+# Sweep-scoped client
+# --------------------------------------------------------------------------- #
+class SweepClient:
+    """One sweep's view of the explorer.
+
+    Wraps an ExplorerClient so that identical lookups made during a sweep go to
+    the network once: a second caller — in another thread or later on — gets
+    the first caller's result (or its error) instead of a request of its own.
+    ``many`` fans independent lookups out over a worker pool."""
+
+    def __init__(self, client: explorer.ExplorerClient, workers: int = 4):
+        self.client = client
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers),
+                                       thread_name_prefix="btc-fetch")
+        self.memo: dict = {}
+        self.lock = threading.Lock()
+        self.coalesced = 0
+
+    @property
+    def requests(self) -> int:
+        return self.client.requests
+
+    @property
+    def hits(self) -> int:
+        return self.client.hits
+
+    @property
+    def misses(self) -> int:
+        return self.client.misses
+
+    def _call(self, method: str, *args):
+        key = (method, *args)
+        with self.lock:
+            fut = self.memo.get(key)
+            owner = fut is None
+            if owner:
+                fut = self.memo[key] = Future()
+            else:
+                self.coalesced += 1
+        if owner:
+            try:
+                fut.set_result(getattr(self.client, method)(*args))
+            except Exception as exc:  # noqa: BLE001 — handed to every waiter
+                fut.set_exception(exc)
+        return fut.result()
+
+    def address(self, address: str) -> dict:
+        return self._call("address", address)
+
+    def address_txs(self, address: str) -> list:
+        return self._call("address_txs", address)
+
+    def transaction(self, txid: str) -> dict:
+        return self._call("transaction", txid)
+
+    def outspends(self, txid: str) -> list:
+        return self._call("outspends", txid)
+
+    def tip_height(self) -> int:
+        return self._call("tip_height")
+
+    def many(self, method: str, args) -> dict:
+        """``{arg: result or ExplorerError}`` for every arg, fetched concurrently."""
+        args = list(dict.fromkeys(args))
+
+        def one(arg):
+            try:
+                return self._call(method, arg)
+            except explorer.ExplorerError as exc:
+                return exc
+        return dict(zip(args, self.pool.map(one, args)))
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False)
+
+
+@contextmanager
+def sweep_client(client, cfg: MonitorConfig):
+    """Use ``client`` as-is if it is already a SweepClient, else wrap it for the
+    duration of the block."""
+    if isinstance(client, SweepClient):
+        yield client
+        return
+    wrapped = SweepClient(client, cfg.workers)
+    try:
+        yield wrapped
+    finally:
+        wrapped.close()
+
+
+def _many(client, method: str, args) -> dict:
+    """``client.many`` when it has one; the same mapping, fetched in turn, when not."""
+    if hasattr(client, "many"):
+        return client.many(method, args)
+    out = {}
+    for arg in dict.fromkeys(args):
+        try:
+            out[arg] = getattr(client, method)(arg)
+        except explorer.ExplorerError as exc:
+            out[arg] = exc
+    return out
 
 
 # --------------------------------------------------------------------------- #
@@ -57,10 +172,10 @@ def check_address(store: Store, client: explorer.ExplorerClient, row, cfg: Monit
     # Iterate newest-first as returned by the API. For each new tx, fetch the
     # full transaction so input/output detail is always present (address-txs
     # summaries can't be relied on to carry prevouts), and classify direction.
+    fulls = _many(client, "transaction", new_txids)
     for txid in new_txids:
-        try:
-            full = client.transaction(txid)
-        except explorer.ExplorerError:
+        full = fulls.get(txid)
+        if isinstance(full, explorer.ExplorerError) or full is None:
             continue
         delta = explorer.address_delta(full, row["address"])
         status = full.get("status", {}) or {}
@@ -75,7 +190,6 @@ def check_address(store: Store, client: explorer.ExplorerClient, row, cfg: Monit
             detected += 1
             if bt:
                 last_activity = max(last_activity or 0, bt)
-        time.sleep(cfg.request_delay)
 
     known.update(current)
     known_capped = list(known)[-300:]
@@ -116,6 +230,11 @@ def flag_coin(store: Store, client: explorer.ExplorerClient, txid: str, vout: in
     if existing:
         return existing["id"], False
 
+    with sweep_client(client, cfg) as sc:
+        return _flag_coin(store, sc, txid, vout, label, created_by, cfg), True
+
+
+def _flag_coin(store, client, txid, vout, label, created_by, cfg: MonitorConfig) -> int:
     tx = client.transaction(txid)
     vouts = tx.get("vout") or []
     if vout < 0 or vout >= len(vouts):
@@ -126,97 +245,132 @@ def flag_coin(store: Store, client: explorer.ExplorerClient, txid: str, vout: in
     block_time = (tx.get("status") or {}).get("block_time")
 
     coin_id = store.add_coin(txid, vout, label, created_by, value, address)
-    store.add_hop(coin_id, 0, "flagged", txid, vout, value, address,
-                  block_time=block_time, taint_share=1.0)
+    store.add_hops(coin_id, [Store.hop(0, "flagged", txid, vout, value, address,
+                                       block_time=block_time, taint_share=1.0)])
 
     _build_provenance(store, client, coin_id, txid, cfg)
     expand_forward(store, client, store.get_coin(coin_id), cfg)
-    return coin_id, True
+    return coin_id
 
 
 def _build_provenance(store, client, coin_id, origin_txid, cfg: MonitorConfig):
     """Walk the input ancestry of the flagged coin's creating transaction.
-    Provenance is immutable history, so it is mapped once at flag time."""
-    frontier = [(origin_txid, -1)]
+    Provenance is immutable history, so it is mapped once at flag time.
+
+    Breadth-first, one generation at a time: every transaction at a depth is
+    fetched together, and the whole ancestry is written in one transaction in
+    the order a one-at-a-time walk would have written it."""
+    level = [origin_txid]
     seen = {origin_txid}
-    while frontier:
-        cur_txid, depth = frontier.pop(0)
-        if depth < -cfg.provenance_depth:
-            continue
-        try:
-            tx = client.transaction(cur_txid)
-        except explorer.ExplorerError:
-            continue
-        for vin in (tx.get("vin") or []):
-            if vin.get("is_coinbase"):
-                store.add_hop(coin_id, depth, "ancestor", "coinbase", None, 0,
-                              "Coinbase (newly mined)", expanded=1)
+    depth = -1
+    hops = []
+    while level and depth >= -cfg.provenance_depth:
+        fetched = _many(client, "transaction", level)
+        parents = []
+        for cur_txid in level:
+            tx = fetched.get(cur_txid)
+            if isinstance(tx, explorer.ExplorerError) or tx is None:
                 continue
-            prev_txid = vin.get("txid")
-            prev_vout = vin.get("vout")
-            prevout = vin.get("prevout") or {}
-            store.add_hop(coin_id, depth, "ancestor", prev_txid, prev_vout,
-                          prevout.get("value", 0), prevout.get("scriptpubkey_address"),
-                          expanded=1)
-            if prev_txid and prev_txid not in seen and depth - 1 >= -cfg.provenance_depth:
-                seen.add(prev_txid)
-                frontier.append((prev_txid, depth - 1))
-        time.sleep(cfg.request_delay)
+            for vin in (tx.get("vin") or []):
+                if vin.get("is_coinbase"):
+                    hops.append(Store.hop(depth, "ancestor", "coinbase", None, 0,
+                                          "Coinbase (newly mined)", expanded=1))
+                    continue
+                prev_txid = vin.get("txid")
+                prev_vout = vin.get("vout")
+                prevout = vin.get("prevout") or {}
+                hops.append(Store.hop(depth, "ancestor", prev_txid, prev_vout,
+                                      prevout.get("value", 0), prevout.get("scriptpubkey_address"),
+                                      expanded=1))
+                if prev_txid and prev_txid not in seen and depth - 1 >= -cfg.provenance_depth:
+                    seen.add(prev_txid)
+                    parents.append(prev_txid)
+        level = parents
+        depth -= 1
+    store.add_hops(coin_id, hops)
 
 
 def expand_forward(store: Store, client: explorer.ExplorerClient, coin, cfg: MonitorConfig) -> int:
     """Re-check every unspent outpoint on the forward frontier. When one has
     been spent, follow the spending transaction's outputs as new hops. Returns
-    the number of newly discovered movements (spends)."""
+    the number of newly discovered movements (spends).
+
+    The network side runs a frontier at a time — every outspends lookup at
+    once, then every spending transaction at once — and the step is written
+    as one transaction, hops in frontier order, exactly as a hop-by-hop walk
+    would write them. The node cap is checked against the coin's maintained
+    hop counter, read once, rather than a COUNT per output."""
     movements = 0
-    for hop in store.frontier_hops(coin["id"]):
-        try:
-            spends = client.outspends(hop["txid"])
-        except explorer.ExplorerError:
+    frontier = store.frontier_hops(coin["id"])
+    spends_by_tx = _many(client, "outspends", [h["txid"] for h in frontier])
+
+    moved = []
+    for hop in frontier:
+        spends = spends_by_tx.get(hop["txid"])
+        if isinstance(spends, explorer.ExplorerError) or spends is None:
             continue
         idx = hop["vout"]
         spend = spends[idx] if (idx is not None and idx < len(spends)) else None
-        if not (spend and spend.get("spent")):
-            continue  # still unspent — a current resting place; recheck later
-
-        spend_txid = spend.get("txid")
-        store.mark_hop(hop["id"], spent=1, spent_txid=spend_txid, expanded=1)
+        if spend and spend.get("spent"):
+            moved.append((hop, spend.get("txid")))
+        # else still unspent — a current resting place; recheck later
+
+    nodes = store.count_hops(coin["id"])
+    followable = [t for h, t in moved if h["depth"] + 1 <= cfg.max_trace_depth]
+    if followable and nodes < cfg.max_trace_nodes:
+        spending = _many(client, "transaction", followable)
+    else:
+        spending = {}
+
+    marks, new_hops, seen = [], [], set()
+    truncated = False
+    for hop, spend_txid in moved:
+        marks.append((hop["id"], spend_txid))
         movements += 1
 
-        if store.count_hops(coin["id"]) >= cfg.max_trace_nodes or hop["depth"] + 1 > cfg.max_trace_depth:
-            store.update_coin(coin["id"], truncated=1)
+        if nodes >= cfg.max_trace_nodes or hop["depth"] + 1 > cfg.max_trace_depth:
+            truncated = True
             continue
-        try:
-            stx = client.transaction(spend_txid)
-        except explorer.ExplorerError:
+        stx = spending.get(spend_txid)
+        if isinstance(stx, explorer.ExplorerError) or stx is None:
             continue
         total_in = sum((vin.get("prevout") or {}).get("value", 0) for vin in (stx.get("vin") or []))
         share = (hop["value_sat"] / total_in) if total_in else None
         bt = (stx.get("status") or {}).get("block_time")
         for i, o in enumerate(stx.get("vout") or []):
-            if store.count_hops(coin["id"]) >= cfg.max_trace_nodes:
-                store.update_coin(coin["id"], truncated=1)
+            if nodes >= cfg.max_trace_nodes:
+                truncated = True
                 break
-            store.add_hop(
-                coin["id"], hop["depth"] + 1, "descendant", spend_txid, i,
+            # Two frontier hops spent by the same transaction reach the same
+            # outputs; the second sighting is not a new node.
+            key = (spend_txid, i, hop["depth"] + 1)
+            if key in seen:
+                continue
+            seen.add(key)
+            nodes += 1
+            new_hops.append(Store.hop(
+                hop["depth"] + 1, "descendant", spend_txid, i,
                 o.get("value", 0), o.get("scriptpubkey_address"),
                 block_time=bt, taint_share=share, parent_hop_id=hop["id"], is_new=1,
-            )
-        time.sleep(cfg.request_delay)
+            ))
+
+    if marks:
+        store.advance_frontier(coin["id"], marks, new_hops)
+    if truncated:
+        store.update_coin(coin["id"], truncated=1)
 
     # Reflect movement on the coin record (drives the "new spend" tag).
     if movements:
-        flagged = store.get_coin(coin["id"])
-        store.update_coin(coin["id"], is_new_spend=1, status="traced",
-                          spent=1 if flagged else 0)
+        store.update_coin(coin["id"], is_new_spend=1, status="traced", spent=1)
     store.touch_coin(coin["id"])
     return movements
 
 
 def check_coin(store, client, coin, cfg: MonitorConfig) -> int:
     # Keep the flagged outpoint's own spent flag in sync for display.
-    movements = expand_forward(store, client, coin, cfg)
-    flagged_hop = next((h for h in store.get_hops(coin["id"]) if h["kind"] == "flagged"), None)
+    with sweep_client(client, cfg) as sc:
+        movements = expand_forward(store, sc, coin, cfg)
+    flagged_hop = store.flagged_hop(coin["id"])
     if flagged_hop:
         store.update_coin(coin["id"], spent=flagged_hop["spent"],
                           spent_txid=flagged_hop["spent_txid"])
@@ -227,32 +381,49 @@ def check_coin(store, client, coin, cfg: MonitorConfig) -> int:
 # Sweep — used by "Check now" and the background poller
 # --------------------------------------------------------------------------- #
 def run_once(store: Store, client: explorer.ExplorerClient, cfg: MonitorConfig) -> dict:
-    counts = {"addresses": 0, "txs": 0, "coins": 0, "errors": 0}
-    tip = 0
-    try:
-        tip = client.tip_height()
-    except explorer.ExplorerError:
-        pass
+    """Check every watched address, transaction and coin once.
 
-    for row in store.list_addresses():
-        try:
-            counts["addresses"] += check_address(store, client, row, cfg)
-        except explorer.ExplorerError:
-            counts["errors"] += 1
-        time.sleep(cfg.request_delay)
-
-    for row in store.list_txs():
-        try:
-            if check_tx(store, client, row, tip):
-                counts["txs"] += 1
-        except explorer.ExplorerError:
-            counts["errors"] += 1
-        time.sleep(cfg.request_delay)
-
-    for row in store.list_coins():
+    Items run on ``cfg.workers`` threads; their lookups share one SweepClient,
+    so the explorer sees each distinct request at most once per sweep. The
+    returned counts are also written to the sweeps table with the sweep's
+    duration and request figures."""
+    counts = {"addresses": 0, "txs": 0, "coins": 0, "errors": 0}
+    started_at = utcnow_iso()
+    started = time.monotonic()
+
+    with sweep_client(client, cfg) as sc:
+        requests_before = sc.requests
+        coalesced_before = sc.coalesced
+        hits_before, misses_before = sc.hits, sc.misses
+        tip = 0
         try:
-            counts["coins"] += check_coin(store, client, row, cfg)
+            tip = sc.tip_height()
         except explorer.ExplorerError:
-            counts["errors"] += 1
-
-    return counts
+            pass
+
+        jobs = []
+        with ThreadPoolExecutor(max_workers=max(1, cfg.workers),
+                                thread_name_prefix="btc-sweep") as pool:
+            for row in store.list_addresses():
+                jobs.append(("addresses", pool.submit(check_address, store, sc, row, cfg)))
+            for row in store.list_txs():
+                jobs.append(("txs", pool.submit(check_tx, store, sc, row, tip)))
+            for row in store.list_coins():
+                jobs.append(("coins", pool.submit(check_coin, store, sc, row, cfg)))
+
+            for kind, fut in jobs:
+                try:
+                    counts[kind] += int(fut.result())
+                except explorer.ExplorerError:
+                    counts["errors"] += 1
+
+        metrics = {
+            "duration_s": round(time.monotonic() - started, 3),
+            "requests": sc.requests - requests_before,
+            "coalesced": sc.coalesced - coalesced_before,
+            "cache_hits": sc.hits - hits_before,
+            "cache_misses": sc.misses - misses_before,
+            "items": len(jobs),
+        }
+    store.record_sweep(started_at, counts, metrics)
+    return {**counts, **metrics}
@@ -10,9 +10,17 @@ their trace graphs — lives here.
 The workspace is shared across authenticated operators (like a shared case
 file). Each row records who created it. Override the DB location with the
 BITCOIN_DB_PATH environment variable.
+
+Connections are long-lived, one per thread per database file: a trace writes
+thousands of rows, and opening SQLite (plus its PRAGMAs) for every one of them
+cost more than the writes. Store objects are cheap and share those connections.
+Multi-statement writes go through ``with self._connect() as conn`` so that each
+is one transaction, committed on success and rolled back on error.
 """
 import json
 import sqlite3
+import threading
+import time
 from datetime import datetime, timezone
 
 
@@ -20,22 +28,42 @@ def utcnow_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+# Per-thread connections, keyed by database path. A thread's connections are
+# closed when the thread (and with it this local storage) goes away.
+_local = threading.local()
+_initialised = set()
+_init_lock = threading.Lock()
+
+
 class Store:
     def __init__(self, path: str):
         self.path = path
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.execute("PRAGMA journal_mode = WAL")
-        conn.execute("PRAGMA synchronous = NORMAL")
-        conn.execute("PRAGMA busy_timeout = 5000")
+        conns = getattr(_local, "conns", None)
+        if conns is None:
+            conns = _local.conns = {}
+        conn = conns.get(self.path)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conns[self.path] = conn
         return conn
 
     def init(self) -> None:
-        conn = self._connect()
-        try:
+        """Create or upgrade the schema; a no-op after the first call per file."""
+        with _init_lock:
+            if self.path in _initialised:
+                return
+            self._create()
+            _initialised.add(self.path)
+
+    def _create(self) -> None:
+        with self._connect() as conn:
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS watched_addresses (
@@ -96,6 +124,7 @@ class Store:
                     last_checked_at TEXT,
                     status TEXT NOT NULL DEFAULT 'at_rest',
                     truncated INTEGER NOT NULL DEFAULT 0,
+                    node_count INTEGER NOT NULL DEFAULT 0,   -- rows in trace_hops
                     note TEXT,
                     UNIQUE(txid, vout)
                 );
@@ -121,40 +150,70 @@ class Store:
                     FOREIGN KEY(coin_id) REFERENCES flagged_coins(id) ON DELETE CASCADE
                 );
 
+                CREATE TABLE IF NOT EXISTS sweeps (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started_at TEXT NOT NULL,
+                    duration_s REAL NOT NULL DEFAULT 0,
+                    items INTEGER NOT NULL DEFAULT 0,
+                    requests INTEGER NOT NULL DEFAULT 0,
+                    coalesced INTEGER NOT NULL DEFAULT 0,
+                    addresses INTEGER NOT NULL DEFAULT 0,
+                    txs INTEGER NOT NULL DEFAULT 0,
+                    coins INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    cache_hits INTEGER NOT NULL DEFAULT 0,
+                    cache_misses INTEGER NOT NULL DEFAULT 0
+                );
+
+                -- Explorer responses keyed by API path. expires_at NULL means
+                -- settled history, kept for good; everything else is dropped
+                -- when it expires or the chain tip moves.
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL
+                );
+
+                -- get_hops: (coin_id, depth) plus the implicit rowid is exactly
+                -- its ORDER BY depth, id, so the trail is read without a sort.
                 CREATE INDEX IF NOT EXISTS idx_hops_coin ON trace_hops(coin_id, depth);
-                CREATE INDEX IF NOT EXISTS idx_hops_frontier ON trace_hops(coin_id, spent, expanded);
+                -- frontier_hops: equality on (coin_id, spent), already in
+                -- (depth, id) order, and every column it filters on or
+                -- returns, so the live edge is read from the index alone.
+                DROP INDEX IF EXISTS idx_hops_frontier;
+                CREATE INDEX IF NOT EXISTS idx_hops_live
+                    ON trace_hops(coin_id, spent, depth, id, kind, vout, txid, value_sat);
                 CREATE INDEX IF NOT EXISTS idx_activity_addr ON address_activity(address_id, discovered_at DESC);
+                CREATE INDEX IF NOT EXISTS idx_cache_stored ON api_cache(stored_at);
                 """
             )
-            conn.commit()
-        finally:
-            conn.close()
+            # Databases created before the cache existed lack its sweep columns.
+            have = {r["name"] for r in conn.execute("PRAGMA table_info(sweeps)")}
+            for col in ("cache_hits", "cache_misses"):
+                if col not in have:
+                    conn.execute(f"ALTER TABLE sweeps ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0")
+            # ...and flagged coins from before the hop counter need it filled in.
+            have = {r["name"] for r in conn.execute("PRAGMA table_info(flagged_coins)")}
+            if "node_count" not in have:
+                conn.execute("ALTER TABLE flagged_coins ADD COLUMN node_count INTEGER NOT NULL DEFAULT 0")
+                conn.execute("UPDATE flagged_coins SET node_count = "
+                             "(SELECT COUNT(*) FROM trace_hops h WHERE h.coin_id = flagged_coins.id)")
 
     # ------------------------------------------------------------------ #
     # Generic helpers
     # ------------------------------------------------------------------ #
     def _one(self, sql, args=()):
-        conn = self._connect()
-        try:
-            return conn.execute(sql, args).fetchone()
-        finally:
-            conn.close()
+        return self._connect().execute(sql, args).fetchone()
 
     def _all(self, sql, args=()):
-        conn = self._connect()
-        try:
-            return conn.execute(sql, args).fetchall()
-        finally:
-            conn.close()
+        return self._connect().execute(sql, args).fetchall()
 
     def _exec(self, sql, args=()):
-        conn = self._connect()
-        try:
+        with self._connect() as conn:
             cur = conn.execute(sql, args)
-            conn.commit()
             return cur.lastrowid
-        finally:
-            conn.close()
 
     # ------------------------------------------------------------------ #
     # Watched addresses
@@ -204,13 +263,9 @@ class Store:
         )
 
     def ack_address(self, address_id):
-        conn = self._connect()
-        try:
+        with self._connect() as conn:
             conn.execute("UPDATE watched_addresses SET has_new=0 WHERE id=?", (address_id,))
             conn.execute("UPDATE address_activity SET is_new=0 WHERE address_id=?", (address_id,))
-            conn.commit()
-        finally:
-            conn.close()
 
     # ------------------------------------------------------------------ #
     # Watched transactions
@@ -282,52 +337,143 @@ class Store:
         self._exec("UPDATE flagged_coins SET last_checked_at=? WHERE id=?", (utcnow_iso(), coin_id))
 
     def ack_coin(self, coin_id):
-        conn = self._connect()
-        try:
+        with self._connect() as conn:
             conn.execute("UPDATE flagged_coins SET is_new_spend=0 WHERE id=?", (coin_id,))
             conn.execute("UPDATE trace_hops SET is_new=0 WHERE coin_id=?", (coin_id,))
-            conn.commit()
-        finally:
-            conn.close()
 
     # ------------------------------------------------------------------ #
     # Trace hops
     # ------------------------------------------------------------------ #
-    def add_hop(self, coin_id, depth, kind, txid, vout, value_sat, address,
-                block_time=None, spent=0, expanded=0, taint_share=None,
-                parent_hop_id=None, is_new=0):
-        conn = self._connect()
-        try:
-            cur = conn.execute(
-                "INSERT OR IGNORE INTO trace_hops (coin_id, depth, kind, txid, vout, value_sat, "
-                "address, block_time, spent, expanded, taint_share, parent_hop_id, discovered_at, is_new) "
-                "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
-                (coin_id, depth, kind, txid, vout, value_sat, address, block_time,
-                 spent, expanded, taint_share, parent_hop_id, utcnow_iso(), is_new),
-            )
-            conn.commit()
-            return cur.lastrowid if cur.rowcount else None
-        finally:
-            conn.close()
+    _HOP_COLUMNS = ("depth", "kind", "txid", "vout", "value_sat", "address", "block_time",
+                    "spent", "expanded", "taint_share", "parent_hop_id", "is_new")
+
+    @staticmethod
+    def hop(depth, kind, txid, vout, value_sat, address, block_time=None, spent=0,
+            expanded=0, taint_share=None, parent_hop_id=None, is_new=0) -> tuple:
+        """One trace_hops row, in the shape add_hops takes."""
+        return (depth, kind, txid, vout, value_sat, address, block_time,
+                spent, expanded, taint_share, parent_hop_id, is_new)
+
+    def _insert_hops(self, conn, coin_id, hops) -> int:
+        now = utcnow_iso()
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO trace_hops (coin_id, discovered_at, "
+            + ", ".join(self._HOP_COLUMNS) + ") VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            [(coin_id, now, *h) for h in hops],
+        )
+        added = conn.total_changes - before
+        if added:
+            conn.execute("UPDATE flagged_coins SET node_count = node_count + ? WHERE id=?",
+                         (added, coin_id))
+        return added
+
+    def add_hops(self, coin_id, hops) -> int:
+        """Insert many hops (see ``hop``) in one transaction, skipping any
+        already recorded. Returns how many were new."""
+        with self._connect() as conn:
+            return self._insert_hops(conn, coin_id, hops)
+
+    def advance_frontier(self, coin_id, spends, hops) -> int:
+        """Record one forward step in a single transaction: mark each
+        ``(hop_id, spent_txid)`` in ``spends`` as spent and expanded, and insert
+        the new ``hops``. Returns how many hops were new."""
+        with self._connect() as conn:
+            conn.executemany("UPDATE trace_hops SET spent=1, spent_txid=?, expanded=1 WHERE id=?",
+                             [(txid, hop_id) for hop_id, txid in spends])
+            return self._insert_hops(conn, coin_id, hops) if hops else 0
 
     def count_hops(self, coin_id):
-        row = self._one("SELECT COUNT(*) AS n FROM trace_hops WHERE coin_id=?", (coin_id,))
-        return row["n"] if row else 0
+        row = self._one("SELECT node_count FROM flagged_coins WHERE id=?", (coin_id,))
+        return row["node_count"] if row else 0
 
     def frontier_hops(self, coin_id):
-        """Unspent, not-yet-expanded outpoints — the live edge of the forward trace."""
+        """Unspent, not-yet-expanded outpoints — the live edge of the forward trace.
+        Only the columns the trace needs, all of them served by idx_hops_live."""
         return self._all(
-            "SELECT * FROM trace_hops WHERE coin_id=? AND kind IN ('flagged','descendant') "
-            "AND spent=0 AND vout IS NOT NULL ORDER BY depth ASC",
+            "SELECT id, depth, txid, vout, value_sat FROM trace_hops "
+            "WHERE coin_id=? AND spent=0 AND vout IS NOT NULL AND kind IN ('flagged','descendant') "
+            "ORDER BY depth ASC, id ASC",
             (coin_id,),
         )
 
+    def flagged_hop(self, coin_id):
+        return self._one("SELECT spent, spent_txid FROM trace_hops "
+                         "WHERE coin_id=? AND depth=0 AND kind='flagged'", (coin_id,))
+
     def get_hops(self, coin_id):
         return self._all("SELECT * FROM trace_hops WHERE coin_id=? ORDER BY depth ASC, id ASC", (coin_id,))
 
-    def mark_hop(self, hop_id, **fields):
-        cols = ", ".join(f"{k}=?" for k in fields)
-        self._exec(f"UPDATE trace_hops SET {cols} WHERE id=?", (*fields.values(), hop_id))
+    # ------------------------------------------------------------------ #
+    # Sweep metrics
+    # ------------------------------------------------------------------ #
+    SWEEPS_KEPT = 500
+
+    def record_sweep(self, started_at, counts, metrics):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sweeps (started_at, duration_s, items, requests, coalesced, "
+                "addresses, txs, coins, errors, cache_hits, cache_misses) "
+                "VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                (started_at, metrics["duration_s"], metrics["items"], metrics["requests"],
+                 metrics["coalesced"], counts["addresses"], counts["txs"],
+                 counts["coins"], counts["errors"],
+                 metrics.get("cache_hits", 0), metrics.get("cache_misses", 0)),
+            )
+            conn.execute(
+                "DELETE FROM sweeps WHERE id <= (SELECT MAX(id) FROM sweeps) - ?",
+                (self.SWEEPS_KEPT,),
+            )
+
+    def last_sweep(self):
+        return self._one("SELECT * FROM sweeps ORDER BY id DESC LIMIT 1")
+
+    # ------------------------------------------------------------------ #
+    # Explorer response cache (see explorer.ExplorerClient)
+    # ------------------------------------------------------------------ #
+    CACHE_KEPT = 50_000           # settled entries kept, newest first
+    _TIP_KEY = "@tip"             # last tip height the cache was told about
+
+    def cache_get(self, key):
+        return self._one("SELECT body, etag, expires_at FROM api_cache WHERE key=?", (key,))
+
+    def cache_put(self, key, body, etag, ttl):
+        now = time.time()
+        self._exec(
+            "INSERT OR REPLACE INTO api_cache (key, body, etag, stored_at, expires_at) "
+            "VALUES (?,?,?,?,?)",
+            (key, body, etag, now, None if ttl is None else now + ttl),
+        )
+
+    def cache_known_tip(self):
+        row = self._one("SELECT body FROM api_cache WHERE key=?", (self._TIP_KEY,))
+        return int(row["body"]) if row else 0
+
+    def cache_tip(self, height):
+        """Record the chain tip. When it has advanced, every entry that was
+        only good until the next block is dropped, and the settled entries
+        are trimmed to CACHE_KEPT."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT body FROM api_cache WHERE key=?",
+                               (self._TIP_KEY,)).fetchone()
+            if row and int(row["body"]) >= height:
+                return
+            conn.execute("DELETE FROM api_cache WHERE expires_at IS NOT NULL")
+            conn.execute(
+                "DELETE FROM api_cache WHERE key IN (SELECT key FROM api_cache "
+                "WHERE key != ? ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self._TIP_KEY, self.CACHE_KEPT),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO api_cache (key, body, etag, stored_at, expires_at) "
+                "VALUES (?,?,NULL,?,NULL)",
+                (self._TIP_KEY, str(height), time.time()),
+            )
+
+    def cache_size(self):
+        row = self._one("SELECT COUNT(*) AS n FROM api_cache WHERE expires_at IS NULL AND key != ?",
+                        (self._TIP_KEY,))
+        return row["n"] if row else 0
 
     # ------------------------------------------------------------------ #
     # Dashboard counters
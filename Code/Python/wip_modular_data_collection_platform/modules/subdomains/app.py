@@ -5,8 +5,9 @@ import socket
 import sqlite3
 import threading
 import subprocess
+import time
 from datetime import UTC, datetime
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from urllib.parse import urlparse
 
 from flask import Flask, g, redirect, render_template, request, url_for, flash
@@ -17,6 +18,9 @@ DB_PATH = os.environ.get("INVENTORY_DB_PATH", os.path.join(BASE_DIR, "inventory.
 SUBFINDER_BIN = './subfinder' #os.environ.get("SUBFINDER_BIN", "subfinder")
 SUBFINDER_TIMEOUT = int(os.environ.get("SUBFINDER_TIMEOUT", "300"))
 DNS_TIMEOUT = float(os.environ.get("DNS_TIMEOUT", "3.0"))
+DNS_WORKERS = int(os.environ.get("DNS_WORKERS", "64"))
+DNS_CACHE_TTL = float(os.environ.get("DNS_CACHE_TTL", "300"))
+DNS_NEGATIVE_TTL = float(os.environ.get("DNS_NEGATIVE_TTL", "60"))
 MAX_HOSTNAME_LENGTH = 253
 
 app = Flask(__name__)
@@ -28,6 +32,12 @@ app.config["SUBFINDER_BIN"] = SUBFINDER_BIN
 scan_locks: dict[int, threading.Lock] = {}
 scan_locks_guard = threading.Lock()
 
+# One resolver pool for every scan, so concurrent scans share the bound on
+# in-flight lookups instead of each bringing their own threads.
+dns_pool = ThreadPoolExecutor(max_workers=DNS_WORKERS, thread_name_prefix="dns")
+dns_cache: dict[str, tuple[float, tuple[list[str], list[str], str | None]]] = {}
+dns_cache_guard = threading.Lock()
+
 
 # -----------------------------
 # Database helpers
@@ -84,6 +94,8 @@ def init_db() -> None:
                 suspicious_count INTEGER NOT NULL DEFAULT 0,
                 error_message TEXT,
                 raw_output TEXT,
+                duration_seconds REAL,
+                resolutions_per_second REAL,
                 FOREIGN KEY(domain_id) REFERENCES domains(id) ON DELETE CASCADE
             );
 
@@ -120,6 +132,11 @@ def init_db() -> None:
             CREATE INDEX IF NOT EXISTS idx_scans_domain_id ON scans(domain_id, started_at DESC);
             """
         )
+        # Older databases predate the scan timing columns.
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(scans)")}
+        for column in ("duration_seconds", "resolutions_per_second"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE scans ADD COLUMN {column} REAL")
         conn.commit()
     finally:
         conn.close()
@@ -180,34 +197,95 @@ def parse_subfinder_output(raw_output: str) -> list[str]:
 
 
 
-def resolve_hostname(hostname: str, timeout_seconds: float) -> tuple[list[str], list[str], str | None]:
-    def _lookup() -> tuple[list[str], list[str], str | None]:
-        ipv4 = set()
-        ipv6 = set()
-        try:
-            infos = socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
-        except socket.gaierror as exc:
-            return [], [], str(exc)
-        except Exception as exc:
-            return [], [], str(exc)
-
-        for info in infos:
-            family = info[0]
-            sockaddr = info[4]
-            if family == socket.AF_INET:
-                ipv4.add(sockaddr[0])
-            elif family == socket.AF_INET6:
-                ipv6.add(sockaddr[0])
-        return sorted(ipv4), sorted(ipv6), None
-
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(_lookup)
-        try:
-            return future.result(timeout=timeout_seconds)
-        except FuturesTimeoutError:
-            return [], [], f"DNS resolution timed out after {timeout_seconds} seconds"
-        except Exception as exc:
-            return [], [], str(exc)
+def lookup_hostname(hostname: str) -> tuple[list[str], list[str], str | None]:
+    ipv4 = set()
+    ipv6 = set()
+    try:
+        infos = socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as exc:
+        return [], [], str(exc)
+    except Exception as exc:
+        return [], [], str(exc)
+
+    for info in infos:
+        family = info[0]
+        sockaddr = info[4]
+        if family == socket.AF_INET:
+            ipv4.add(sockaddr[0])
+        elif family == socket.AF_INET6:
+            ipv6.add(sockaddr[0])
+    return sorted(ipv4), sorted(ipv6), None
+
+
+
+def cached_resolution(hostname: str) -> tuple[list[str], list[str], str | None] | None:
+    with dns_cache_guard:
+        entry = dns_cache.get(hostname)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del dns_cache[hostname]
+            return None
+        return entry[1]
+
+
+
+def remember_resolution(hostname: str, result: tuple[list[str], list[str], str | None]) -> None:
+    ttl = DNS_NEGATIVE_TTL if result[2] else DNS_CACHE_TTL
+    if ttl <= 0:
+        return
+    with dns_cache_guard:
+        dns_cache[hostname] = (time.monotonic() + ttl, result)
+        if len(dns_cache) > 100_000:
+            now = time.monotonic()
+            for key in [k for k, (expires, _) in dns_cache.items() if expires <= now]:
+                del dns_cache[key]
+
+
+
+def resolve_hostnames(hostnames: list[str], timeout_seconds: float) -> dict[str, tuple[list[str], list[str], str | None]]:
+    """Resolve many hostnames on the shared pool.
+
+    Recent answers come from the cache: positive ones for DNS_CACHE_TTL,
+    failures for DNS_NEGATIVE_TTL. Each lookup gets timeout_seconds from the
+    moment a worker picks it up, not from when it was queued; a lookup that
+    overruns is reported as timed out and its late answer is discarded (and
+    not cached, since a timeout says nothing about the name).
+    """
+    results = {}
+    pending = {}
+    started: dict[str, float] = {}
+
+    def _run(hostname: str):
+        started[hostname] = time.monotonic()
+        return lookup_hostname(hostname)
+
+    for hostname in hostnames:
+        cached = cached_resolution(hostname)
+        if cached is not None:
+            results[hostname] = cached
+        elif hostname not in results:
+            pending[dns_pool.submit(_run, hostname)] = hostname
+
+    while pending:
+        done, _ = wait(pending, timeout=min(0.25, timeout_seconds), return_when=FIRST_COMPLETED)
+        for future in done:
+            hostname = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = ([], [], str(exc))
+            else:
+                remember_resolution(hostname, result)
+            results[hostname] = result
+
+        now = time.monotonic()
+        for future, hostname in list(pending.items()):
+            began = started.get(hostname)
+            if began is not None and now - began > timeout_seconds:
+                del pending[future]
+                results[hostname] = ([], [], f"DNS resolution timed out after {timeout_seconds} seconds")
+    return results
 
 
 
@@ -255,6 +333,7 @@ def run_scan_worker(domain_id: int) -> None:
 
             root_domain = domain_row["domain"]
             started_at = utcnow_iso()
+            started = time.monotonic()
             scan_id = conn.execute(
                 "INSERT INTO scans (domain_id, started_at, status) VALUES (?, ?, 'running')",
                 (domain_id, started_at),
@@ -265,6 +344,7 @@ def run_scan_worker(domain_id: int) -> None:
             new_count = 0
             suspicious_count = 0
             parsed = []
+            rate = None
 
             try:
                 command = [
@@ -292,16 +372,18 @@ def run_scan_worker(domain_id: int) -> None:
 
                 parsed = parse_subfinder_output(raw_output)
                 suspicious_count = sum(1 for host in parsed if not is_hostname_under_root(host, root_domain))
-                new_count = persist_scan_results(conn, domain_id, scan_id, root_domain, parsed)
+                new_count, rate = persist_scan_results(conn, domain_id, scan_id, root_domain, parsed)
 
                 finished_at = utcnow_iso()
                 conn.execute(
                     """
                     UPDATE scans
-                    SET finished_at = ?, status = 'completed', raw_count = ?, new_count = ?, suspicious_count = ?, raw_output = ?
+                    SET finished_at = ?, status = 'completed', raw_count = ?, new_count = ?, suspicious_count = ?, raw_output = ?,
+                        duration_seconds = ?, resolutions_per_second = ?
                     WHERE id = ?
                     """,
-                    (finished_at, len(parsed), new_count, suspicious_count, raw_output, scan_id),
+                    (finished_at, len(parsed), new_count, suspicious_count, raw_output,
+                     time.monotonic() - started, rate, scan_id),
                 )
                 conn.execute(
                     "UPDATE domains SET last_scan_at = ?, scan_status = 'idle' WHERE id = ?",
@@ -312,8 +394,8 @@ def run_scan_worker(domain_id: int) -> None:
                 finished_at = utcnow_iso()
                 msg = f"subfinder timed out after {app.config['SUBFINDER_TIMEOUT']} seconds"
                 conn.execute(
-                    "UPDATE scans SET finished_at = ?, status = 'failed', error_message = ?, raw_output = ? WHERE id = ?",
-                    (finished_at, msg, raw_output, scan_id),
+                    "UPDATE scans SET finished_at = ?, status = 'failed', error_message = ?, raw_output = ?, duration_seconds = ? WHERE id = ?",
+                    (finished_at, msg, raw_output, time.monotonic() - started, scan_id),
                 )
                 conn.execute(
                     "UPDATE domains SET scan_status = 'error' WHERE id = ?",
@@ -323,8 +405,8 @@ def run_scan_worker(domain_id: int) -> None:
             except Exception as exc:
                 finished_at = utcnow_iso()
                 conn.execute(
-                    "UPDATE scans SET finished_at = ?, status = 'failed', error_message = ?, raw_output = ? WHERE id = ?",
-                    (finished_at, str(exc), raw_output, scan_id),
+                    "UPDATE scans SET finished_at = ?, status = 'failed', error_message = ?, raw_output = ?, duration_seconds = ?, resolutions_per_second = ? WHERE id = ?",
+                    (finished_at, str(exc), raw_output, time.monotonic() - started, rate, scan_id),
                 )
                 conn.execute(
                     "UPDATE domains SET scan_status = 'error' WHERE id = ?",
@@ -336,31 +418,41 @@ def run_scan_worker(domain_id: int) -> None:
 
 
 
-def persist_scan_results(conn: sqlite3.Connection, domain_id: int, scan_id: int, root_domain: str, parsed_hosts: list[str]) -> int:
+def persist_scan_results(conn: sqlite3.Connection, domain_id: int, scan_id: int, root_domain: str, parsed_hosts: list[str]) -> tuple[int, float]:
+    """Resolve and store one scan's hostnames. Returns the number of new
+    subdomains and the resolution rate in lookups per second."""
     now = utcnow_iso()
     current_seen = set(parsed_hosts)
-    new_count = 0
 
     existing_rows = conn.execute(
-        "SELECT * FROM subdomains WHERE domain_id = ?",
+        "SELECT id, hostname, is_active FROM subdomains WHERE domain_id = ?",
         (domain_id,),
     ).fetchall()
     existing_map = {row["hostname"]: row for row in existing_rows}
 
     missing_hostnames = [row["hostname"] for row in existing_rows if row["hostname"] not in current_seen and row["is_active"] == 1]
 
-    resolved_hosts = []
+    resolve_started = time.monotonic()
+    resolutions = resolve_hostnames(parsed_hosts, app.config["DNS_TIMEOUT"])
+    resolve_seconds = time.monotonic() - resolve_started
+    rate = len(parsed_hosts) / resolve_seconds if resolve_seconds > 0 else 0.0
+    resolved_at = utcnow_iso()
+
+    rows = []
     for hostname in parsed_hosts:
-        is_suspicious = 0 if is_hostname_under_root(hostname, root_domain) else 1
-        ipv4, ipv6, resolution_error = resolve_hostname(hostname, app.config["DNS_TIMEOUT"])
-        resolved_hosts.append({
-            "hostname": hostname,
-            "is_suspicious": is_suspicious,
-            "ipv4_json": json.dumps(ipv4),
-            "ipv6_json": json.dumps(ipv6),
-            "resolution_error": resolution_error,
-            "last_resolved_at": utcnow_iso(),
-        })
+        ipv4, ipv6, resolution_error = resolutions[hostname]
+        rows.append((
+            domain_id,
+            hostname,
+            0 if is_hostname_under_root(hostname, root_domain) else 1,
+            now,
+            now,
+            resolved_at,
+            json.dumps(ipv4),
+            json.dumps(ipv6),
+            resolution_error,
+        ))
+    new_hostnames = [hostname for hostname in parsed_hosts if hostname not in existing_map]
 
     conn.execute("BEGIN IMMEDIATE")
     try:
@@ -370,69 +462,42 @@ def persist_scan_results(conn: sqlite3.Connection, domain_id: int, scan_id: int,
                 [(domain_id, hostname) for hostname in missing_hostnames],
             )
 
-        for item in resolved_hosts:
-            hostname = item["hostname"]
-            if hostname in existing_map:
-                row = existing_map[hostname]
-                conn.execute(
-                    """
-                    UPDATE subdomains
-                    SET is_suspicious = ?,
-                        is_active = 1,
-                        last_seen_at = ?,
-                        last_resolved_at = ?,
-                        ipv4_json = ?,
-                        ipv6_json = ?,
-                        resolution_error = ?
-                    WHERE id = ?
-                    """,
-                    (
-                        item["is_suspicious"],
-                        now,
-                        item["last_resolved_at"],
-                        item["ipv4_json"],
-                        item["ipv6_json"],
-                        item["resolution_error"],
-                        row["id"],
-                    ),
-                )
-                subdomain_id = row["id"]
-                was_new = 0
-            else:
-                cursor = conn.execute(
-                    """
-                    INSERT INTO subdomains (
-                        domain_id, hostname, is_suspicious, is_new_unseen, is_active,
-                        first_seen_at, last_seen_at, last_resolved_at, ipv4_json, ipv6_json, resolution_error
-                    ) VALUES (?, ?, ?, 1, 1, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        domain_id,
-                        hostname,
-                        item["is_suspicious"],
-                        now,
-                        now,
-                        item["last_resolved_at"],
-                        item["ipv4_json"],
-                        item["ipv6_json"],
-                        item["resolution_error"],
-                    ),
-                )
-                subdomain_id = cursor.lastrowid
-                was_new = 1
-                new_count += 1
+        # New hostnames are inserted tagged [new]; known ones keep their
+        # first_seen_at and tag and get the fresh resolution.
+        conn.executemany(
+            """
+            INSERT INTO subdomains (
+                domain_id, hostname, is_suspicious, is_new_unseen, is_active,
+                first_seen_at, last_seen_at, last_resolved_at, ipv4_json, ipv6_json, resolution_error
+            ) VALUES (?, ?, ?, 1, 1, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(domain_id, hostname) DO UPDATE SET
+                is_suspicious = excluded.is_suspicious,
+                is_active = 1,
+                last_seen_at = excluded.last_seen_at,
+                last_resolved_at = excluded.last_resolved_at,
+                ipv4_json = excluded.ipv4_json,
+                ipv6_json = excluded.ipv6_json,
+                resolution_error = excluded.resolution_error
+            """,
+            rows,
+        )
 
-            conn.execute(
-                "INSERT OR REPLACE INTO scan_results (scan_id, subdomain_id, seen_in_scan, was_new_in_scan) VALUES (?, ?, 1, ?)",
-                (scan_id, subdomain_id, was_new),
-            )
+        ids = {
+            row["hostname"]: row["id"]
+            for row in conn.execute("SELECT id, hostname FROM subdomains WHERE domain_id = ?", (domain_id,))
+        }
+        new_set = set(new_hostnames)
+        conn.executemany(
+            "INSERT OR REPLACE INTO scan_results (scan_id, subdomain_id, seen_in_scan, was_new_in_scan) VALUES (?, ?, 1, ?)",
+            [(scan_id, ids[hostname], 1 if hostname in new_set else 0) for hostname in parsed_hosts],
+        )
 
         conn.commit()
     except Exception:
         conn.rollback()
         raise
 
-    return new_count
+    return len(new_hostnames), rate
 
 
 # -----------------------------
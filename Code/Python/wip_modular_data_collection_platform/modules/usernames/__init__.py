@@ -55,7 +55,26 @@ def create_blueprint() -> Blueprint:
     @login_required
     def index():
         results, username, error = None, "", None
-        if request.method == "POST":
+        bulk, bulk_text = None, ""
+        if request.method == "POST" and request.form.get("mode") == "bulk":
+            bulk_text = request.form.get("usernames") or ""
+            usernames = list(dict.fromkeys(u.strip() for u in bulk_text.splitlines() if u.strip()))
+            bad = [u for u in usernames if contains_blacklisted(u) or not INPUT_RE.match(u)]
+            if not usernames or bad:
+                error = "Enter usernames one per line (1–64 chars: letters, digits, _ . - only)."
+            elif len(usernames) > checker.BULK_MAX_USERNAMES:
+                error = f"Bulk scans take at most {checker.BULK_MAX_USERNAMES} usernames."
+            else:
+                cfg = current_app.config
+                bulk = checker.run_bulk(
+                    _load_targets(), usernames,
+                    user_agent=cfg["DEFAULT_USER_AGENT"],
+                    timeout=cfg["OUTBOUND_TIMEOUT"],
+                    max_workers=cfg["OUTBOUND_MAX_WORKERS"],
+                )
+                if not bulk[0]["results"]:
+                    bulk, error = None, "No targets are configured yet. Ask an admin to add some."
+        elif request.method == "POST":
             username = (request.form.get("username") or "").strip()
             if not username or contains_blacklisted(username) or not INPUT_RE.match(username):
                 error = "Enter a username (1–64 chars: letters, digits, _ . - only)."
@@ -70,7 +89,9 @@ def create_blueprint() -> Blueprint:
                 if not results:
                     error = "No targets are configured yet. Ask an admin to add some."
         return render_template("usernames_index.html",
-                               results=results, username=username, error=error)
+                               results=results, username=username, error=error,
+                               bulk=bulk, bulk_text=bulk_text,
+                               bulk_max=checker.BULK_MAX_USERNAMES)
 
     return bp
 
@@ -155,6 +176,7 @@ def _target_from_form(form, *, new: bool) -> dict:
         "method": method,
         "expected_status": codes,
         "match": match,
+        "head": form.get("head", "") == "on",
         "enabled": form.get("enabled", "on") == "on",
     }
     if new:
@@ -3,11 +3,26 @@
 Pure, framework-free logic so it is easy to test and reason about. The Flask
 views pass in the configured targets plus request settings (user-agent,
 timeout, worker count) and get back a list of result dicts.
+
+Every check goes through one shared HTTP session and one shared worker pool,
+so repeated checks against the same site reuse kept-alive connections instead
+of paying a TCP and TLS handshake each time. Status-code targets ask with HEAD
+first. Body targets stream the page and stop reading as soon as the answer is
+known — the match string has turned up, or MAX_BODY_BYTES have gone past
+without it. No more than PER_HOST_LIMIT requests are open to one host at once,
+however many usernames a bulk run checks: checks beyond that wait in a
+per-host queue, not on a pool thread, so a slow site cannot tie up the
+workers the other sites need.
 """
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from urllib.parse import quote
+import codecs
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import quote, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 
 # Detection methods a target may use.
 METHOD_STATUS = "status"          # exists if HTTP status is in expected_status
@@ -15,6 +30,15 @@ METHOD_BODY_CONTAINS = "body_contains"  # exists if `match` appears in the body
 METHOD_BODY_ABSENT = "body_absent"      # exists if `match` is ABSENT from the body
 METHODS = (METHOD_STATUS, METHOD_BODY_CONTAINS, METHOD_BODY_ABSENT)
 
+MAX_BODY_BYTES = 1024 * 1024   # read no further into a page than this
+CHUNK_BYTES = 16 * 1024
+PER_HOST_LIMIT = 4             # concurrent requests to any one host
+BULK_MAX_USERNAMES = 50
+
+# Servers that refuse HEAD tend to say so with one of these; the check is then
+# repeated with GET.
+_HEAD_REFUSED = {400, 403, 405, 501}
+
 
 def build_url(template: str, username: str) -> str:
     """Insert the (already URL-encoded) username into a target template.
@@ -28,16 +52,123 @@ def build_url(template: str, username: str) -> str:
     return template + encoded
 
 
-def _decide(method: str, status_code: int, expected_status, body: str, match: str) -> bool:
+def _decide(method: str, status_code: int, expected_status, seen: bool) -> bool:
+    """`seen` says whether the match string was found in the body."""
     if method == METHOD_BODY_CONTAINS:
-        return bool(match) and match.lower() in body.lower()
+        return seen
     if method == METHOD_BODY_ABSENT:
         # A profile exists when the "not found" marker is absent and the page loaded.
-        return status_code < 400 and not (match and match.lower() in body.lower())
+        return status_code < 400 and not seen
     # Default: status-code match.
     return status_code in (expected_status or [200])
 
 
+# --------------------------------------------------------------------------- #
+# Shared transport
+# --------------------------------------------------------------------------- #
+_lock = threading.Lock()
+_session = None
+_pool = None
+_host_busy: dict[str, int] = {}       # checks running on the pool, per host
+_host_waiting: dict[str, deque] = {}  # checks queued behind them
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            # Checks must not leak state into each other: a consent or
+            # session cookie from one site visit would change the next.
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_connections=64, pool_maxsize=PER_HOST_LIMIT)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def _get_pool(max_workers: int) -> ThreadPoolExecutor:
+    """The shared worker pool. Sized once, by the first caller; it is never
+    replaced, since another request may be submitting to it."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="usernames")
+        return _pool
+
+
+def _submit(url: str, fn, *args, **kwargs) -> Future:
+    """Run `fn` on the shared pool once `url`'s host has fewer than
+    PER_HOST_LIMIT checks running; until then it waits in the host's queue."""
+    host = (urlsplit(url).hostname or "").lower()
+    job = (Future(), fn, args, kwargs)
+    with _lock:
+        start = _host_busy.get(host, 0) < PER_HOST_LIMIT
+        if start:
+            _host_busy[host] = _host_busy.get(host, 0) + 1
+        else:
+            _host_waiting.setdefault(host, deque()).append(job)
+    if start:
+        _start(host, job)
+    return job[0]
+
+
+def _start(host: str, job) -> None:
+    outer, fn, args, kwargs = job
+    if not outer.set_running_or_notify_cancel():
+        _release(host)
+        return
+
+    def finished(inner: Future) -> None:
+        if inner.exception() is not None:
+            outer.set_exception(inner.exception())
+        else:
+            outer.set_result(inner.result())
+        _release(host)
+
+    _pool.submit(fn, *args, **kwargs).add_done_callback(finished)
+
+
+def _release(host: str) -> None:
+    """Hand the host's slot to its next queued check, or free it."""
+    with _lock:
+        waiting = _host_waiting.get(host)
+        job = waiting.popleft() if waiting else None
+        if waiting is not None and not waiting:
+            del _host_waiting[host]
+        if job is None:
+            _host_busy[host] -= 1
+            if not _host_busy[host]:
+                del _host_busy[host]
+    if job is not None:
+        _start(host, job)
+
+
+def _scan_body(resp: requests.Response, match: str) -> tuple[bool, bool]:
+    """Read the body until `match` appears (case-insensitive) or the byte cap.
+    Returns (seen, truncated)."""
+    if not match:
+        return False, False
+    needle = match.lower()
+    try:
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    tail, read = "", 0
+    for chunk in resp.iter_content(CHUNK_BYTES):
+        read += len(chunk)
+        # Keep the last len(match)-1 characters so a match split across two
+        # chunks is still found.
+        text = tail + decoder.decode(chunk).lower()
+        if needle in text:
+            return True, False
+        tail = text[-(len(needle) - 1):] if len(needle) > 1 else ""
+        if read >= MAX_BODY_BYTES:
+            return False, True
+    return needle in tail + decoder.decode(b"", final=True).lower(), False
+
+
 def check_one(target: dict, username: str, *, user_agent: str, timeout: int) -> dict:
     """Check a single target. Never raises — failures are returned as 'error'."""
     url = build_url(target["url"], username)
@@ -50,18 +181,30 @@ def check_one(target: dict, username: str, *, user_agent: str, timeout: int) ->
     }
     method = target.get("method", METHOD_STATUS)
     need_body = method in (METHOD_BODY_CONTAINS, METHOD_BODY_ABSENT)
+    headers = {"User-Agent": user_agent, "Accept-Language": "en-US,en;q=0.9"}
+    session = _get_session()
     try:
-        resp = requests.get(
-            url,
-            headers={"User-Agent": user_agent, "Accept-Language": "en-US,en;q=0.9"},
-            timeout=timeout,
-            allow_redirects=True,
-        )
-        body = resp.text if need_body else ""
-        found = _decide(method, resp.status_code, target.get("expected_status"),
-                        body, target.get("match", ""))
+        resp = None
+        if not need_body and target.get("head", True):
+            resp = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+            if resp.status_code in _HEAD_REFUSED:
+                resp.close()
+                resp = None
+        if resp is None:
+            resp = session.get(url, headers=headers, timeout=timeout,
+                               allow_redirects=True, stream=True)
+        try:
+            seen, truncated = (_scan_body(resp, target.get("match", ""))
+                               if need_body else (False, False))
+        finally:
+            # Closing unread content drops that one connection; letting
+            # a large page finish downloading would cost more.
+            resp.close()
+        found = _decide(method, resp.status_code, target.get("expected_status"), seen)
         result["code"] = resp.status_code
         result["status"] = "found" if found else "absent"
+        if truncated:
+            result["note"] = f"read first {MAX_BODY_BYTES // 1024} KiB"
     except requests.exceptions.Timeout:
         result["note"] = "timed out"
     except requests.exceptions.RequestException as exc:
@@ -72,16 +215,29 @@ def check_one(target: dict, username: str, *, user_agent: str, timeout: int) ->
 def run_checks(targets: list[dict], username: str, *, user_agent: str,
                timeout: int, max_workers: int) -> list[dict]:
     """Run all enabled targets concurrently. Order of input is preserved."""
+    return run_bulk(targets, [username], user_agent=user_agent, timeout=timeout,
+                    max_workers=max_workers)[0]["results"]
+
+
+def run_bulk(targets: list[dict], usernames: list[str], *, user_agent: str,
+             timeout: int, max_workers: int) -> list[dict]:
+    """Check every username against every enabled target as one job.
+
+    Returns one ``{"username", "results"}`` dict per username, in input order,
+    each with results in target order. All checks share the pool and queue
+    per host, so a slow site holds up only its own column, not the others."""
     active = [t for t in targets if t.get("enabled", True)]
-    if not active:
-        return []
-    workers = max(1, min(max_workers, len(active)))
-    results_by_index: dict[int, dict] = {}
-    with ThreadPoolExecutor(max_workers=workers) as pool:
-        futures = {
-            pool.submit(check_one, t, username, user_agent=user_agent, timeout=timeout): i
-            for i, t in enumerate(active)
-        }
-        for fut in as_completed(futures):
-            results_by_index[futures[fut]] = fut.result()
-    return [results_by_index[i] for i in range(len(active))]
+    if not active or not usernames:
+        return [{"username": u, "results": []} for u in usernames]
+    _get_pool(max(1, max_workers))
+    grid: dict[tuple[int, int], dict] = {}
+    futures = {
+        _submit(build_url(t["url"], u), check_one, t, u,
+                user_agent=user_agent, timeout=timeout): (ui, ti)
+        for ui, u in enumerate(usernames)
+        for ti, t in enumerate(active)
+    }
+    for fut in as_completed(futures):
+        grid[futures[fut]] = fut.result()
+    return [{"username": u, "results": [grid[(ui, ti)] for ti in range(len(active))]}
+            for ui, u in enumerate(usernames)]